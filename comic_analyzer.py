@@ -7,6 +7,9 @@ import sqlite3
 import sys
 from collections import Counter
 
+from comic_credits import find_entities, comics_for_entity, top_entities
+from comic_volumes import get_volume, find_volumes, comics_in_volume, strip_html
+
 def connect_db(db_path='comics_inventory.db'):
     """Conecta ao banco de dados"""
     try:
@@ -86,6 +89,16 @@ def show_detailed_stats(db_path):
         percentage = (count / total * 100) if total > 0 else 0
         print(f"   {ext:5s}: {count:6d} ({percentage:5.1f}%)")
     
+    # Créditos normalizados (preenchidos pelo enricher)
+    if has_credit_tables(cursor):
+        for title, table, role in [('✍️  Top 10 Roteiristas', 'persons', 'writer'),
+                                   ('👥 Top 10 Personagens', 'characters', None)]:
+            rows = top_entities(conn, table, limit=10, role=role)
+            if rows:
+                print(f"\n{title}:")
+                for i, (name, count) in enumerate(rows, 1):
+                    print(f"   {i:2d}. {name:40s}: {count:4d} arquivos")
+    
     # Tamanho total
     cursor.execute('SELECT SUM(file_size) FROM comics')
     total_size = cursor.fetchone()[0] or 0
@@ -105,6 +118,29 @@ def find_duplicates(db_path):
     print("  🔍 BUSCA DE DUPLICATAS")
     print("=" * 70)
     
+    # Cópias idênticas (mesma impressão digital - consulta pelo índice)
+    cursor.execute("PRAGMA table_info(comics)")
+    if 'fingerprint' in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('''
+            SELECT fingerprint, COUNT(*) as cnt, 
+                   GROUP_CONCAT(file_path, ' | ') as files
+            FROM comics 
+            WHERE fingerprint IS NOT NULL
+            GROUP BY fingerprint
+            HAVING cnt > 1
+            ORDER BY cnt DESC
+            LIMIT 50
+        ''')
+        exact = cursor.fetchall()
+        
+        if exact:
+            print(f"\n🧬 {len(exact)} grupo(s) de cópias idênticas (mesmo conteúdo):\n")
+            for fingerprint, count, files in exact:
+                print(f"🔑 {fingerprint[:12]} - {count} cópias:")
+                for path in files.split(' | '):
+                    print(f"   • {path}")
+                print()
+    
     cursor.execute('''
         SELECT volume_name, issue_number, COUNT(*) as cnt, 
                GROUP_CONCAT(file_name, ' | ') as files
@@ -231,6 +267,24 @@ def show_comic_info(db_path, comic_id):
         print(f"{'  Tamanho:':20s} {comic['file_size'] / (1024*1024):.2f} MB")
     print(f"{'  Formato:':20s} {comic['file_ext']}")
     
+    # Conteúdo do arquivo (preenchido pelo scanner)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='archive_info'")
+    if cursor.fetchone():
+        cursor.execute('''
+            SELECT page_count, uncompressed_size, first_image, has_comicinfo, error_message
+            FROM archive_info WHERE file_path = ?
+        ''', (comic['file_path'],))
+        archive = cursor.fetchone()
+        if archive:
+            page_count, uncompressed_size, first_image, has_comicinfo, archive_error = archive
+            if archive_error:
+                print(f"{'  Conteúdo:':20s} ⚠️  {archive_error}")
+            else:
+                print(f"{'  Páginas:':20s} {page_count}")
+                print(f"{'  Descomprimido:':20s} {(uncompressed_size or 0) / (1024*1024):.2f} MB")
+                print(f"{'  Capa (entrada):':20s} {first_image or 'N/A'}")
+                print(f"{'  ComicInfo.xml:':20s} {'Sim' if has_comicinfo else 'Não'}")
+    
     # Informações extraídas
     print("\n🔍 METADADOS EXTRAÍDOS:")
     print(f"{'  Título limpo:':20s} {comic['clean_title'] or 'N/A'}")
@@ -243,6 +297,12 @@ def show_comic_info(db_path, comic_id):
         print(f"{'  Série:':20s} {comic['volume_name'] or 'N/A'}")
         print(f"{'  Editora:':20s} {comic['publisher'] or 'N/A'}")
         
+        # Dados da série (enricher --volumes)
+        volume = get_volume(conn, comic['comicvine_volume_id']) if has_volume_table(cursor) else None
+        if volume:
+            print(f"{'  Início da série:':20s} {volume['start_year'] or 'N/A'}")
+            print(f"{'  Edições na série:':20s} {volume['count_of_issues'] or 'N/A'}")
+        
         # Datas de publicação
         if comic.get('cover_date'):
             print(f"{'  Data da capa:':20s} {comic['cover_date']}")
@@ -410,6 +470,142 @@ def search_comics(db_path, query):
     
     conn.close()
 
+def has_volume_table(cursor):
+    """O enricher já criou a tabela de volumes?"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='volumes'")
+    return cursor.fetchone() is not None
+
+def show_series(db_path, query):
+    """Página de uma série: linha de volumes + edições da coleção (sem API)"""
+    conn = connect_db(db_path)
+    cursor = conn.cursor()
+    
+    print("\n" + "=" * 70)
+    print("  📚 SÉRIE")
+    print("=" * 70)
+    
+    if not has_volume_table(cursor):
+        print("\n❌ Volumes ainda não buscados. Execute: python3 comic_enricher.py --db <DB> --volumes")
+        conn.close()
+        return
+    
+    if query.isdigit():
+        volume_id = int(query)
+    else:
+        volumes = find_volumes(conn, query)
+        if not volumes:
+            print(f"\n❌ Nenhuma série encontrada para '{query}'.")
+            conn.close()
+            return
+        if len(volumes) > 1:
+            print(f"\n⚠️  {len(volumes)} séries parecidas, use o ID:\n")
+            for volume_id, name, start_year, publisher in volumes:
+                print(f"   • {name} ({start_year or '?'}) - {publisher or '?'} [ID: {volume_id}]")
+            print("=" * 70)
+            conn.close()
+            return
+        volume_id = volumes[0][0]
+    
+    volume = get_volume(conn, volume_id)
+    if not volume:
+        print(f"\n❌ Volume {volume_id} não está na tabela de volumes.")
+        print("   Execute: python3 comic_enricher.py --db <DB> --volumes")
+        conn.close()
+        return
+    
+    print(f"\n{'Série:':20s} {volume['name']}")
+    print(f"{'Editora:':20s} {volume['publisher'] or 'N/A'}")
+    print(f"{'Início:':20s} {volume['start_year'] or 'N/A'}")
+    print(f"{'Edições:':20s} {volume['count_of_issues'] or 'N/A'}")
+    if volume['deck']:
+        print(f"{'Resumo:':20s} {volume['deck']}")
+    description = strip_html(volume['description'])
+    if description:
+        print(f"\n📝 SINOPSE:")
+        print(f"   {description[:500]}{'...' if len(description) > 500 else ''}")
+    if volume['image_url']:
+        print(f"\n🖼️  CAPA: {volume['image_url']}")
+    
+    comics = comics_in_volume(conn, volume_id)
+    owned = set()
+    for _, issue, _, _ in comics:
+        try:
+            owned.add(int(issue))
+        except (TypeError, ValueError):
+            continue
+    
+    print(f"\n📖 NA COLEÇÃO: {len(comics)} arquivo(s)")
+    for comic_id, issue, cover_date, file_name in comics:
+        info = f"#{issue}" if issue else file_name
+        if cover_date:
+            info += f" ({cover_date[:4]})"
+        print(f"   [ID: {comic_id}] {info}")
+    
+    if volume['count_of_issues']:
+        missing = [n for n in range(1, volume['count_of_issues'] + 1) if n not in owned]
+        if missing:
+            shown = ', '.join(f"#{n}" for n in missing[:30])
+            more = f" e mais {len(missing) - 30}" if len(missing) > 30 else ''
+            print(f"\n🕳️  Faltam {len(missing)} de {volume['count_of_issues']}: {shown}{more}")
+        else:
+            print(f"\n✅ Série completa!")
+    
+    print("=" * 70)
+    
+    conn.close()
+
+def has_credit_tables(cursor):
+    """O enricher já criou as tabelas de créditos?"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='issue_persons'")
+    return cursor.fetchone() is not None
+
+# Comando do analyzer -> (tabela em comic_credits, rótulo)
+CREDIT_COMMANDS = {
+    'creator': ('persons', 'Criador'),
+    'character': ('characters', 'Personagem'),
+    'team': ('teams', 'Equipe'),
+    'arc': ('story_arcs', 'Arco'),
+}
+
+def list_by_credit(db_path, command, name, role=None):
+    """Lista os comics de um criador, personagem, equipe ou arco (consulta indexada)"""
+    conn = connect_db(db_path)
+    cursor = conn.cursor()
+    table, label = CREDIT_COMMANDS[command]
+    
+    print(f"\n🔍 {label}: '{name}'" + (f" (função: {role})" if role else ""))
+    print("=" * 70)
+    
+    if not has_credit_tables(cursor):
+        print("\n❌ Créditos ainda não gravados. Execute: python3 comic_enricher.py --db <DB>")
+        conn.close()
+        return
+    
+    entities = find_entities(conn, table, name)
+    if not entities:
+        print("\n❌ Nenhum resultado encontrado.")
+    elif len(entities) > 1:
+        print(f"\n⚠️  {len(entities)} nomes parecidos, seja mais específico:\n")
+        for entity_id, entity_name in entities:
+            print(f"   • {entity_name} [ID Comic Vine: {entity_id}]")
+    else:
+        entity_id, entity_name = entities[0]
+        results = comics_for_entity(conn, table, entity_id, role=role)
+        print(f"\n✓ {entity_name}: {len(results)} comic(s)\n")
+        for comic_id, vol_name, issue, cover_date, publisher in results:
+            info = vol_name or '?'
+            if issue:
+                info += f" #{issue}"
+            if cover_date:
+                info += f" ({cover_date[:4]})"
+            if publisher:
+                info += f" - {publisher}"
+            print(f"   [ID: {comic_id}] {info}")
+    
+    print("=" * 70)
+    
+    conn.close()
+
 def list_not_found(db_path):
     """Lista comics não encontrados"""
     conn = connect_db(db_path)
@@ -466,6 +662,19 @@ def main():
     info_parser = subparsers.add_parser('info', help='Mostra ficha completa de um comic')
     info_parser.add_argument('id', type=int, help='ID do comic')
     
+    series_parser = subparsers.add_parser('series', help='Página de uma série (dados do volume)')
+    series_parser.add_argument('query', help='ID do volume no Comic Vine ou parte do nome')
+    
+    creator_parser = subparsers.add_parser('creator', help='Comics de um criador (roteiro, arte...)')
+    creator_parser.add_argument('name', help='Nome do criador')
+    creator_parser.add_argument('--role', help='Filtra por função (writer, penciler, inker, colorist, cover...)')
+    
+    for command, help_text in [('character', 'Aparições de um personagem'),
+                               ('team', 'Aparições de uma equipe'),
+                               ('arc', 'Edições de um arco de história')]:
+        credit_parser = subparsers.add_parser(command, help=help_text)
+        credit_parser.add_argument('name', help='Nome')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -484,6 +693,10 @@ def main():
         search_comics(args.db, args.query)
     elif args.command == 'info':
         show_comic_info(args.db, args.id)
+    elif args.command == 'series':
+        show_series(args.db, args.query)
+    elif args.command in CREDIT_COMMANDS:
+        list_by_credit(args.db, args.command, args.name, role=getattr(args, 'role', None))
 
 if __name__ == "__main__":
     main()
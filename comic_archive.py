@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Comic Archive - Inspeção do conteúdo dos arquivos sem extrair nada
+Lê apenas o diretório central (CBZ) ou os cabeçalhos (CBT/CBR)
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from comic_rar import list_rar, is_rar, read_stored_entry, RarError
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.avif', '.jxl'}
+COMICINFO_NAME = 'comicinfo.xml'
+
+_DIGITS_RE = re.compile(r'(\d+)')
+
+def natural_key(name):
+    """Ordenação natural: page2.jpg antes de page10.jpg"""
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS_RE.split(name)]
+
+def is_page(name):
+    """Verifica se a entrada é uma página (imagem) e não lixo de sistema"""
+    base = os.path.basename(name)
+    if not base or base.startswith('.') or '__MACOSX' in name:
+        return False
+    return os.path.splitext(base)[1].lower() in IMAGE_EXTENSIONS
+
+def list_zip_entries(file_path):
+    """Lista (nome, tamanho descomprimido) lendo só o diretório central do ZIP"""
+    with zipfile.ZipFile(file_path) as zf:
+        return [(info.filename, info.file_size) for info in zf.infolist() if not info.is_dir()]
+
+def list_tar_entries(file_path):
+    """Lista (nome, tamanho) percorrendo apenas os cabeçalhos do TAR"""
+    with tarfile.open(file_path, 'r:*') as tf:
+        return [(member.name, member.size) for member in tf if member.isfile()]
+
+def list_rar_entries(file_path):
+    """Lista (nome, tamanho) pelos cabeçalhos RAR4/RAR5 (comic_rar)"""
+    listing = list_rar(file_path)
+    entries = [(entry.name, entry.unpacked_size or 0)
+               for entry in listing.entries if not entry.is_dir]
+    return entries, listing.is_solid
+
+# Extensões inspecionadas e leitores por formato real
+ARCHIVE_EXTENSIONS = {'.cbz', '.cbt', '.cbr'}
+EXTENSION_FORMATS = {'.cbz': 'zip', '.cbt': 'tar', '.cbr': 'rar'}
+
+def detect_format(file_path):
+    """
+    Descobre o formato pela assinatura do arquivo
+
+    Muitos .cbr são ZIPs renomeados (e vice-versa); a extensão só é usada
+    quando a assinatura não é reconhecida.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(512)
+
+    if head.startswith((b'PK\x03\x04', b'PK\x05\x06')):
+        return 'zip'
+    if is_rar(head):
+        return 'rar'
+    if len(head) >= 262 and head[257:262] == b'ustar':
+        return 'tar'
+    return EXTENSION_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+def read_entries(file_path):
+    """
+    Lista as entradas de um arquivo de qualquer formato suportado
+
+    Retorna (formato, [(nome, tamanho)], sólido) ou (None, [], False).
+    """
+    archive_format = detect_format(file_path)
+
+    if archive_format == 'zip':
+        return archive_format, list_zip_entries(file_path), False
+    if archive_format == 'tar':
+        return archive_format, list_tar_entries(file_path), False
+    if archive_format == 'rar':
+        entries, solid = list_rar_entries(file_path)
+        return archive_format, entries, solid
+    return None, [], False
+
+def summarize_entries(archive_format, entries, solid=False):
+    """Resume a lista de entradas: páginas, tamanho total, capa e ComicInfo.xml"""
+    pages = sorted((name for name, _ in entries if is_page(name)), key=natural_key)
+    return {
+        'archive_format': archive_format,
+        'entry_count': len(entries),
+        'page_count': len(pages),
+        'uncompressed_size': sum(size for _, size in entries),
+        'first_image': pages[0] if pages else None,
+        'has_comicinfo': any(os.path.basename(name).lower() == COMICINFO_NAME for name, _ in entries),
+        'is_solid': solid,
+    }
+
+def inspect_archive(file_path):
+    """
+    Inspeciona um CBZ/CBT/CBR sem extrair nenhuma página
+
+    Retorna um dicionário (ver summarize_entries) ou None se o formato
+    não é suportado. Erros de leitura propagam como exceção.
+    """
+    if os.path.splitext(file_path)[1].lower() not in ARCHIVE_EXTENSIONS:
+        return None
+
+    archive_format, entries, solid = read_entries(file_path)
+    if archive_format is None:
+        return None
+    return summarize_entries(archive_format, entries, solid)
+
+# Ferramentas externas (opcionais) para entradas RAR comprimidas
+RAR_EXTRACT_COMMANDS = [
+    ('unrar', lambda path, name: ['unrar', 'p', '-inul', '--', path, name]),
+    ('bsdtar', lambda path, name: ['bsdtar', '-xOf', path, '--', name]),
+    ('7z', lambda path, name: ['7z', 'e', '-so', '--', path, name]),
+]
+
+def _read_rar_entry(file_path, entry_name):
+    """Lê direto do disco se a entrada não é comprimida; senão usa unrar/bsdtar/7z"""
+    listing = list_rar(file_path)
+    entry = next((e for e in listing.entries if e.name == entry_name), None)
+    if entry is None:
+        raise KeyError(entry_name)
+
+    if entry.is_stored and not entry.is_encrypted and not entry.is_split:
+        return read_stored_entry(file_path, entry)
+
+    for tool, command in RAR_EXTRACT_COMMANDS:
+        if shutil.which(tool):
+            result = subprocess.run(command(file_path, entry_name), capture_output=True, timeout=120)
+            if result.returncode == 0 and result.stdout:
+                return result.stdout
+    raise RarError('Entrada RAR comprimida: instale unrar, bsdtar ou 7z')
+
+def read_entry(file_path, entry_name):
+    """Extrai uma única entrada (ex.: a capa) para a memória"""
+    archive_format = detect_format(file_path)
+
+    if archive_format == 'zip':
+        with zipfile.ZipFile(file_path) as zf:
+            return zf.read(entry_name)
+    if archive_format == 'tar':
+        with tarfile.open(file_path, 'r:*') as tf:
+            member = tf.extractfile(entry_name)
+            if member is None:
+                raise KeyError(entry_name)
+            return member.read()
+    if archive_format == 'rar':
+        return _read_rar_entry(file_path, entry_name)
+    raise ValueError(f'Formato não suportado: {file_path}')
+
+def _inspect_job(item):
+    """Executado nos processos do pool; nunca levanta exceção"""
+    file_path, file_size, file_mtime = item
+    try:
+        return file_path, file_size, file_mtime, inspect_archive(file_path), None
+    except Exception as e:
+        return file_path, file_size, file_mtime, None, f"{type(e).__name__}: {e}"
+
+def inspect_many(items, workers=None):
+    """
+    Inspeciona vários arquivos em um pool de processos
+
+    items: lista de (caminho, tamanho, mtime)
+    Gera (caminho, tamanho, mtime, info, erro) na mesma ordem.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(items) // (workers * 4) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_inspect_job, items, chunksize=chunksize)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Comic Benchmark - Mede identificação e enriquecimento contra o servidor simulado
+Monta uma biblioteca sintética (100 mil arquivos por padrão), aponta identifier e
+enricher para o comic_mock_server.py e mede vazão e requisições por comic
+"""
+
+import contextlib
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import comic_enricher
+import comic_identifier
+import comic_rate_limit
+from comic_mock_server import SyntheticCatalog, MockComicVine, start_server, DEFAULT_VOLUMES, DEFAULT_SEED
+from comic_scanner import create_database
+
+DEFAULT_FILES = 100000
+UNKNOWN_RATE = 0.03   # Títulos que não existem no catálogo (viram not_found)
+NO_YEAR_RATE = 0.2    # Arquivos sem ano no nome
+INSERT_BATCH = 5000
+
+def build_library(db_path, catalog, files=DEFAULT_FILES, seed=DEFAULT_SEED):
+    """
+    Cria um banco de inventário com arquivos sintéticos tirados do catálogo
+
+    Séries populares aparecem muito mais (distribuição de cauda longa),
+    como numa biblioteca real. Retorna o número de linhas criadas.
+    """
+    rng = random.Random(seed)
+    conn = create_database(db_path)
+    cursor = conn.cursor()
+
+    volumes = list(catalog.volumes.values())
+    rng.shuffle(volumes)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(volumes))))
+
+    rows = []
+    for index in range(files):
+        if rng.random() < UNKNOWN_RATE:
+            title = f"Unknown Title {rng.randint(1, max(1, files // 50))}"
+            issue_number = str(rng.randint(1, 40))
+            year = None
+            publisher = 'Unknown'
+        else:
+            volume = rng.choices(volumes, cum_weights=cum_weights)[0]
+            title = volume['name']
+            issue_number = str(rng.randint(1, volume['count_of_issues']))
+            if rng.random() < 0.5:
+                issue_number = issue_number.zfill(3)
+            year = volume['start_year'] if rng.random() >= NO_YEAR_RATE else None
+            publisher = volume['publisher']['name']
+
+        file_name = f"{title} {issue_number}" + (f" ({year})" if year else "") + ".cbz"
+        file_path = f"/synthetic/{publisher}/{title}/{index:07d} {file_name}"
+        rows.append((file_path, file_name, rng.randint(10, 80) * 1024 * 1024, '.cbz',
+                     title, issue_number, year))
+
+        if len(rows) >= INSERT_BATCH:
+            cursor.executemany('''
+                INSERT INTO comics (file_path, file_name, file_size, file_ext, clean_title, issue_number, year)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            rows = []
+
+    cursor.executemany('''
+        INSERT INTO comics (file_path, file_name, file_size, file_ext, clean_title, issue_number, year)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+    return files
+
+def count_rows(db_path, where):
+    conn = sqlite3.connect(db_path)
+    count = conn.execute(f"SELECT COUNT(*) FROM comics WHERE {where}").fetchone()[0]
+    conn.close()
+    return count
+
+def run_phase(name, mock, func, quiet=True):
+    """Roda uma fase medindo tempo e requisições feitas ao servidor"""
+    mock.reset_counts()
+    start = time.time()
+    if quiet:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            func()
+    else:
+        func()
+    elapsed = time.time() - start
+    return {
+        'name': name,
+        'seconds': elapsed,
+        'requests': mock.total_requests(),
+        'counts': dict(mock.counts),
+        'failures': mock.failures,
+    }
+
+def print_results(results):
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO DO BENCHMARK:")
+    print("=" * 70)
+    print(f"   {'Fase':<22}{'Comics':>9}{'Tempo':>10}{'Comics/s':>11}{'Requisições':>13}{'Req/comic':>11}")
+    for result in results:
+        comics = result['comics']
+        rate = comics / result['seconds'] if result['seconds'] > 0 else 0
+        per_comic = result['requests'] / comics if comics else 0
+        print(f"   {result['name']:<22}{comics:>9}{result['seconds']:>9.1f}s{rate:>11.1f}"
+              f"{result['requests']:>13}{per_comic:>11.3f}")
+    print()
+    for result in results:
+        detail = ', '.join(f"{endpoint}: {count}" for endpoint, count in sorted(result['counts'].items()))
+        failures = f" | 420 injetados: {result['failures']}" if result['failures'] else ""
+        print(f"   • {result['name']}: {detail or 'nenhuma requisição'}{failures}")
+    print("=" * 70)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de identifier/enricher contra o servidor simulado')
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES,
+                       help=f'Arquivos na biblioteca sintética (padrão: {DEFAULT_FILES})')
+    parser.add_argument('--volumes', type=int, default=DEFAULT_VOLUMES,
+                       help=f'Volumes no catálogo (padrão: {DEFAULT_VOLUMES})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Semente da biblioteca e do catálogo')
+    parser.add_argument('--workdir', help='Pasta do banco (padrão: pasta temporária nova)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência simulada por requisição (s)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fração de respostas 420 injetadas')
+    parser.add_argument('--delay', type=float, default=0.0,
+                       help='REQUEST_DELAY usado pelas ferramentas (padrão: 0, sem espera)')
+    parser.add_argument('--retry-delay', type=float, default=0.5,
+                       help='RETRY_DELAY após 420 (padrão: 0.5s em vez de 5s)')
+    parser.add_argument('--hourly-limit', action='store_true',
+                       help='Aplica o limite real de 200 requisições/hora por recurso')
+    parser.add_argument('--enrich-limit', type=int,
+                       help='Limita o enriquecimento completo a N comics')
+    parser.add_argument('--skip-enrich', action='store_true', help='Mede só a identificação')
+    parser.add_argument('--with-cache', action='store_true', help='Usa o cache HTTP (padrão: desligado)')
+    parser.add_argument('--verbose', action='store_true', help='Mostra a saída das ferramentas')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  ⏱️  COMIC BENCHMARK")
+    print("=" * 70)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='comic-benchmark-')
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, 'comics_inventory.db')
+    if os.path.exists(db_path):
+        print(f"\n❌ Já existe um banco em {db_path} (use outra --workdir)")
+        sys.exit(1)
+
+    # Servidor simulado e ferramentas apontando para ele
+    catalog = SyntheticCatalog(volumes=args.volumes, seed=args.seed)
+    mock = MockComicVine(catalog, latency=args.latency, fail_rate=args.fail_rate, seed=args.seed)
+    server, base_url = start_server(mock)
+
+    for module in (comic_identifier, comic_enricher):
+        module.BASE_URL = base_url
+        module.API_KEY = module.API_KEY or 'benchmark'
+        module.REQUEST_DELAY = args.delay
+        module.RETRY_DELAY = args.retry_delay
+    if not args.hourly_limit:
+        comic_rate_limit.HOURLY_LIMIT = 10 ** 9
+
+    print(f"\n📚 Catálogo: {len(catalog.volumes)} volumes | servidor em {base_url}")
+    print(f"🏗️  Montando biblioteca sintética com {args.files} arquivos...", end='', flush=True)
+    start = time.time()
+    build_library(db_path, catalog, files=args.files, seed=args.seed)
+    print(f" ✓ ({time.time() - start:.1f}s)")
+    print(f"   Banco: {db_path}")
+
+    use_cache = args.with_cache
+    quiet = not args.verbose
+    results = []
+
+    print("\n🔍 Identificando...", flush=True)
+    result = run_phase('identificação', mock,
+                       lambda: comic_identifier.process_comics(db_path, use_cache=use_cache), quiet)
+    result['comics'] = args.files
+    results.append(result)
+    identified = count_rows(db_path, "status = 'identified'")
+    with_issue = count_rows(db_path, "comicvine_issue_id IS NOT NULL")
+    print(f"   ✓ {identified} identificados, {with_issue} com edição ({result['seconds']:.1f}s)")
+
+    if not args.skip_enrich:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            comic_enricher.upgrade_database(db_path)
+
+        print("📚 Enriquecimento básico...", flush=True)
+        result = run_phase('enriquecimento básico', mock,
+                           lambda: comic_enricher.enrich_basic(db_path, use_cache=use_cache), quiet)
+        result['comics'] = with_issue
+        results.append(result)
+
+        to_enrich = with_issue if not args.enrich_limit else min(args.enrich_limit, with_issue)
+        print(f"📚 Enriquecimento completo ({to_enrich} comics)...", flush=True)
+        result = run_phase('enriquecimento completo', mock,
+                           lambda: comic_enricher.enrich_comics(db_path, limit=args.enrich_limit,
+                                                                use_cache=use_cache), quiet)
+        result['comics'] = to_enrich
+        results.append(result)
+
+    server.shutdown()
+    print_results(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Comic Cover Downloader - Baixa as capas do Comic Vine (cover_url) para o disco
+Cada imagem é guardada pelo hash do conteúdo, com gravação atômica, junto com as
+versões thumbnail/medium servidas por GET /api/covers/:id/:size.jpg
+"""
+
+import sqlite3
+import hashlib
+import io
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from comic_covers import write_atomic
+from comic_rate_limit import RateLimiter
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # Opcional: sem Pillow só a imagem original é guardada
+
+USER_AGENT = "ComicCoverDownloader/1.0"
+DEFAULT_WORKERS = 4
+
+# Limite próprio para as imagens (arquivo separado do limitador da API,
+# para não disputar o espaçamento de 2s das requisições de dados)
+IMAGE_LIMITER_FILENAME = 'comicvine_images_ratelimit.db'
+IMAGE_HOURLY_LIMIT = 3600
+IMAGE_MIN_INTERVAL = 0.25
+
+MAX_RETRIES = 3          # Tentativas por capa na mesma execução (420/429/5xx)
+RETRY_DELAY = 5.0
+MAX_ATTEMPTS = 3         # Execuções com erro antes de desistir (--retry-errors ignora)
+REQUEST_TIMEOUT = 30
+COMMIT_EVERY = 50
+
+# Tamanhos derivados (caixa máxima); 'original' é a imagem baixada
+SIZES = {
+    'thumbnail': (150, 225),
+    'medium': (400, 600),
+}
+JPEG_QUALITY = 85
+
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF8', '.gif'),
+]
+
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+def default_download_dir(db_path):
+    """Pasta padrão: covers/remote ao lado do banco"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'covers', 'remote')
+
+def create_download_tables(conn):
+    """Cria as tabelas de imagens (por hash) e de URLs baixadas"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cover_images (
+            sha256 TEXT PRIMARY KEY,
+            ext TEXT NOT NULL,
+            size_bytes INTEGER,
+            sizes TEXT,
+            created_at REAL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cover_downloads (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER DEFAULT 0,
+            error_message TEXT,
+            fetched_at REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_cover_downloads_sha ON cover_downloads(sha256)')
+    conn.commit()
+
+def image_ext(data):
+    """Extensão pela assinatura dos bytes"""
+    for signature, ext in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+def image_path(covers_dir, size, sha256, ext):
+    """covers/remote/<tamanho>/<sha[:2]>/<sha><ext>"""
+    return os.path.join(covers_dir, size, sha256[:2], sha256 + ext)
+
+def derive_sizes(data):
+    """Versões reduzidas em JPEG ({tamanho: bytes}); vazio sem Pillow"""
+    if Image is None:
+        return {}
+    derived = {}
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert('RGB')
+            for size, box in SIZES.items():
+                copy = image.copy()
+                copy.thumbnail(box)
+                output = io.BytesIO()
+                copy.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+                derived[size] = output.getvalue()
+    except Exception:
+        return {}
+    return derived
+
+def store_image(covers_dir, data):
+    """
+    Grava a imagem pelo hash (se ainda não existe) e as versões derivadas
+
+    Retorna (sha256, extensão, bytes, tamanhos derivados). Duas URLs com a mesma
+    imagem ocupam o disco uma vez só.
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    ext = image_ext(data)
+    if ext is None:
+        raise ValueError('Resposta não é uma imagem')
+
+    original = image_path(covers_dir, 'original', sha256, ext)
+    if not os.path.exists(original):
+        write_atomic(original, data)
+
+    sizes = [size for size in SIZES if os.path.exists(image_path(covers_dir, size, sha256, '.jpg'))]
+    if len(sizes) < len(SIZES):
+        for size, body in derive_sizes(data).items():
+            if size not in sizes:
+                write_atomic(image_path(covers_dir, size, sha256, '.jpg'), body)
+                sizes.append(size)
+    return sha256, ext, len(data), sorted(sizes)
+
+class CoverDownloader:
+    """
+    Baixa imagens com uma sessão HTTP compartilhada pelas threads
+
+    O pool de conexões tem o tamanho do número de workers, então cada
+    thread reaproveita a sua conexão keep-alive. Toda requisição passa
+    pelo limitador de imagens antes de sair.
+    """
+
+    def __init__(self, covers_dir, limiter=None, workers=DEFAULT_WORKERS):
+        self.covers_dir = covers_dir
+        self.limiter = limiter
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        """
+        Baixa e grava uma capa
+
+        Retorna (status, (sha256, ext, bytes, tamanhos) ou None, mensagem), com
+        status 'done', 'missing' (404/410, não adianta tentar de novo) ou 'error'.
+        """
+        error = None
+        for attempt in range(MAX_RETRIES):
+            try:
+                if self.limiter:
+                    self.limiter.acquire('images')
+                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+
+                if response.status_code in (404, 410):
+                    return 'missing', None, f"HTTP {response.status_code}"
+                if response.status_code in (420, 429, 503):
+                    wait_time = RETRY_DELAY * (2 ** attempt)
+                    if self.limiter:
+                        self.limiter.penalize('images', wait_time)
+                    else:
+                        time.sleep(wait_time)
+                    error = f"HTTP {response.status_code}"
+                    continue
+
+                response.raise_for_status()
+                data = response.content
+                with self._lock:
+                    self.bytes_downloaded += len(data)
+                return 'done', store_image(self.covers_dir, data), None
+
+            except (requests.exceptions.RequestException, ValueError, OSError) as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt < MAX_RETRIES - 1:
+                    time.sleep(2 ** attempt)
+        return 'error', None, error
+
+    def close(self):
+        self.session.close()
+
+def open_image_limiter(db_path, min_interval=IMAGE_MIN_INTERVAL):
+    """Limitador das imagens, ao lado do banco"""
+    path = os.path.join(os.path.dirname(os.path.abspath(db_path)), IMAGE_LIMITER_FILENAME)
+    return RateLimiter(path, hourly_limit=IMAGE_HOURLY_LIMIT, min_interval=min_interval)
+
+def _save_results(conn, results):
+    """Grava um lote de (url, status, imagem, mensagem)"""
+    now = time.time()
+    images = []
+    downloads = []
+    for url, status, image, message in results:
+        sha256 = None
+        if image:
+            sha256, ext, size_bytes, sizes = image
+            images.append((sha256, ext, size_bytes, ','.join(sizes), now))
+        downloads.append((url, sha256, status, message, now))
+
+    conn.executemany('''
+        INSERT INTO cover_images (sha256, ext, size_bytes, sizes, created_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(sha256) DO UPDATE SET sizes = excluded.sizes
+    ''', images)
+    conn.executemany('''
+        INSERT INTO cover_downloads (url, sha256, status, attempts, error_message, fetched_at)
+        VALUES (?, ?, ?, 1, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            sha256 = COALESCE(excluded.sha256, sha256),
+            status = excluded.status,
+            attempts = attempts + 1,
+            error_message = excluded.error_message,
+            fetched_at = excluded.fetched_at
+    ''', downloads)
+    conn.commit()
+
+def download_covers(db_path, covers_dir=None, workers=DEFAULT_WORKERS, limit=None,
+                    retry_errors=False, min_interval=IMAGE_MIN_INTERVAL):
+    """
+    Baixa as capas (cover_url) dos comics identificados que ainda faltam
+
+    Várias threads baixam ao mesmo tempo, dentro do limite de imagens; a
+    thread principal grava o resultado a cada COMMIT_EVERY capas. Uma
+    execução interrompida continua de onde parou: URLs já baixadas são
+    puladas e arquivos só aparecem completos (gravação atômica).
+    """
+    covers_dir = covers_dir or default_download_dir(db_path)
+    conn = sqlite3.connect(db_path)
+    create_download_tables(conn)
+    cursor = conn.cursor()
+
+    query = '''
+        SELECT DISTINCT c.cover_url
+        FROM comics c
+        LEFT JOIN cover_downloads d ON d.url = c.cover_url
+        WHERE c.status = 'identified'
+          AND c.cover_url IS NOT NULL AND c.cover_url != ''
+    '''
+    if retry_errors:
+        query += " AND (d.url IS NULL OR d.status != 'done')"
+    else:
+        query += f" AND (d.url IS NULL OR (d.status = 'error' AND d.attempts < {MAX_ATTEMPTS}))"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    cursor.execute(query)
+    urls = [row[0] for row in cursor.fetchall()]
+
+    if not urls:
+        print("\n✅ Todas as capas já foram baixadas!")
+        conn.close()
+        return 0, 0
+
+    print(f"\n🖼️  Baixando {len(urls)} capas com {workers} conexões")
+    print(f"   Pasta: {covers_dir}")
+    if Image is None:
+        print("   ℹ️  Pillow não instalado - só a imagem original é guardada (sem thumbnail/medium)")
+    print("=" * 70)
+
+    limiter = open_image_limiter(db_path, min_interval=min_interval)
+    downloader = CoverDownloader(covers_dir, limiter=limiter, workers=workers)
+    stop = threading.Event()
+
+    def task(url):
+        if stop.is_set():
+            return None
+        return downloader.fetch(url)
+
+    start_time = time.time()
+    counts = {'done': 0, 'missing': 0, 'error': 0}
+    pending = []
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='comic-cover')
+    try:
+        futures = {executor.submit(task, url): url for url in urls}
+        for index, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if result is None:
+                continue
+            status, image, message = result
+            counts[status] += 1
+            pending.append((futures[future], status, image, message))
+            if status == 'error' and counts['error'] <= 10:
+                print(f"\n  ⚠️  {futures[future]}: {message}")
+
+            if len(pending) >= COMMIT_EVERY:
+                _save_results(conn, pending)
+                pending = []
+                elapsed = time.time() - start_time
+                print(f"  ✓ {index}/{len(urls)} ({index / elapsed:.1f}/s)...", end='\r')
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrompido: gravando as capas já baixadas...")
+        stop.set()
+        raise
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        _save_results(conn, pending)
+        downloader.close()
+        limiter.close()
+        conn.close()
+
+    elapsed = time.time() - start_time
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO:")
+    print(f"   • Capas baixadas: {counts['done']}")
+    print(f"   • Não existem mais (404): {counts['missing']}")
+    print(f"   • Erros (tentadas de novo na próxima execução): {counts['error']}")
+    print(f"   • Transferido: {downloader.bytes_downloaded / (1024*1024):.1f} MB")
+    print(f"   • Tempo total: {int(elapsed/60)}min {int(elapsed%60)}s")
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    print("=" * 70)
+
+    return counts['done'], counts['error']
+
+def cover_path(conn, covers_dir, comic_id, size='medium'):
+    """
+    Capa baixada de um comic no tamanho pedido: (caminho, content type) ou None
+
+    É a consulta que o backend faz para GET /api/covers/:id/:size.jpg.
+    Sem a versão derivada (Pillow ausente), devolve a original - que pode
+    ser PNG, GIF ou WebP, por isso o content type vem junto.
+    """
+    row = conn.execute('''
+        SELECT i.sha256, i.ext, i.sizes
+        FROM comics c
+        JOIN cover_downloads d ON d.url = c.cover_url AND d.status = 'done'
+        JOIN cover_images i ON i.sha256 = d.sha256
+        WHERE c.id = ?
+    ''', (comic_id,)).fetchone()
+    if not row:
+        return None
+
+    sha256, ext, sizes = row
+    candidates = []
+    if size in SIZES and size in (sizes or '').split(','):
+        candidates.append((image_path(covers_dir, size, sha256, '.jpg'), '.jpg'))
+    candidates.append((image_path(covers_dir, 'original', sha256, ext), ext))
+    for path, path_ext in candidates:
+        if os.path.exists(path):
+            return path, CONTENT_TYPES[path_ext]
+    return None
+
+def show_stats(conn, covers_dir):
+    """Mostra o andamento dos downloads"""
+    create_download_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT COUNT(DISTINCT cover_url) FROM comics
+        WHERE status = 'identified' AND cover_url IS NOT NULL AND cover_url != ''
+    ''')
+    wanted = cursor.fetchone()[0]
+    cursor.execute('SELECT status, COUNT(*) FROM cover_downloads GROUP BY status')
+    by_status = dict(cursor.fetchall())
+    cursor.execute('SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cover_images')
+    images, total = cursor.fetchone()
+
+    print("\n📊 CAPAS BAIXADAS DO COMIC VINE")
+    print("=" * 70)
+    print(f"   Pasta: {covers_dir}")
+    print(f"   URLs de capa: {wanted}")
+    print(f"   • Baixadas: {by_status.get('done', 0)}")
+    print(f"   • Não existem mais (404): {by_status.get('missing', 0)}")
+    print(f"   • Com erro: {by_status.get('error', 0)}")
+    print(f"   Imagens distintas: {images} ({total / (1024*1024):.1f} MB originais)")
+    print("=" * 70)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Baixa as capas do Comic Vine (cover_url) para o disco')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+    parser.add_argument('--download', action='store_true', help='Baixa as capas que faltam')
+    parser.add_argument('--dir', help='Pasta das capas (padrão: covers/remote ao lado do banco)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Downloads simultâneos (padrão: {DEFAULT_WORKERS})')
+    parser.add_argument('--min-interval', type=float, default=IMAGE_MIN_INTERVAL,
+                       help=f'Segundos entre downloads (padrão: {IMAGE_MIN_INTERVAL})')
+    parser.add_argument('--limit', type=int, help='Limita número de capas a baixar')
+    parser.add_argument('--retry-errors', action='store_true',
+                       help='Tenta de novo todas as capas com erro ou 404')
+    parser.add_argument('--path', type=int, metavar='ID', help='Mostra o arquivo da capa de um comic')
+    parser.add_argument('--size', choices=['thumbnail', 'medium', 'original'], default='medium',
+                       help='Tamanho para --path (padrão: medium)')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  🖼️  COMIC COVER DOWNLOADER")
+    print("=" * 70)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    covers_dir = args.dir or default_download_dir(args.db)
+
+    if args.download:
+        try:
+            download_covers(args.db, covers_dir, workers=args.workers, limit=args.limit,
+                            retry_errors=args.retry_errors, min_interval=args.min_interval)
+        except KeyboardInterrupt:
+            print("💾 Capas já baixadas foram gravadas; rode de novo para continuar")
+            sys.exit(130)
+        return
+
+    conn = sqlite3.connect(args.db)
+    create_download_tables(conn)
+    if args.path:
+        cover = cover_path(conn, covers_dir, args.path, args.size)
+        if cover:
+            print(f"\n{cover[0]} ({cover[1]})")
+        else:
+            print(f"\n❌ Capa do comic {args.path} ainda não baixada")
+    else:
+        show_stats(conn, covers_dir)
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Comic Covers - Cache local de capas extraídas dos próprios arquivos
+A capa (primeira imagem do CBZ/CBT/CBR) é guardada pela impressão digital do arquivo
+"""
+
+import sqlite3
+import io
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from comic_archive import read_entry
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # Opcional: sem Pillow a capa é guardada como está no arquivo
+
+DEFAULT_BUDGET_MB = 2048
+COVER_MAX_SIZE = (800, 1200)  # Maior que o tamanho "medium" da API
+COVER_JPEG_QUALITY = 85
+BATCH_SIZE = 200
+
+def default_cache_dir(db_path):
+    """Pasta padrão do cache: covers/archive ao lado do banco"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'covers', 'archive')
+
+def create_cover_table(conn):
+    """Cria a tabela de controle do cache (tamanho e último acesso)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cover_cache (
+            fingerprint TEXT PRIMARY KEY,
+            rel_path TEXT NOT NULL,
+            size_bytes INTEGER,
+            source_entry TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_access REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_cover_last_access ON cover_cache(last_access)')
+    conn.commit()
+
+def write_atomic(path, data):
+    """Grava em arquivo temporário e renomeia (nunca deixa capa pela metade)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def encode_cover(data, entry_name):
+    """
+    Reduz a capa para JPEG quando o Pillow está disponível
+
+    Retorna (bytes, extensão). Sem Pillow (ou imagem ilegível para ele)
+    a imagem original é mantida.
+    """
+    if Image is not None:
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image = image.convert('RGB')
+                image.thumbnail(COVER_MAX_SIZE)
+                output = io.BytesIO()
+                image.save(output, 'JPEG', quality=COVER_JPEG_QUALITY, optimize=True)
+                return output.getvalue(), '.jpg'
+        except Exception:
+            pass
+    ext = os.path.splitext(entry_name)[1].lower() or '.img'
+    return data, ext
+
+def _extract_job(item):
+    """Executado nos processos do pool: extrai, reduz e grava uma capa"""
+    fingerprint, file_path, entry_name, cache_dir = item
+    try:
+        data, ext = encode_cover(read_entry(file_path, entry_name), entry_name)
+        rel_path = os.path.join(fingerprint[:2], fingerprint + ext)
+        write_atomic(os.path.join(cache_dir, rel_path), data)
+        return fingerprint, rel_path, len(data), entry_name, None
+    except Exception as e:
+        return fingerprint, None, 0, entry_name, f"{type(e).__name__}: {e}"
+
+def evict(conn, cache_dir, budget_bytes):
+    """
+    Remove as capas acessadas há mais tempo até caber no orçamento (LRU)
+
+    Retorna a lista de fingerprints removidas.
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM cover_cache')
+    total = cursor.fetchone()[0]
+    if total <= budget_bytes:
+        return []
+
+    evicted = []
+    cursor.execute('SELECT fingerprint, rel_path, size_bytes FROM cover_cache ORDER BY last_access')
+    for fingerprint, rel_path, size_bytes in cursor.fetchall():
+        if total <= budget_bytes:
+            break
+        try:
+            os.unlink(os.path.join(cache_dir, rel_path))
+        except FileNotFoundError:
+            pass
+        evicted.append(fingerprint)
+        total -= size_bytes or 0
+
+    conn.executemany('DELETE FROM cover_cache WHERE fingerprint = ?', [(fp,) for fp in evicted])
+    conn.commit()
+    return evicted
+
+def get_cover(conn, cache_dir, fingerprint):
+    """
+    Caminho da capa em cache (ou None) - marca o acesso para o LRU
+
+    É a consulta que o backend faz para servir /api/covers sem rede.
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT rel_path FROM cover_cache WHERE fingerprint = ?', (fingerprint,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    path = os.path.join(cache_dir, row[0])
+    if not os.path.exists(path):
+        cursor.execute('DELETE FROM cover_cache WHERE fingerprint = ?', (fingerprint,))
+        conn.commit()
+        return None
+
+    cursor.execute('UPDATE cover_cache SET last_access = ? WHERE fingerprint = ?', (time.time(), fingerprint))
+    conn.commit()
+    return path
+
+def extract_covers(conn, cache_dir, budget_mb=DEFAULT_BUDGET_MB, workers=None, limit=None):
+    """
+    Extrai em lote as capas que ainda não estão no cache
+
+    Usa a primeira imagem registrada em archive_info (comic_scanner) e
+    grava uma capa por impressão digital - cópias do mesmo arquivo
+    compartilham a mesma capa.
+    """
+    create_cover_table(conn)
+    cursor = conn.cursor()
+    budget_bytes = budget_mb * 1024 * 1024
+
+    query = '''
+        SELECT c.fingerprint, MIN(c.file_path), a.first_image
+        FROM comics c
+        JOIN archive_info a ON a.file_path = c.file_path
+        LEFT JOIN cover_cache cc ON cc.fingerprint = c.fingerprint
+        WHERE c.fingerprint IS NOT NULL
+          AND a.first_image IS NOT NULL
+          AND a.error_message IS NULL
+          AND cc.fingerprint IS NULL
+        GROUP BY c.fingerprint
+    '''
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    cursor.execute(query)
+    pending = [(fp, path, entry, cache_dir) for fp, path, entry in cursor.fetchall()]
+
+    if not pending:
+        print("\n✅ Todas as capas já estão no cache!")
+        return 0, 0
+
+    print(f"\n🖼️  Extraindo capas: {len(pending)} arquivos")
+    print(f"   Cache: {cache_dir} (orçamento: {budget_mb} MB)")
+    if Image is None:
+        print("   ℹ️  Pillow não instalado - capas guardadas no tamanho original")
+    print("=" * 70)
+
+    start_time = time.time()
+    extracted = 0
+    errors = 0
+    this_run = set()
+    workers = workers or os.cpu_count() or 1
+
+    # Processa em lotes: cada lote é gravado no banco e passa pelo LRU
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i in range(0, len(pending), BATCH_SIZE):
+            batch = pending[i:i + BATCH_SIZE]
+            rows = []
+            for fingerprint, rel_path, size, entry_name, error in executor.map(_extract_job, batch, chunksize=8):
+                if error:
+                    errors += 1
+                    if errors <= 10:
+                        print(f"\n  ⚠️  {fingerprint[:12]}: {error}")
+                    continue
+                rows.append((fingerprint, rel_path, size, entry_name, time.time()))
+                this_run.add(fingerprint)
+
+            _save_cover_rows(conn, rows)
+            extracted += len(rows)
+            elapsed = time.time() - start_time
+            print(f"  ✓ {extracted} capas ({extracted / elapsed:.1f}/s)...", end='\r')
+
+            # Se o LRU precisou descartar capas desta execução, o orçamento acabou
+            if this_run & set(evict(conn, cache_dir, budget_bytes)):
+                print("\n  ⚠️  Orçamento do cache cheio - aumente --budget-mb")
+                break
+
+    elapsed = time.time() - start_time
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO:")
+    print(f"   • Capas extraídas: {extracted}")
+    print(f"   • Erros: {errors}")
+    print(f"   • Tempo total: {int(elapsed/60)}min {int(elapsed%60)}s")
+    print("=" * 70)
+
+    return extracted, errors
+
+def _save_cover_rows(conn, rows):
+    conn.executemany('''
+        INSERT OR REPLACE INTO cover_cache
+        (fingerprint, rel_path, size_bytes, source_entry, last_access)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+def show_cache_stats(conn, cache_dir, budget_mb):
+    """Mostra o uso do cache de capas"""
+    create_cover_table(conn)
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cover_cache')
+    count, total = cursor.fetchone()
+
+    print("\n📊 CACHE DE CAPAS")
+    print("=" * 70)
+    print(f"   Pasta: {cache_dir}")
+    print(f"   Capas: {count}")
+    print(f"   Uso: {total / (1024*1024):.1f} MB de {budget_mb} MB")
+    print("=" * 70)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cache local de capas extraídas dos arquivos')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+    parser.add_argument('--extract-covers', action='store_true', help='Extrai as capas que faltam no cache')
+    parser.add_argument('--cache-dir', help='Pasta do cache (padrão: covers/archive ao lado do banco)')
+    parser.add_argument('--budget-mb', type=int, default=DEFAULT_BUDGET_MB,
+                       help=f'Tamanho máximo do cache em MB (padrão: {DEFAULT_BUDGET_MB})')
+    parser.add_argument('--workers', type=int, help='Processos para extração (padrão: nº de CPUs)')
+    parser.add_argument('--limit', type=int, help='Limita número de capas a extrair')
+    parser.add_argument('--stats', action='store_true', help='Mostra o uso do cache')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  🖼️  COMIC COVERS - Cache de Capas")
+    print("=" * 70)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    cache_dir = args.cache_dir or default_cache_dir(args.db)
+    conn = sqlite3.connect(args.db)
+
+    if args.extract_covers:
+        extract_covers(conn, cache_dir, budget_mb=args.budget_mb, workers=args.workers, limit=args.limit)
+    elif args.stats:
+        show_cache_stats(conn, cache_dir, args.budget_mb)
+    else:
+        parser.print_help()
+
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Comic Credits - Pessoas, personagens, equipes e arcos normalizados por id do Comic Vine
+Cada entidade fica numa tabela própria e as edições apontam para ela por tabelas de ligação
+indexadas, então "tudo do Grant Morrison" não precisa varrer texto com LIKE
+"""
+
+import sqlite3
+import os
+import sys
+
+# Tabela da entidade -> (coluna id, tabela de ligação, campo da API)
+ENTITY_KINDS = {
+    'persons': ('person_id', 'issue_persons', 'person_credits'),
+    'characters': ('character_id', 'issue_characters', 'character_credits'),
+    'teams': ('team_id', 'issue_teams', 'team_credits'),
+    'story_arcs': ('story_arc_id', 'issue_story_arcs', 'story_arc_credits'),
+}
+
+def split_roles(role):
+    """'Writer, Penciler' -> ['writer', 'penciler']"""
+    roles = [part.strip().lower() for part in (role or '').split(',')]
+    return [r for r in roles if r] or ['other']
+
+def create_credit_tables(conn):
+    """Cria as tabelas de entidades e de ligação com as edições"""
+    cursor = conn.cursor()
+    for table, (id_column, link_table, _) in ENTITY_KINDS.items():
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {id_column} INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                site_detail_url TEXT
+            )
+        ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_name ON {table}(name COLLATE NOCASE)')
+
+        # Pessoas têm uma linha por função (roteiro, lápis...)
+        role_column = 'role TEXT NOT NULL,' if table == 'persons' else ''
+        role_key = ', role' if table == 'persons' else ''
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {link_table} (
+                issue_id INTEGER NOT NULL,
+                {id_column} INTEGER NOT NULL,
+                {role_column}
+                PRIMARY KEY (issue_id, {id_column}{role_key})
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{link_table}_entity
+            ON {link_table}({id_column}{role_key}, issue_id)
+        ''')
+
+    # Ligação com os arquivos: comics.comicvine_issue_id
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comicvine_issue ON comics(comicvine_issue_id)')
+    conn.commit()
+
+def extract_credits(issue):
+    """
+    Entidades de uma resposta issue/4000-x da API
+
+    Retorna {tabela: [(id, nome, url, função)]}; a função só vale para
+    persons (uma entrada por função), nas outras é None.
+    """
+    credits = {}
+    for table, (_, _, api_field) in ENTITY_KINDS.items():
+        entries = []
+        seen = set()
+        for credit in issue.get(api_field) or []:
+            if not credit.get('id') or not credit.get('name'):
+                continue
+            roles = split_roles(credit.get('role')) if table == 'persons' else [None]
+            for role in roles:
+                if (credit['id'], role) in seen:
+                    continue
+                seen.add((credit['id'], role))
+                entries.append((credit['id'], credit['name'], credit.get('site_detail_url'), role))
+        credits[table] = entries
+    return credits
+
+def credit_statements(issue_id, credits):
+    """Comandos (sql, linhas) que trocam as entidades gravadas de uma edição"""
+    statements = []
+    for table, (id_column, link_table, _) in ENTITY_KINDS.items():
+        entries = credits.get(table) or []
+        statements.append((f'DELETE FROM {link_table} WHERE issue_id = ?', [(issue_id,)]))
+        if not entries:
+            continue
+        statements.append((f'''
+            INSERT INTO {table} ({id_column}, name, site_detail_url) VALUES (?, ?, ?)
+            ON CONFLICT({id_column}) DO UPDATE SET
+                name = excluded.name,
+                site_detail_url = COALESCE(excluded.site_detail_url, site_detail_url)
+        ''', list({entity_id: (entity_id, name, url) for entity_id, name, url, _ in entries}.values())))
+        if table == 'persons':
+            statements.append((f'INSERT OR IGNORE INTO {link_table} (issue_id, {id_column}, role) VALUES (?, ?, ?)',
+                               [(issue_id, entity_id, role) for entity_id, _, _, role in entries]))
+        else:
+            statements.append((f'INSERT OR IGNORE INTO {link_table} (issue_id, {id_column}) VALUES (?, ?)',
+                               [(issue_id, entity_id) for entity_id, _, _, _ in entries]))
+    return statements
+
+def save_credits(cursor, issue_id, credits):
+    """Grava as entidades de uma edição (sem commit)"""
+    for sql, rows in credit_statements(issue_id, credits):
+        cursor.executemany(sql, rows)
+
+def find_entities(conn, table, name, limit=20):
+    """
+    Entidades cujo nome bate com o termo (exato primeiro, depois parcial)
+
+    Retorna [(id, nome)]; a varredura parcial é só na tabela de nomes,
+    pequena perto de comics.
+    """
+    id_column = ENTITY_KINDS[table][0]
+    exact = conn.execute(f'SELECT {id_column}, name FROM {table} WHERE name = ? COLLATE NOCASE',
+                         (name,)).fetchall()
+    if exact:
+        return exact
+    return conn.execute(f'''
+        SELECT {id_column}, name FROM {table} WHERE name LIKE ? ORDER BY name LIMIT ?
+    ''', (f'%{name}%', limit)).fetchall()
+
+def comics_for_entity(conn, table, entity_id, role=None):
+    """
+    Comics (arquivos) ligados a uma entidade, pelo índice da tabela de ligação
+
+    role filtra pessoas por função ('writer', 'penciler'...).
+    """
+    id_column, link_table, _ = ENTITY_KINDS[table]
+    query = f'''
+        SELECT DISTINCT c.id, c.volume_name, c.issue_number, c.cover_date, c.publisher
+        FROM {link_table} l
+        JOIN comics c ON c.comicvine_issue_id = l.issue_id
+        WHERE l.{id_column} = ?
+    '''
+    params = [entity_id]
+    if role and table == 'persons':
+        query += ' AND l.role LIKE ?'
+        params.append(f'{role.lower()}%')
+    query += ' ORDER BY c.volume_name, CAST(c.issue_number AS REAL), c.issue_number'
+    return conn.execute(query, params).fetchall()
+
+def top_entities(conn, table, limit=10, role=None):
+    """Entidades com mais arquivos na coleção: [(nome, arquivos)]"""
+    id_column, link_table, _ = ENTITY_KINDS[table]
+    where = ''
+    params = []
+    if role and table == 'persons':
+        where = 'WHERE l.role LIKE ?'
+        params.append(f'{role.lower()}%')
+    return conn.execute(f'''
+        SELECT e.name, COUNT(DISTINCT c.id) AS files
+        FROM {link_table} l
+        JOIN comics c ON c.comicvine_issue_id = l.issue_id
+        JOIN {table} e ON e.{id_column} = l.{id_column}
+        {where}
+        GROUP BY l.{id_column}
+        ORDER BY files DESC
+        LIMIT ?
+    ''', [*params, limit]).fetchall()
+
+def show_stats(conn):
+    """Mostra o tamanho das tabelas de créditos"""
+    print("\n📊 CRÉDITOS NORMALIZADOS")
+    print("=" * 60)
+    for table, (_, link_table, _) in ENTITY_KINDS.items():
+        entities = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        links, issues = conn.execute(f'SELECT COUNT(*), COUNT(DISTINCT issue_id) FROM {link_table}').fetchone()
+        print(f"   • {table}: {entities} entidades, {links} ligações em {issues} edições")
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tabelas normalizadas de créditos do Comic Vine')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  👥 COMIC CREDITS")
+    print("=" * 60)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    create_credit_tables(conn)
+    show_stats(conn)
+    conn.close()
+
+if __name__ == "__main__":
+    main()
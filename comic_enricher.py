@@ -6,19 +6,42 @@ Busca sinopse, autores, desenhistas, data de publicação, etc.
 
 import sqlite3
 import requests
+import json
 import time
 import sys
 import os
+import zlib
 from datetime import datetime
 
+from comic_credits import create_credit_tables, extract_credits, save_credits
+from comic_http_cache import open_cache
+from comic_rate_limit import open_limiter
+from comic_volumes import VOLUME_FIELDS, create_volume_tables, pending_volume_ids, save_volumes
+
 API_KEY = os.environ.get('COMICVINE_API_KEY')
 USER_AGENT = "ComicEnricher/1.0"
-BASE_URL = "https://comicvine.gamespot.com/api"
+# COMICVINE_BASE_URL aponta para outro servidor (ex.: comic_mock_server.py)
+BASE_URL = os.environ.get('COMICVINE_BASE_URL', "https://comicvine.gamespot.com/api")
 
 REQUEST_DELAY = 2.0
 MAX_RETRIES = 3
 RETRY_DELAY = 5.0
 
+# Edições por requisição no enriquecimento básico (máximo da API)
+BATCH_SIZE = 100
+BASIC_FIELDS = 'id,description,cover_date,store_date,image,site_detail_url'
+DETAIL_FIELDS = ('id,name,description,cover_date,store_date,person_credits,character_credits,'
+                 'team_credits,location_credits,story_arc_credits,image,site_detail_url,date_last_updated')
+UPDATED_FIELDS = 'id,date_last_updated'  # Lista barata usada por --refresh
+
+# Colunas de comics calculadas a partir da resposta completa (derive_details)
+DERIVED_COLUMNS = [
+    'description', 'cover_date', 'store_date', 'writers', 'pencilers', 'inkers',
+    'colorists', 'letterers', 'editors', 'cover_artists', 'characters', 'teams',
+    'locations', 'story_arcs', 'cover_url', 'site_detail_url', 'date_last_updated',
+]
+REDERIVE_BATCH_SIZE = 500
+
 def upgrade_database(db_path):
     """Adiciona colunas extras para metadados detalhados"""
     conn = sqlite3.connect(db_path)
@@ -42,6 +65,9 @@ def upgrade_database(db_path):
         ('story_arcs', 'TEXT'),
         ('cover_url', 'TEXT'),
         ('site_detail_url', 'TEXT'),
+        ('basic_fetched_at', 'TIMESTAMP'),
+        ('details_fetched_at', 'TIMESTAMP'),
+        ('date_last_updated', 'TEXT'),  # Do Comic Vine, na última busca completa
     ]
     
     # Verifica quais colunas já existem
@@ -57,20 +83,70 @@ def upgrade_database(db_path):
             except sqlite3.OperationalError:
                 pass  # Coluna já existe
     
+    # Bancos enriquecidos antes do controle por data: quem tem descrição
+    # já passou pelo enriquecimento completo
+    if 'details_fetched_at' not in existing_columns:
+        cursor.execute('''
+            UPDATE comics SET details_fetched_at = updated_at
+            WHERE description IS NOT NULL AND description != ''
+        ''')
+    
+    # Pessoas, personagens, equipes e arcos por id (comic_credits)
+    create_credit_tables(conn)
+    
+    # Resposta crua de cada edição, para recalcular as colunas sem a API
+    create_payload_table(conn)
+    
+    # Dados de cada série, uma linha por comicvine_volume_id (comic_volumes)
+    create_volume_tables(conn)
+    
     conn.commit()
     conn.close()
 
+def create_payload_table(conn):
+    """Cria a tabela com a resposta completa de cada edição (JSON comprimido)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS issue_payloads (
+            issue_id INTEGER PRIMARY KEY,
+            payload BLOB NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+
+def save_payload(cursor, issue_id, issue):
+    """Guarda a resposta crua de issue/4000-x comprimida com zlib"""
+    body = zlib.compress(json.dumps(issue, separators=(',', ':')).encode('utf-8'), 6)
+    cursor.execute('''
+        INSERT OR REPLACE INTO issue_payloads (issue_id, payload, fetched_at) VALUES (?, ?, ?)
+    ''', (issue_id, body, time.time()))
+
+def load_payload(body):
+    return json.loads(zlib.decompress(body))
+
+def cover_url_from_image(image):
+    """URL da capa (medium, ou small se não houver)"""
+    if not image:
+        return None
+    return image.get('medium_url') or image.get('small_url')
+
 class ComicVineAPI:
     """Wrapper para a API do Comic Vine"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, limiter=None):
         self.api_key = api_key
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
         self.last_request_time = 0
+        self.cache = cache  # ResponseCache (comic_http_cache) ou None
+        self.limiter = limiter  # RateLimiter compartilhado (comic_rate_limit) ou None
     
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self, endpoint):
         """Garante que respeitamos o rate limit"""
+        # Limitador compartilhado: conta as requisições de todos os processos
+        if self.limiter:
+            self.limiter.acquire(endpoint)
+            return
+        
         elapsed = time.time() - self.last_request_time
         if elapsed < REQUEST_DELAY:
             time.sleep(REQUEST_DELAY - elapsed)
@@ -78,6 +154,12 @@ class ComicVineAPI:
     
     def _make_request(self, endpoint, params):
         """Faz requisição à API com retry e rate limiting"""
+        # Respostas em cache não gastam requisição nem espera de rate limit
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        
         params['api_key'] = self.api_key
         params['format'] = 'json'
         
@@ -85,19 +167,25 @@ class ComicVineAPI:
         
         for attempt in range(MAX_RETRIES):
             try:
-                self._wait_for_rate_limit()
+                self._wait_for_rate_limit(endpoint)
                 response = self.session.get(url, params=params, timeout=30)
                 
                 if response.status_code == 420:
                     wait_time = RETRY_DELAY * (2 ** attempt)
                     print(f"    ⚠️  Rate limit. Aguardando {wait_time}s...")
-                    time.sleep(wait_time)
+                    if self.limiter:
+                        # Pausa o recurso para os outros processos também
+                        self.limiter.penalize(endpoint, wait_time)
+                    else:
+                        time.sleep(wait_time)
                     continue
                 
                 response.raise_for_status()
                 data = response.json()
                 
                 if data.get('status_code') == 1:
+                    if self.cache:
+                        self.cache.put(endpoint, params, data)
                     return data
                 else:
                     return None
@@ -110,82 +198,167 @@ class ComicVineAPI:
         
         return None
     
-    def get_issue_details(self, issue_id):
+    def get_issues_basic(self, issue_ids):
         """
-        Obtém detalhes completos de uma edição
+        Obtém datas, capa, sinopse e link de até BATCH_SIZE edições de uma vez
+        
+        Retorna {issue_id: campos} ou None se a requisição falhar.
         """
         params = {
-            'field_list': 'id,name,description,cover_date,store_date,person_credits,character_credits,team_credits,location_credits,story_arc_credits,image,site_detail_url'
+            'filter': 'id:' + '|'.join(str(i) for i in issue_ids),
+            'field_list': BASIC_FIELDS,
+            'limit': BATCH_SIZE
         }
         
-        data = self._make_request(f'issue/4000-{issue_id}', params)
+        data = self._make_request('issues', params)
         
-        if not data or not data.get('results'):
+        if data is None:
             return None
         
-        issue = data['results']
+        found = {}
+        for issue in data.get('results') or []:
+            found[issue['id']] = {
+                'description': issue.get('description', ''),
+                'cover_date': issue.get('cover_date', ''),
+                'store_date': issue.get('store_date', ''),
+                'cover_url': cover_url_from_image(issue.get('image')),
+                'site_detail_url': issue.get('site_detail_url', '')
+            }
+        return found
+    
+    def get_issues_updated(self, issue_ids):
+        """
+        date_last_updated de até BATCH_SIZE edições de uma vez
+        
+        Retorna {issue_id: data} ou None se a requisição falhar.
+        """
+        params = {
+            'filter': 'id:' + '|'.join(str(i) for i in issue_ids),
+            'field_list': UPDATED_FIELDS,
+            'limit': BATCH_SIZE
+        }
+        
+        data = self._make_request('issues', params)
         
-        # Processa créditos de pessoas
-        writers = []
-        pencilers = []
-        inkers = []
-        colorists = []
-        letterers = []
-        editors = []
-        cover_artists = []
+        if data is None:
+            return None
         
-        for person in issue.get('person_credits', []):
-            name = person.get('name', '')
-            role = person.get('role', '').lower()
-            
-            if 'writer' in role:
-                writers.append(name)
-            if 'pencil' in role or 'artist' in role:
-                pencilers.append(name)
-            if 'ink' in role:
-                inkers.append(name)
-            if 'color' in role:
-                colorists.append(name)
-            if 'letter' in role:
-                letterers.append(name)
-            if 'editor' in role:
-                editors.append(name)
-            if 'cover' in role:
-                cover_artists.append(name)
+        return {issue['id']: issue.get('date_last_updated') for issue in data.get('results') or []}
+    
+    def get_volumes(self, volume_ids):
+        """
+        Dados completos de até BATCH_SIZE volumes de uma vez
         
-        # Processa outros créditos
-        characters = [c.get('name') for c in issue.get('character_credits', []) if c.get('name')]
-        teams = [t.get('name') for t in issue.get('team_credits', []) if t.get('name')]
-        locations = [l.get('name') for l in issue.get('location_credits', []) if l.get('name')]
-        story_arcs = [s.get('name') for s in issue.get('story_arc_credits', []) if s.get('name')]
+        Retorna a lista de volumes da API ou None se a requisição falhar.
+        """
+        params = {
+            'filter': 'id:' + '|'.join(str(i) for i in volume_ids),
+            'field_list': VOLUME_FIELDS,
+            'limit': BATCH_SIZE
+        }
+        
+        data = self._make_request('volumes', params)
         
-        # URL da capa
-        cover_url = None
-        if issue.get('image'):
-            cover_url = issue['image'].get('medium_url') or issue['image'].get('small_url')
+        if data is None:
+            return None
         
-        return {
-            'description': issue.get('description', ''),
-            'cover_date': issue.get('cover_date', ''),
-            'store_date': issue.get('store_date', ''),
-            'writers': ', '.join(writers) if writers else None,
-            'pencilers': ', '.join(pencilers) if pencilers else None,
-            'inkers': ', '.join(inkers) if inkers else None,
-            'colorists': ', '.join(colorists) if colorists else None,
-            'letterers': ', '.join(letterers) if letterers else None,
-            'editors': ', '.join(editors) if editors else None,
-            'cover_artists': ', '.join(cover_artists) if cover_artists else None,
-            'characters': ', '.join(characters[:10]) if characters else None,  # Limita a 10
-            'teams': ', '.join(teams) if teams else None,
-            'locations': ', '.join(locations[:5]) if locations else None,
-            'story_arcs': ', '.join(story_arcs) if story_arcs else None,
-            'cover_url': cover_url,
-            'site_detail_url': issue.get('site_detail_url', '')
+        return data.get('results') or []
+    
+    def get_issue_raw(self, issue_id):
+        """
+        Resposta completa de uma edição, como veio da API (dict ou None)
+        """
+        params = {
+            'field_list': DETAIL_FIELDS
         }
+        
+        data = self._make_request(f'issue/4000-{issue_id}', params)
+        
+        if not data or not data.get('results'):
+            return None
+        
+        return data['results']
+    
+    def get_issue_details(self, issue_id):
+        """
+        Obtém detalhes completos de uma edição
+        """
+        issue = self.get_issue_raw(issue_id)
+        if issue is None:
+            return None
+        return derive_details(issue)
+
+def derive_details(issue):
+    """
+    Calcula as colunas de comics (e os créditos normalizados) a partir
+    da resposta completa de uma edição
+    
+    Não usa a API: também é o que --rederive aplica às respostas guardadas.
+    """
+    # Processa créditos de pessoas
+    writers = []
+    pencilers = []
+    inkers = []
+    colorists = []
+    letterers = []
+    editors = []
+    cover_artists = []
+    
+    for person in issue.get('person_credits', []):
+        name = person.get('name', '')
+        role = person.get('role', '').lower()
+        
+        if 'writer' in role:
+            writers.append(name)
+        if 'pencil' in role or 'artist' in role:
+            pencilers.append(name)
+        if 'ink' in role:
+            inkers.append(name)
+        if 'color' in role:
+            colorists.append(name)
+        if 'letter' in role:
+            letterers.append(name)
+        if 'editor' in role:
+            editors.append(name)
+        if 'cover' in role:
+            cover_artists.append(name)
+    
+    # Processa outros créditos
+    characters = [c.get('name') for c in issue.get('character_credits', []) if c.get('name')]
+    teams = [t.get('name') for t in issue.get('team_credits', []) if t.get('name')]
+    locations = [l.get('name') for l in issue.get('location_credits', []) if l.get('name')]
+    story_arcs = [s.get('name') for s in issue.get('story_arc_credits', []) if s.get('name')]
+    
+    # URL da capa
+    cover_url = cover_url_from_image(issue.get('image'))
+    
+    return {
+        'description': issue.get('description', ''),
+        'cover_date': issue.get('cover_date', ''),
+        'store_date': issue.get('store_date', ''),
+        'writers': ', '.join(writers) if writers else None,
+        'pencilers': ', '.join(pencilers) if pencilers else None,
+        'inkers': ', '.join(inkers) if inkers else None,
+        'colorists': ', '.join(colorists) if colorists else None,
+        'letterers': ', '.join(letterers) if letterers else None,
+        'editors': ', '.join(editors) if editors else None,
+        'cover_artists': ', '.join(cover_artists) if cover_artists else None,
+        'characters': ', '.join(characters) if characters else None,
+        'teams': ', '.join(teams) if teams else None,
+        'locations': ', '.join(locations[:5]) if locations else None,
+        'story_arcs': ', '.join(story_arcs) if story_arcs else None,
+        'cover_url': cover_url,
+        'site_detail_url': issue.get('site_detail_url', ''),
+        'date_last_updated': issue.get('date_last_updated'),
+        'credits': extract_credits(issue)
+    }
 
-def enrich_comics(db_path, limit=None, force=False):
+def enrich_comics(db_path, limit=None, force=False, use_cache=True, issue_ids=None):
     """
     Enriquece comics identificados com metadados detalhados
+    
+    Com issue_ids, busca de novo só os comics dessas edições (usado por
+    refresh_changed), tenham ou não passado pelo enriquecimento.
     """
     
     # Valida API key
@@ -197,19 +370,25 @@ def enrich_comics(db_path, limit=None, force=False):
     cursor = conn.cursor()
     
     # Conta quantos precisam de enriquecimento
-    if force:
+    if issue_ids is not None:
+        # Edições escolhidas: tabela temporária em vez de um IN (...) gigante
+        cursor.execute('CREATE TEMP TABLE refresh_issues (issue_id INTEGER PRIMARY KEY)')
+        cursor.executemany('INSERT OR IGNORE INTO refresh_issues (issue_id) VALUES (?)',
+                           [(issue_id,) for issue_id in issue_ids])
+        query = "SELECT COUNT(*) FROM comics WHERE status = 'identified' AND comicvine_issue_id IN (SELECT issue_id FROM refresh_issues)"
+    elif force:
         # Força re-enriquecimento de todos identificados
         query = "SELECT COUNT(*) FROM comics WHERE status = 'identified' AND comicvine_issue_id IS NOT NULL"
     else:
-        # Apenas os que ainda não têm descrição
-        query = "SELECT COUNT(*) FROM comics WHERE status = 'identified' AND comicvine_issue_id IS NOT NULL AND (description IS NULL OR description = '')"
+        # Apenas os que ainda não passaram pelo enriquecimento completo
+        query = "SELECT COUNT(*) FROM comics WHERE status = 'identified' AND comicvine_issue_id IS NOT NULL AND details_fetched_at IS NULL"
     
     cursor.execute(query)
     total_to_enrich = cursor.fetchone()[0]
     
     if total_to_enrich == 0:
         print("\n✅ Não há comics para enriquecer!")
-        if not force:
+        if not force and issue_ids is None:
             print("   Use --force para re-enriquecer todos")
         conn.close()
         return
@@ -226,7 +405,14 @@ def enrich_comics(db_path, limit=None, force=False):
     print("=" * 70)
     
     # Busca comics para enriquecer
-    if force:
+    if issue_ids is not None:
+        query = """
+            SELECT id, volume_name, issue_number, comicvine_issue_id 
+            FROM comics 
+            WHERE status = 'identified' 
+              AND comicvine_issue_id IN (SELECT issue_id FROM refresh_issues)
+        """
+    elif force:
         query = """
             SELECT id, volume_name, issue_number, comicvine_issue_id 
             FROM comics 
@@ -238,7 +424,7 @@ def enrich_comics(db_path, limit=None, force=False):
             FROM comics 
             WHERE status = 'identified' 
               AND comicvine_issue_id IS NOT NULL 
-              AND (description IS NULL OR description = '')
+              AND details_fetched_at IS NULL
         """
     
     if limit:
@@ -247,7 +433,9 @@ def enrich_comics(db_path, limit=None, force=False):
     cursor.execute(query)
     comics = cursor.fetchall()
     
-    api = ComicVineAPI(API_KEY)
+    cache = open_cache(db_path, enabled=use_cache)
+    limiter = open_limiter(db_path, min_interval=REQUEST_DELAY)
+    api = ComicVineAPI(API_KEY, cache=cache, limiter=limiter)
     
     processed = 0
     enriched = 0
@@ -268,14 +456,15 @@ def enrich_comics(db_path, limit=None, force=False):
         
         try:
             print(f"   🔍 Buscando detalhes da edição...", end='')
-            details = api.get_issue_details(issue_id)
+            issue = api.get_issue_raw(issue_id)
             
-            if not details:
+            if not issue:
                 print(" ❌ Não encontrado")
                 errors += 1
                 continue
             
             print(" ✓")
+            details = derive_details(issue)
             
             # Mostra preview dos dados
             if details.get('writers'):
@@ -302,6 +491,8 @@ def enrich_comics(db_path, limit=None, force=False):
                     story_arcs = ?,
                     cover_url = ?,
                     site_detail_url = ?,
+                    date_last_updated = ?,
+                    details_fetched_at = CURRENT_TIMESTAMP,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (
@@ -321,8 +512,11 @@ def enrich_comics(db_path, limit=None, force=False):
                 details.get('story_arcs'),
                 details.get('cover_url'),
                 details.get('site_detail_url'),
+                details.get('date_last_updated'),
                 comic_id
             ))
+            save_credits(cursor, issue_id, details['credits'])
+            save_payload(cursor, issue_id, issue)
             
             enriched += 1
             
@@ -345,6 +539,404 @@ def enrich_comics(db_path, limit=None, force=False):
     print(f"   • Enriquecidos: {enriched} ({enriched/processed*100:.1f}%)")
     print(f"   • Erros: {errors}")
     print(f"   • Tempo total: {int(elapsed_time/60)}min {int(elapsed_time%60)}s")
+    if cache:
+        print(f"   • Cache HTTP: {cache.summary()}")
+        cache.close()
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    limiter.close()
+    print("=" * 70)
+    
+    conn.close()
+
+def enrich_basic(db_path, limit=None, force=False, use_cache=True):
+    """
+    Passo rápido: datas, capa, sinopse e link via /issues/ em lotes
+    
+    Um filtro id:a|b|c traz até BATCH_SIZE edições por requisição, então
+    20 mil comics custam ~200 requisições. Créditos (roteiro, arte,
+    personagens) continuam só no enriquecimento completo.
+    """
+    
+    # Valida API key
+    if not API_KEY:
+        print("\n❌ ERRO: Variável COMICVINE_API_KEY não configurada!")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    query = """
+        SELECT id, comicvine_issue_id 
+        FROM comics 
+        WHERE status = 'identified' AND comicvine_issue_id IS NOT NULL
+    """
+    if not force:
+        # Quem já passou pelo completo já tem esses campos
+        query += " AND basic_fetched_at IS NULL AND details_fetched_at IS NULL"
+    if limit:
+        query += f" LIMIT {limit}"
+    
+    cursor.execute(query)
+    
+    # Arquivos duplicados apontam para a mesma edição: uma busca serve a todos
+    rows_by_issue = {}
+    for comic_id, issue_id in cursor.fetchall():
+        rows_by_issue.setdefault(issue_id, []).append(comic_id)
+    
+    if not rows_by_issue:
+        print("\n✅ Não há comics para o enriquecimento básico!")
+        if not force:
+            print("   Use --force para refazer todos")
+        conn.close()
+        return
+    
+    issue_ids = list(rows_by_issue)
+    batches = [issue_ids[i:i + BATCH_SIZE] for i in range(0, len(issue_ids), BATCH_SIZE)]
+    total_comics = sum(len(ids) for ids in rows_by_issue.values())
+    
+    print(f"\n📊 {total_comics} comics ({len(issue_ids)} edições distintas) para o enriquecimento básico")
+    print(f"   {len(batches)} requisições de até {BATCH_SIZE} edições")
+    print(f"\n⏱️  Tempo estimado: {int(len(batches) * REQUEST_DELAY / 60)} minutos")
+    print("=" * 70)
+    
+    cache = open_cache(db_path, enabled=use_cache)
+    limiter = open_limiter(db_path, min_interval=REQUEST_DELAY)
+    api = ComicVineAPI(API_KEY, cache=cache, limiter=limiter)
+    
+    enriched = 0
+    missing = 0
+    errors = 0
+    
+    start_time = time.time()
+    
+    for batch_index, batch in enumerate(batches, 1):
+        # Mostra progresso
+        elapsed = time.time() - start_time
+        rate = (batch_index - 1) / elapsed if elapsed > 0 else 0
+        eta_seconds = (len(batches) - batch_index + 1) / rate if rate > 0 else 0
+        eta_minutes = int(eta_seconds / 60)
+        
+        print(f"[{batch_index}/{len(batches)}] 🔍 Lote de {len(batch)} edições...", end='')
+        
+        try:
+            found = api.get_issues_basic(batch)
+            if found is None:
+                print(" ❌ Falhou")
+                errors += sum(len(rows_by_issue[i]) for i in batch)
+                continue
+            
+            updates = []
+            for issue_id in batch:
+                basic = found.get(issue_id)
+                if not basic:
+                    missing += len(rows_by_issue[issue_id])
+                    continue
+                for comic_id in rows_by_issue[issue_id]:
+                    updates.append((
+                        basic['description'],
+                        basic['cover_date'],
+                        basic['store_date'],
+                        basic['cover_url'],
+                        basic['site_detail_url'],
+                        comic_id
+                    ))
+            
+            cursor.executemany('''
+                UPDATE comics 
+                SET description = ?,
+                    cover_date = ?,
+                    store_date = ?,
+                    cover_url = ?,
+                    site_detail_url = ?,
+                    basic_fetched_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', updates)
+            conn.commit()
+            enriched += len(updates)
+            
+            print(f" ✓ {len(found)} encontradas | ETA: {eta_minutes}min")
+            
+        except Exception as e:
+            print(f" ❌ Erro: {e}")
+            errors += sum(len(rows_by_issue[i]) for i in batch)
+    
+    # Estatísticas finais
+    elapsed_time = time.time() - start_time
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO FINAL (básico):")
+    print(f"   • Requisições: {len(batches)} para {total_comics} comics")
+    print(f"   • Enriquecidos: {enriched} ({enriched/total_comics*100:.1f}%)")
+    print(f"   • Não retornados pela API: {missing}")
+    print(f"   • Erros: {errors}")
+    print(f"   • Tempo total: {int(elapsed_time/60)}min {int(elapsed_time%60)}s")
+    print("   • Créditos e personagens: rode sem --basic")
+    if cache:
+        print(f"   • Cache HTTP: {cache.summary()}")
+        cache.close()
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    limiter.close()
+    print("=" * 70)
+    
+    conn.close()
+
+def enrich_volumes(db_path, limit=None, force=False, use_cache=True):
+    """
+    Passo por volume: ano de início, total de edições, sinopse e capa da série
+    
+    Cada volume distinto é buscado uma vez (até BATCH_SIZE por requisição
+    em /volumes/) e gravado em volumes; nome e editora são repassados a
+    todos os comics que apontam para ele. Uma série com 300 arquivos custa
+    uma fração de requisição, não 300.
+    """
+    
+    # Valida API key
+    if not API_KEY:
+        print("\n❌ ERRO: Variável COMICVINE_API_KEY não configurada!")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    volume_ids = pending_volume_ids(conn, force=force)
+    if limit:
+        volume_ids = volume_ids[:limit]
+    
+    if not volume_ids:
+        print("\n✅ Todos os volumes já foram buscados!")
+        if not force:
+            print("   Use --force para buscar de novo")
+        conn.close()
+        return
+    
+    batches = [volume_ids[i:i + BATCH_SIZE] for i in range(0, len(volume_ids), BATCH_SIZE)]
+    
+    print(f"\n📊 {len(volume_ids)} volumes distintos para buscar")
+    print(f"   {len(batches)} requisições de até {BATCH_SIZE} volumes")
+    print(f"\n⏱️  Tempo estimado: {int(len(batches) * REQUEST_DELAY / 60)} minutos")
+    print("=" * 70)
+    
+    cache = open_cache(db_path, enabled=use_cache)
+    limiter = open_limiter(db_path, min_interval=REQUEST_DELAY)
+    api = ComicVineAPI(API_KEY, cache=cache, limiter=limiter)
+    
+    saved = 0
+    comics_updated = 0
+    missing = 0
+    errors = 0
+    
+    start_time = time.time()
+    
+    for batch_index, batch in enumerate(batches, 1):
+        print(f"[{batch_index}/{len(batches)}] 🔍 Lote de {len(batch)} volumes...", end='')
+        
+        try:
+            volumes = api.get_volumes(batch)
+            if volumes is None:
+                print(" ❌ Falhou")
+                errors += len(batch)
+                continue
+            
+            wanted = set(batch)
+            volumes = [volume for volume in volumes if volume.get('id') in wanted]
+            comics_updated += save_volumes(cursor, volumes)
+            conn.commit()
+            saved += len(volumes)
+            missing += len(batch) - len(volumes)
+            
+            print(f" ✓ {len(volumes)} encontrados")
+            
+        except Exception as e:
+            print(f" ❌ Erro: {e}")
+            errors += len(batch)
+    
+    # Estatísticas finais
+    elapsed_time = time.time() - start_time
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO FINAL (volumes):")
+    print(f"   • Requisições: {len(batches)} para {len(volume_ids)} volumes")
+    print(f"   • Volumes gravados: {saved}")
+    print(f"   • Comics com nome/editora atualizados: {comics_updated}")
+    print(f"   • Não retornados pela API: {missing}")
+    print(f"   • Erros: {errors}")
+    print(f"   • Tempo total: {int(elapsed_time/60)}min {int(elapsed_time%60)}s")
+    if cache:
+        print(f"   • Cache HTTP: {cache.summary()}")
+        cache.close()
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    limiter.close()
+    print("=" * 70)
+    
+    conn.close()
+
+def refresh_changed(db_path, limit=None, use_cache=True):
+    """
+    Busca de novo só as edições que mudaram no Comic Vine
+    
+    Uma lista /issues/ com filter=id:a|b|c traz o date_last_updated de
+    BATCH_SIZE edições por requisição; só as que têm data diferente da
+    gravada na última busca completa ganham uma requisição de detalhes.
+    Comics enriquecidos antes dessa coluna existir só recebem a data atual
+    (sem nova busca). Custo semanal proporcional às mudanças.
+    """
+    
+    # Valida API key
+    if not API_KEY:
+        print("\n❌ ERRO: Variável COMICVINE_API_KEY não configurada!")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT comicvine_issue_id, MAX(date_last_updated)
+        FROM comics 
+        WHERE status = 'identified' 
+          AND comicvine_issue_id IS NOT NULL 
+          AND details_fetched_at IS NOT NULL
+        GROUP BY comicvine_issue_id
+    ''')
+    known = dict(cursor.fetchall())
+    
+    if not known:
+        print("\n✅ Nenhuma edição enriquecida para verificar!")
+        conn.close()
+        return
+    
+    issue_ids = list(known)
+    batches = [issue_ids[i:i + BATCH_SIZE] for i in range(0, len(issue_ids), BATCH_SIZE)]
+    
+    print(f"\n🔄 Verificando {len(issue_ids)} edições em {len(batches)} requisições...")
+    print("=" * 70)
+    
+    # A lista precisa vir da API, não do cache
+    limiter = open_limiter(db_path, min_interval=REQUEST_DELAY)
+    api = ComicVineAPI(API_KEY, limiter=limiter)
+    
+    changed = []
+    baseline = []
+    missing = 0
+    errors = 0
+    
+    for batch_index, batch in enumerate(batches, 1):
+        print(f"[{batch_index}/{len(batches)}] 🔍 Lote de {len(batch)} edições...", end='')
+        updated = api.get_issues_updated(batch)
+        if updated is None:
+            print(" ❌ Falhou")
+            errors += len(batch)
+            continue
+        
+        batch_changed = 0
+        for issue_id in batch:
+            if issue_id not in updated:
+                missing += 1
+            elif known[issue_id] is None:
+                baseline.append((updated[issue_id], issue_id))
+            elif updated[issue_id] != known[issue_id]:
+                changed.append(issue_id)
+                batch_changed += 1
+        print(f" ✓ {batch_changed} alterada(s)")
+    
+    cursor.executemany('''
+        UPDATE comics SET date_last_updated = ? WHERE comicvine_issue_id = ?
+    ''', baseline)
+    conn.commit()
+    conn.close()
+    
+    print("\n" + "=" * 70)
+    print("📊 VERIFICAÇÃO:")
+    print(f"   • Requisições de lista: {len(batches)} para {len(issue_ids)} edições")
+    print(f"   • Alteradas desde a última busca: {len(changed)}")
+    if baseline:
+        print(f"   • Sem data anterior (data registrada agora): {len(baseline)}")
+    if missing:
+        print(f"   • Não retornadas pela API: {missing}")
+    if errors:
+        print(f"   • Não verificadas (erro): {errors}")
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    limiter.close()
+    print("=" * 70)
+    
+    if not changed:
+        return
+    
+    # Respostas antigas em cache esconderiam a correção
+    cache = open_cache(db_path, enabled=use_cache)
+    if cache:
+        for issue_id in changed:
+            cache.invalidate(f'issue/4000-{issue_id}', {'field_list': DETAIL_FIELDS})
+        cache.close()
+    
+    enrich_comics(db_path, limit=limit, use_cache=use_cache, issue_ids=changed)
+
+def rederive(db_path):
+    """
+    Recalcula as colunas derivadas e os créditos a partir das respostas
+    guardadas em issue_payloads, sem nenhuma chamada à API
+    
+    Depois de corrigir derive_details() (ex.: mapeamento de funções), isso
+    atualiza a biblioteca inteira em segundos em vez de um --force.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT COUNT(*) FROM issue_payloads')
+    total = cursor.fetchone()[0]
+    
+    if total == 0:
+        print("\n✅ Nenhuma resposta guardada para recalcular!")
+        print("   As respostas são guardadas pelo enriquecimento completo (sem --basic)")
+        conn.close()
+        return
+    
+    print(f"\n🔁 Recalculando {total} edições a partir das respostas guardadas...")
+    print("=" * 70)
+    
+    update_sql = f'''
+        UPDATE comics 
+        SET {', '.join(f'{column} = ?' for column in DERIVED_COLUMNS)},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE comicvine_issue_id = ?
+    '''
+    
+    start_time = time.time()
+    processed = 0
+    updated = 0
+    errors = 0
+    
+    # Cursor próprio para a leitura: as gravações usam outro
+    reader = conn.execute('SELECT issue_id, payload FROM issue_payloads ORDER BY issue_id')
+    while True:
+        rows = reader.fetchmany(REDERIVE_BATCH_SIZE)
+        if not rows:
+            break
+        updates = []
+        for issue_id, body in rows:
+            processed += 1
+            try:
+                details = derive_details(load_payload(body))
+            except (zlib.error, ValueError) as e:
+                print(f"   ⚠️  Edição {issue_id}: resposta guardada ilegível ({e})")
+                errors += 1
+                continue
+            updates.append([details.get(column) for column in DERIVED_COLUMNS] + [issue_id])
+            save_credits(cursor, issue_id, details['credits'])
+        cursor.executemany(update_sql, updates)
+        updated += cursor.rowcount if cursor.rowcount > 0 else 0
+        conn.commit()
+        print(f"   Processadas: {processed}/{total}", end='\r')
+    
+    elapsed_time = time.time() - start_time
+    print("\n" + "=" * 70)
+    print("📊 RESULTADO FINAL (recalculado):")
+    print(f"   • Edições: {processed}")
+    print(f"   • Comics atualizados: {updated}")
+    print(f"   • Respostas ilegíveis: {errors}")
+    print(f"   • Tempo total: {elapsed_time:.1f}s (nenhuma requisição à API)")
     print("=" * 70)
     
     conn.close()
@@ -356,8 +948,18 @@ def main():
     parser = argparse.ArgumentParser(description='Enriquece comics com metadados detalhados')
     parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
     parser.add_argument('--limit', type=int, help='Limita número de comics a processar')
-    parser.add_argument('--force', action='store_true', help='Re-enriquece todos (mesmo os que já têm dados)')
+    parser.add_argument('--force', action='store_true', help='Re-enriquece todos (mesmo os que já têm dados), sem usar o cache')
+    parser.add_argument('--basic', action='store_true',
+                       help='Passo rápido: datas, capa e sinopse em lotes de 100 (sem créditos)')
+    parser.add_argument('--volumes', action='store_true',
+                       help='Busca os dados de cada série (volume) uma vez, em lotes de 100')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Busca de novo só as edições alteradas no Comic Vine (date_last_updated)')
+    parser.add_argument('--rederive', action='store_true',
+                       help='Recalcula colunas e créditos das respostas guardadas (sem API)')
     parser.add_argument('--upgrade-db', action='store_true', help='Adiciona colunas extras ao banco')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignora o cache de respostas da API (comicvine_cache.db)')
     
     args = parser.parse_args()
     
@@ -378,8 +980,20 @@ def main():
     # Garante que o banco tem as colunas necessárias
     upgrade_database(args.db)
     
+    # --force quer dados novos da API: respostas em cache seriam as mesmas de antes
+    use_cache = not (args.no_cache or args.force)
+    
     # Enriquece comics
-    enrich_comics(args.db, limit=args.limit, force=args.force)
+    if args.rederive:
+        rederive(args.db)
+    elif args.volumes:
+        enrich_volumes(args.db, limit=args.limit, force=args.force, use_cache=use_cache)
+    elif args.refresh:
+        refresh_changed(args.db, limit=args.limit, use_cache=use_cache)
+    elif args.basic:
+        enrich_basic(args.db, limit=args.limit, force=args.force, use_cache=use_cache)
+    else:
+        enrich_comics(args.db, limit=args.limit, force=args.force, use_cache=use_cache)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Comic HTTP Cache - Cache persistente das respostas da API do Comic Vine
+Compartilhado por comic_identifier.py e comic_enricher.py (arquivo SQLite próprio)
+"""
+
+import sqlite3
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+
+CACHE_FILENAME = 'comicvine_cache.db'
+DEFAULT_MAX_MB = 512
+
+DAY = 24 * 3600
+
+# Validade por tipo de endpoint (primeiro segmento: search, issues, issue/4000-x ...)
+ENDPOINT_TTLS = {
+    'search': 7 * DAY,    # Resultados de busca mudam pouco
+    'volumes': 7 * DAY,
+    'volume': 7 * DAY,
+    'issues': 1 * DAY,    # Séries em andamento ganham edições novas
+    'issue': 30 * DAY,    # Detalhes de uma edição quase nunca mudam
+}
+DEFAULT_TTL = 1 * DAY
+
+# Acertos/falhas e último acesso ficam em memória e vão ao disco junto com o
+# próximo put(), no close() ou a cada STATS_FLUSH_LOOKUPS consultas
+STATS_FLUSH_LOOKUPS = 500
+
+# Parâmetros que não mudam a resposta
+IGNORED_PARAMS = {'api_key', 'format'}
+
+def default_cache_path(db_path):
+    """Arquivo do cache ao lado do banco de inventário"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), CACHE_FILENAME)
+
+def endpoint_family(endpoint):
+    """'issue/4000-123' -> 'issue'"""
+    return endpoint.strip('/').split('/')[0]
+
+def normalize_params(params):
+    """
+    Normaliza os parâmetros para a chave do cache
+
+    Remove api_key/format, ordena as chaves e normaliza a busca textual
+    (a API não diferencia maiúsculas nem espaços repetidos).
+    """
+    normalized = {}
+    for key, value in params.items():
+        if key in IGNORED_PARAMS or value is None:
+            continue
+        value = str(value)
+        if key == 'query':
+            value = ' '.join(value.lower().split())
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+def cache_key(endpoint, params):
+    normalized = normalize_params(params)
+    digest = hashlib.sha1(f"{endpoint.strip('/')}?{normalized}".encode('utf-8')).hexdigest()
+    return digest, normalized
+
+class ResponseCache:
+    """
+    Cache de respostas JSON em SQLite
+
+    Corpos comprimidos com zlib, validade por endpoint, contadores de
+    acertos/falhas e limite de tamanho com descarte LRU. Seguro para
+    várias threads e vários processos (WAL + busy timeout). Uma consulta
+    não escreve no banco: os contadores são gravados em lote.
+    """
+
+    def __init__(self, path, max_mb=DEFAULT_MAX_MB, ttls=None):
+        self.path = path
+        self.max_bytes = max_mb * 1024 * 1024
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._puts_since_check = 0
+        self._pending_counts = {}   # família -> [acertos, falhas]
+        self._pending_access = {}   # cache_key -> [último acesso, acertos]
+        self._lookups_since_flush = 0
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                params TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                endpoint TEXT PRIMARY KEY,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0
+            )
+        ''')
+        self.conn.commit()
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint_family(endpoint), DEFAULT_TTL)
+
+    def _count(self, endpoint, hit):
+        counts = self._pending_counts.setdefault(endpoint_family(endpoint), [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def _flush_stats(self):
+        """Grava contadores e últimos acessos pendentes (sem commit)"""
+        if self._pending_counts:
+            self.conn.executemany('''
+                INSERT INTO cache_stats (endpoint, hits, misses) VALUES (?, ?, ?)
+                ON CONFLICT(endpoint) DO UPDATE SET
+                    hits = hits + excluded.hits,
+                    misses = misses + excluded.misses
+            ''', [(family, hits, misses)
+                  for family, (hits, misses) in self._pending_counts.items()])
+            self._pending_counts = {}
+        if self._pending_access:
+            self.conn.executemany('''
+                UPDATE responses SET last_access = ?, hits = hits + ? WHERE cache_key = ?
+            ''', [(last_access, hits, key)
+                  for key, (last_access, hits) in self._pending_access.items()])
+            self._pending_access = {}
+        self._lookups_since_flush = 0
+
+    def get(self, endpoint, params):
+        """Retorna a resposta em cache (dict) ou None se ausente/expirada"""
+        key, _ = cache_key(endpoint, params)
+        now = time.time()
+
+        with self._lock:
+            row = self.conn.execute('SELECT body, fetched_at FROM responses WHERE cache_key = ?',
+                                    (key,)).fetchone()
+            hit = row is not None and now - row[1] < self.ttl_for(endpoint)
+            if hit:
+                self.hits += 1
+                access = self._pending_access.setdefault(key, [now, 0])
+                access[0] = now
+                access[1] += 1
+            else:
+                self.misses += 1
+            self._count(endpoint, hit)
+
+            # Sessões só de leitura também acabam gravando os contadores
+            self._lookups_since_flush += 1
+            if self._lookups_since_flush >= STATS_FLUSH_LOOKUPS:
+                self._flush_stats()
+                self.conn.commit()
+
+        if not hit:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, endpoint, params, data):
+        """Guarda uma resposta bem-sucedida"""
+        key, normalized = cache_key(endpoint, params)
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), 6)
+        now = time.time()
+
+        with self._lock:
+            self._flush_stats()
+            self.conn.execute('''
+                INSERT OR REPLACE INTO responses
+                (cache_key, endpoint, params, body, size, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, endpoint.strip('/'), normalized, body, len(body), now, now))
+            self.conn.commit()
+
+            # Soma o tamanho só de vez em quando (SUM percorre a tabela)
+            self._puts_since_check += 1
+            if self._puts_since_check >= 100:
+                self._puts_since_check = 0
+                self._evict()
+
+    def _evict(self):
+        """Descarta as respostas acessadas há mais tempo até caber no limite"""
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        # Libera 10% a mais para não descartar a cada inserção
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        keys = []
+        for key, size in self.conn.execute('SELECT cache_key, size FROM responses ORDER BY last_access'):
+            if freed >= target:
+                break
+            keys.append((key,))
+            freed += size
+        self.conn.executemany('DELETE FROM responses WHERE cache_key = ?', keys)
+        self.conn.commit()
+        return len(keys)
+
+    def purge_expired(self):
+        """Remove respostas vencidas de todos os endpoints"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            rows = self.conn.execute('SELECT cache_key, endpoint, fetched_at FROM responses').fetchall()
+            expired = [(key,) for key, endpoint, fetched_at in rows
+                       if now - fetched_at >= self.ttl_for(endpoint)]
+            self.conn.executemany('DELETE FROM responses WHERE cache_key = ?', expired)
+            self.conn.commit()
+            removed = len(expired)
+        return removed
+
+    def invalidate(self, endpoint, params):
+        """Apaga a resposta de uma requisição (ex.: edição alterada na API)"""
+        key, _ = cache_key(endpoint, params)
+        with self._lock:
+            self.conn.execute('DELETE FROM responses WHERE cache_key = ?', (key,))
+            self.conn.commit()
+
+    def clear(self, family=None):
+        """Apaga tudo (ou só um tipo de endpoint, ex.: 'search')"""
+        with self._lock:
+            if family:
+                cursor = self.conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? OR endpoint LIKE ? || '/%'",
+                    (family, family))
+            else:
+                cursor = self.conn.execute('DELETE FROM responses')
+            self.conn.commit()
+            return cursor.rowcount
+
+    def summary(self):
+        """Linha de resumo da sessão atual"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"{self.hits} acertos, {self.misses} falhas ({rate:.0f}% servido do cache)"
+
+    def close(self):
+        with self._lock:
+            self._flush_stats()
+            self.conn.commit()
+            self.conn.close()
+
+def open_cache(db_path, enabled=True, max_mb=DEFAULT_MAX_MB):
+    """Abre o cache padrão do banco (ou None se desativado)"""
+    if not enabled:
+        return None
+    return ResponseCache(default_cache_path(db_path), max_mb=max_mb)
+
+def show_stats(cache):
+    """Mostra tamanho e contadores do cache"""
+    conn = cache.conn
+    print("\n📊 CACHE HTTP DO COMIC VINE")
+    print("=" * 60)
+    print(f"   Arquivo: {cache.path}")
+
+    cursor = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses')
+    count, total = cursor.fetchone()
+    print(f"   Respostas: {count} ({total / (1024*1024):.1f} MB comprimidos, "
+          f"limite {cache.max_bytes // (1024*1024)} MB)")
+
+    print("\n   Por endpoint:")
+    cursor = conn.execute('''
+        SELECT s.endpoint, s.hits, s.misses,
+               (SELECT COUNT(*) FROM responses r
+                WHERE r.endpoint = s.endpoint OR r.endpoint LIKE s.endpoint || '/%')
+        FROM cache_stats s ORDER BY s.endpoint
+    ''')
+    for endpoint, hits, misses, stored in cursor.fetchall():
+        total_requests = hits + misses
+        rate = (hits / total_requests * 100) if total_requests else 0
+        ttl_days = cache.ttl_for(endpoint) / DAY
+        print(f"      • {endpoint}: {stored} guardadas | {hits} acertos, {misses} falhas "
+              f"({rate:.0f}%) | validade {ttl_days:g} dias")
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gerencia o cache de respostas do Comic Vine')
+    parser.add_argument('--db', default='comics_inventory.db',
+                       help='Banco de inventário (o cache fica na mesma pasta)')
+    parser.add_argument('--stats', action='store_true', help='Mostra tamanho e taxa de acerto')
+    parser.add_argument('--purge-expired', action='store_true', help='Remove respostas vencidas')
+    parser.add_argument('--clear', nargs='?', const='', metavar='ENDPOINT',
+                       help='Apaga o cache (ou só um endpoint: search, issues, issue)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  💾 COMIC HTTP CACHE")
+    print("=" * 60)
+
+    cache_path = default_cache_path(args.db)
+    if not os.path.exists(cache_path):
+        print(f"\n❌ Cache não encontrado: {cache_path}")
+        sys.exit(1)
+
+    cache = ResponseCache(cache_path)
+
+    if args.clear is not None:
+        removed = cache.clear(args.clear or None)
+        print(f"\n✅ {removed} respostas removidas")
+    elif args.purge_expired:
+        removed = cache.purge_expired()
+        print(f"\n✅ {removed} respostas vencidas removidas")
+    else:
+        show_stats(cache)
+
+    cache.close()
+
+if __name__ == "__main__":
+    main()
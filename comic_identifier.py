@@ -9,28 +9,58 @@ import requests
 import time
 import sys
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from comic_http_cache import open_cache
+from comic_rate_limit import open_limiter
+from comic_retry import RetrySchedule, query_fingerprint, classify_failed, format_delay
+from comic_volume_catalog import VolumeCatalog, MATCH_THRESHOLD
+
 API_KEY = os.environ.get('COMICVINE_API_KEY')
 USER_AGENT = "ComicIdentifier/1.0"
-BASE_URL = "https://comicvine.gamespot.com/api"
+# COMICVINE_BASE_URL aponta para outro servidor (ex.: comic_mock_server.py)
+BASE_URL = os.environ.get('COMICVINE_BASE_URL', "https://comicvine.gamespot.com/api")
 
 # Configurações de rate limiting
 REQUEST_DELAY = 2.0  # Segundos entre requisições (aumentado para evitar erro 420)
 MAX_RETRIES = 3
 RETRY_DELAY = 5.0  # Delay adicional após erro 420
 
+# Lista de edições de um volume guardada em cv_issues vale por 1 dia
+# (séries em andamento ganham edições novas)
+ISSUE_INDEX_MAX_AGE = 24 * 3600
+ISSUES_PAGE_SIZE = 100  # Máximo aceito pela API por requisição
+
+# Pipeline de identificação
+DEFAULT_WORKERS = 4       # Séries resolvidas ao mesmo tempo
+COMMIT_INTERVAL = 2.0     # Segundos entre commits da thread escritora
+WRITER_QUEUE_SIZE = 256   # Lotes aguardando gravação (segura os workers se o disco atrasar)
+UPDATE_CHUNK_SIZE = 500   # Ids por UPDATE ... WHERE id IN (...)
+WRITER_BUSY_TIMEOUT = 30  # Segundos que o SQLite espera por um banco travado
+LOCK_RETRIES = 5          # Novas tentativas de um lote/commit com 'database is locked'
+LOCK_RETRY_DELAY = 1.0    # Espera base entre elas (dobra a cada tentativa)
+
 class ComicVineAPI:
     """Wrapper para a API do Comic Vine"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, limiter=None):
         self.api_key = api_key
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
         self.last_request_time = 0
+        self.cache = cache  # ResponseCache (comic_http_cache) ou None
+        self.limiter = limiter  # RateLimiter compartilhado (comic_rate_limit) ou None
     
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self, endpoint):
         """Garante que respeitamos o rate limit"""
+        # Limitador compartilhado: conta as requisições de todos os processos
+        if self.limiter:
+            self.limiter.acquire(endpoint)
+            return
+        
         elapsed = time.time() - self.last_request_time
         if elapsed < REQUEST_DELAY:
             time.sleep(REQUEST_DELAY - elapsed)
@@ -38,6 +68,12 @@ class ComicVineAPI:
     
     def _make_request(self, endpoint, params):
         """Faz requisição à API com retry e rate limiting"""
+        # Respostas em cache não gastam requisição nem espera de rate limit
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        
         params['api_key'] = self.api_key
         params['format'] = 'json'
         
@@ -45,20 +81,26 @@ class ComicVineAPI:
         
         for attempt in range(MAX_RETRIES):
             try:
-                self._wait_for_rate_limit()
+                self._wait_for_rate_limit(endpoint)
                 response = self.session.get(url, params=params, timeout=30)
                 
                 # Se receber 420 (rate limit), espera mais tempo
                 if response.status_code == 420:
                     wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
                     print(f"    ⚠️  Rate limit (420). Aguardando {wait_time}s...")
-                    time.sleep(wait_time)
+                    if self.limiter:
+                        # Pausa o recurso para os outros processos também
+                        self.limiter.penalize(endpoint, wait_time)
+                    else:
+                        time.sleep(wait_time)
                     continue
                 
                 response.raise_for_status()
                 data = response.json()
                 
                 if data.get('status_code') == 1:
+                    if self.cache:
+                        self.cache.put(endpoint, params, data)
                     return data
                 else:
                     error = data.get('error', 'Unknown error')
@@ -74,9 +116,9 @@ class ComicVineAPI:
         
         return None
     
-    def search_volume(self, title, year=None):
+    def search_volumes(self, title):
         """
-        Busca um volume (série) no Comic Vine
+        Busca volumes (séries) no Comic Vine; retorna todos os resultados
         """
         params = {
             'query': title,
@@ -87,78 +129,549 @@ class ComicVineAPI:
         data = self._make_request('search', params)
         
         if not data or not data.get('results'):
-            return None
-        
-        volumes = data['results']
-        
-        # Se temos o ano, tenta encontrar match exato
-        if year:
-            for vol in volumes:
-                vol_year = str(vol.get('start_year', ''))
-                if vol_year == year:
-                    return vol
+            return []
         
-        # Retorna o primeiro resultado (mais relevante)
-        return volumes[0]
+        return data['results']
     
-    def get_volume_issues(self, volume_id):
+    def search_volume(self, title, year=None):
+        """
+        Busca um volume (série) no Comic Vine
         """
-        Obtém todas as edições de um volume
+        return pick_volume(self.search_volumes(title), year)
+    
+    def get_volume_issues_page(self, volume_id, offset=0):
+        """
+        Obtém uma página das edições de um volume
+        
+        Ordena por id para que as páginas fiquem estáveis (edições novas vão
+        para o fim). Retorna (edições, total do volume) ou None se falhar.
         """
         params = {
             'filter': f'volume:{volume_id}',
             'field_list': 'id,issue_number,name,volume',
-            'limit': 100
+            'sort': 'id:asc',
+            'limit': ISSUES_PAGE_SIZE,
+            'offset': offset
         }
         
         data = self._make_request('issues', params)
         
-        if not data or not data.get('results'):
-            return []
+        if not data:
+            return None
         
-        return data['results']
+        return data.get('results') or [], data.get('number_of_total_results') or 0
+    
+    def get_volume_issues(self, volume_id):
+        """
+        Obtém todas as edições de um volume (todas as páginas)
+        """
+        issues = []
+        while True:
+            page = self.get_volume_issues_page(volume_id, len(issues))
+            if not page or not page[0]:
+                break
+            issues.extend(page[0])
+            if len(issues) >= page[1]:
+                break
+        
+        return issues
     
     def find_issue(self, volume_id, issue_number):
         """
         Encontra uma edição específica dentro de um volume
         """
-        issues = self.get_volume_issues(volume_id)
+        return match_issue(self.get_volume_issues(volume_id), issue_number)
+
+def pick_volume(volumes, year=None):
+    """Escolhe o volume do ano pedido, ou o primeiro resultado (mais relevante)"""
+    if not volumes:
+        return None
+    
+    # Se temos o ano, tenta encontrar match exato
+    if year:
+        for vol in volumes:
+            vol_year = str(vol.get('start_year', ''))
+            if vol_year == year:
+                return vol
+    
+    return volumes[0]
+
+def normalize_issue_number(issue_number):
+    """Normaliza o número da edição para comparação ('007' -> '7')"""
+    return str(issue_number or '').strip().lower().lstrip('0') or '0'
+
+def match_issue(issues, issue_number):
+    """Procura o número da edição numa lista de edições do volume"""
+    issue_num_normalized = normalize_issue_number(issue_number)
+    
+    for issue in issues:
+        if normalize_issue_number(issue.get('issue_number')) == issue_num_normalized:
+            return issue
+    
+    return None
+
+def create_issue_tables(conn):
+    """Cria as tabelas do índice local de edições por volume"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cv_issues (
+            issue_id INTEGER PRIMARY KEY,
+            volume_id INTEGER NOT NULL,
+            issue_number TEXT,
+            issue_number_norm TEXT,
+            name TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cv_issues_volume
+        ON cv_issues(volume_id, issue_number_norm)
+    ''')
+    
+    # Quando a lista de cada volume foi baixada e até onde foi paginada
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cv_issue_volumes (
+            volume_id INTEGER PRIMARY KEY,
+            issue_count INTEGER,
+            fetched_at REAL NOT NULL,
+            next_offset INTEGER,
+            total_issues INTEGER
+        )
+    ''')
+    
+    # Bancos criados antes da paginação
+    cursor.execute("PRAGMA table_info(cv_issue_volumes)")
+    existing_columns = [row[1] for row in cursor.fetchall()]
+    for col_name in ('next_offset', 'total_issues'):
+        if col_name not in existing_columns:
+            cursor.execute(f'ALTER TABLE cv_issue_volumes ADD COLUMN {col_name} INTEGER')
+    conn.commit()
+
+class IssueIndex:
+    """
+    Índice local das edições de cada volume (tabela cv_issues)
+    
+    As edições de um volume são baixadas em páginas de ISSUES_PAGE_SIZE só
+    até achar o número procurado, e cada página fica guardada no banco.
+    Consultas seguintes são lookups em dicionário pelo número normalizado;
+    uma página nova só é pedida quando o número ainda não apareceu e o
+    volume tem mais edições. A lista recomeça do zero após max_age.
+    
+    Pode ser usado por várias threads: consultas ao mesmo volume esperam
+    umas pelas outras. Com writer (DatabaseWriter), as gravações vão para a
+    thread escritora em vez de usar conn. conn_lock protege o uso de conn e
+    deve ser o mesmo de quem mais compartilha a conexão (VolumeCatalog).
+    """
+    
+    def __init__(self, conn, api, max_age=ISSUE_INDEX_MAX_AGE, writer=None, conn_lock=None):
+        self.conn = conn
+        self.conn_lock = conn_lock or threading.Lock()
+        self.api = api
+        self.max_age = max_age
+        self.writer = writer
+        self.fetches = 0
+        self._volumes = {}  # volume_id -> estado (edições, próximo offset, total)
+        self._volume_locks = {}
+        self._lock = threading.Lock()
+        create_issue_tables(conn)
+    
+    def _write(self, statements):
+        if self.writer:
+            self.writer.submit(statements)
+        else:
+            with self.conn_lock:
+                for sql, rows in statements:
+                    self.conn.executemany(sql, rows)
+    
+    def _load(self, volume_id):
+        """Lê o que já foi baixado do volume (None se ausente ou vencido)"""
+        with self.conn_lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT fetched_at, COALESCE(next_offset, issue_count), total_issues
+                FROM cv_issue_volumes WHERE volume_id = ?
+            ''', (volume_id,))
+            row = cursor.fetchone()
+            if row is None or time.time() - row[0] >= self.max_age:
+                return None
+            
+            cursor.execute('''
+                SELECT issue_id, issue_number, issue_number_norm, name
+                FROM cv_issues WHERE volume_id = ? ORDER BY issue_id
+            ''', (volume_id,))
+            stored = cursor.fetchall()
         
-        # Normaliza o número da edição para comparação
-        issue_num_normalized = issue_number.lstrip('0') or '0'
+        issues = {}
+        for issue_id, issue_number, normalized, name in stored:
+            issues.setdefault(normalized, {'id': issue_id, 'issue_number': issue_number, 'name': name})
         
-        for issue in issues:
-            api_issue_num = str(issue.get('issue_number', '')).lstrip('0') or '0'
-            if api_issue_num == issue_num_normalized:
-                return issue
+        # total_issues NULL: lista antiga de página única, pode haver mais
+        return {'issues': issues, 'next_offset': row[1], 'total': row[2], 'fetched_at': row[0]}
+    
+    def _fetch_page(self, volume_id, state):
+        """Baixa a próxima página do volume e guarda no banco"""
+        page = self.api.get_volume_issues_page(volume_id, state['next_offset'])
+        with self._lock:
+            self.fetches += 1
+        if page is None:
+            return False
+        results, total = page
         
-        return None
+        statements = []
+        if state['next_offset'] == 0:
+            # Recomeçando: descarta a cópia anterior do volume
+            statements.append(('DELETE FROM cv_issues WHERE volume_id = ?', [(volume_id,)]))
+            state['fetched_at'] = time.time()
+        
+        rows = []
+        for issue in results:
+            normalized = normalize_issue_number(issue.get('issue_number'))
+            state['issues'].setdefault(normalized, issue)
+            rows.append((issue['id'], volume_id, issue.get('issue_number'), normalized, issue.get('name')))
+        statements.append(('''
+            INSERT OR REPLACE INTO cv_issues (issue_id, volume_id, issue_number, issue_number_norm, name)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows))
+        
+        state['next_offset'] += len(results)
+        # Página vazia: a API tem menos edições do que anunciou
+        state['total'] = total if results else state['next_offset']
+        statements.append(('''
+            INSERT OR REPLACE INTO cv_issue_volumes
+            (volume_id, issue_count, fetched_at, next_offset, total_issues)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(volume_id, state['next_offset'], state['fetched_at'],
+               state['next_offset'], state['total'])]))
+        self._write(statements)
+        return True
+    
+    def _state(self, volume_id):
+        state = self._volumes.get(volume_id)
+        if state is None:
+            state = self._load(volume_id)
+            if state is None:
+                state = {'issues': {}, 'next_offset': 0, 'total': None, 'fetched_at': None}
+            self._volumes[volume_id] = state
+        return state
+    
+    def _volume_lock(self, volume_id):
+        with self._lock:
+            return self._volume_locks.setdefault(volume_id, threading.Lock())
+    
+    def find(self, volume_id, issue_number):
+        """Encontra uma edição do volume (None se não existir)"""
+        normalized = normalize_issue_number(issue_number)
+        
+        with self._volume_lock(volume_id):
+            state = self._state(volume_id)
+            
+            # Pagina só enquanto o número não apareceu e ainda há edições
+            while normalized not in state['issues']:
+                if state['total'] is not None and state['next_offset'] >= state['total']:
+                    break
+                if not self._fetch_page(volume_id, state):
+                    break
+            
+            return state['issues'].get(normalized)
 
-def process_comics(db_path, limit=None, resume=True):
+def group_by_series(comics):
+    """
+    Agrupa arquivos pendentes por (título, ano)
+    
+    A busca da API não diferencia maiúsculas/espaços, então a chave também
+    não. Retorna lista de (título, ano, [(id, arquivo, edição)]) na ordem
+    em que cada série apareceu.
+    """
+    groups = {}
+    for comic_id, filename, title, issue_num, year in comics:
+        key = (' '.join((title or '').lower().split()), year)
+        if key not in groups:
+            groups[key] = (title, year, [])
+        groups[key][2].append((comic_id, filename, issue_num))
+    return list(groups.values())
+
+def _mark_group(comic_ids, status, message, fingerprint=None):
+    """Comandos que marcam todos os arquivos de um grupo com o mesmo status"""
+    return [(f'''
+        UPDATE comics 
+        SET status = ?, 
+            error_message = ?,
+            query_fingerprint = ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id IN ({','.join('?' * len(chunk))})
+    ''', [(status, message, fingerprint, *chunk)]) for chunk in _chunks(comic_ids)]
+
+def _fail_group(retries, comic_ids, fingerprint, status, message):
+    """Marca o grupo como falho e agenda a próxima tentativa da busca"""
+    statements = _mark_group(comic_ids, status, message, fingerprint)
+    if retries:
+        statements += retries.record_failure(fingerprint, status, message)
+    return statements
+
+def _chunks(ids, size=UPDATE_CHUNK_SIZE):
+    """Divide listas de ids para não passar do limite de parâmetros do SQLite"""
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+class DatabaseWriter:
+    """
+    Thread única que grava no banco
+    
+    Os workers entregam lotes de comandos (submit) e seguem trabalhando;
+    a thread aplica os lotes na ordem e faz commit a cada interval
+    segundos. Um lote nunca é dividido entre dois commits, então uma
+    queda no meio nunca deixa uma série gravada pela metade. close()
+    grava tudo o que ainda está na fila.
+    
+    Cada lote roda num savepoint: com o banco travado por outro processo
+    ('database is locked') ele é desfeito e repetido com espera crescente.
+    Qualquer outro erro desfaz a transação aberta e para o escritor.
+    """
+    
+    def __init__(self, db_path, interval=COMMIT_INTERVAL, queue_size=WRITER_QUEUE_SIZE):
+        self.db_path = db_path
+        self.interval = interval
+        self.commits = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name='comic-db-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, statements):
+        """Enfileira uma lista de (sql, linhas) a gravar na mesma transação"""
+        if self.error:
+            raise RuntimeError(f"Escritor do banco parou: {self.error}")
+        self._queue.put(statements)
+    
+    def flush(self):
+        """Espera a fila ser gravada e confirmada"""
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.5):
+            if not self._thread.is_alive():
+                break
+    
+    def close(self):
+        """Grava o que falta e encerra a thread"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    @staticmethod
+    def _locked(error):
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+    
+    def _retry_delay(self, error, attempt):
+        """Espera antes de repetir, ou relança se não for trava ou acabaram as tentativas"""
+        if not self._locked(error) or attempt == LOCK_RETRIES:
+            raise error
+        delay = LOCK_RETRY_DELAY * 2 ** attempt
+        print(f"\n  ⚠️  Banco travado, tentando de novo em {delay:g}s...")
+        time.sleep(delay)
+    
+    def _apply(self, conn, statements):
+        """Aplica um lote inteiro ou nada, repetindo se o banco estiver travado"""
+        for attempt in range(LOCK_RETRIES + 1):
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            conn.execute('SAVEPOINT writer_batch')
+            try:
+                for sql, rows in statements:
+                    conn.executemany(sql, rows)
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK TO writer_batch')
+                    conn.execute('RELEASE writer_batch')
+                self._retry_delay(e, attempt)
+                continue
+            conn.execute('RELEASE writer_batch')
+            return
+    
+    def _commit(self, conn):
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                conn.commit()
+                self.commits += 1
+                return
+            except sqlite3.OperationalError as e:
+                self._retry_delay(e, attempt)
+    
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=WRITER_BUSY_TIMEOUT)
+        last_commit = time.time()
+        dirty = False
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.interval)
+                except queue.Empty:
+                    item = False
+                
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    self._commit(conn)
+                    dirty = False
+                    last_commit = time.time()
+                    item.set()
+                    continue
+                if item:
+                    self._apply(conn, item)
+                    dirty = True
+                
+                if dirty and time.time() - last_commit >= self.interval:
+                    self._commit(conn)
+                    dirty = False
+                    last_commit = time.time()
+            
+            self._commit(conn)
+        except Exception as e:
+            self.error = e
+            print(f"\n❌ Erro ao gravar no banco: {e}")
+            # Nada pela metade: descarta o que não foi confirmado
+            conn.rollback()
+            # Esvazia a fila para ninguém ficar bloqueado em submit/flush
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+        finally:
+            conn.close()
+
+def resolve_group(api, catalog, issue_index, title, year, files, retries=None):
+    """
+    Resolve uma série inteira (executado pelos workers)
+    
+    Uma busca que já falhou com o mesmo título/ano e ainda está em backoff
+    (retries) não vai à API; o grupo só é resolvido se o catálogo local
+    conhecer o volume. Retorna (status, linhas para o console, comandos
+    para o escritor).
+    """
+    comic_ids = [comic_id for comic_id, _, _ in files]
+    fingerprint = query_fingerprint(title, year)
+    lines = []
+    
+    try:
+        # Busca o volume (uma vez para a série inteira): primeiro no
+        # catálogo local, na API só se não houver volume confiável
+        volume = None
+        if catalog:
+            volume, _ = catalog.match(title, year)
+        from_catalog = volume is not None
+        if not from_catalog:
+            # Cache negativo: mesma busca falhou há pouco
+            blocked = retries.blocked(fingerprint) if retries else None
+            if blocked:
+                status, attempts, next_attempt_at = blocked
+                lines.append(f"   ⏭️  Busca já falhou ({attempts}x), nova tentativa em "
+                             f"{format_delay(next_attempt_at - time.time())}")
+                message = 'Volume não encontrado' if status == 'not_found' else 'Aguardando nova tentativa'
+                return status, lines, _mark_group(comic_ids, status, message, fingerprint)
+            
+            volumes = api.search_volumes(title)
+            if catalog:
+                catalog.add_many(volumes)
+            volume = pick_volume(volumes, year)
+        
+        if not volume:
+            lines.append("   🔍 Volume ❌ Não encontrado")
+            return 'not_found', lines, _fail_group(retries, comic_ids, fingerprint,
+                                                   'not_found', 'Volume não encontrado')
+        
+        volume_id = volume['id']
+        volume_name = volume['name']
+        volume_year = volume.get('start_year')
+        publisher = volume.get('publisher', {})
+        publisher_name = publisher.get('name') if publisher else None
+        
+        lines.append(f"   🔍 Volume ✓ {volume_name} ({volume_year})" +
+                     (" [catálogo local]" if from_catalog else ""))
+        
+        # Dados do volume: um único UPDATE para todos os arquivos do grupo
+        statements = [(f'''
+            UPDATE comics 
+            SET comicvine_volume_id = ?,
+                comicvine_issue_id = NULL,
+                volume_name = ?,
+                publisher = ?,
+                status = 'identified',
+                error_message = NULL,
+                query_fingerprint = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id IN ({','.join('?' * len(chunk))})
+        ''', [(volume_id, volume_name, publisher_name, *chunk)]) for chunk in _chunks(comic_ids)]
+        if retries:
+            statements += retries.record_success(fingerprint)
+        
+        # Edições: casadas pelo índice local do volume (cv_issues)
+        numbered = [(comic_id, issue_num) for comic_id, _, issue_num in files if issue_num]
+        if numbered:
+            matches = []
+            for comic_id, issue_num in numbered:
+                issue = issue_index.find(volume_id, issue_num)
+                if issue:
+                    matches.append((issue['id'], comic_id))
+            statements.append(('UPDATE comics SET comicvine_issue_id = ? WHERE id = ?', matches))
+            
+            missing = len(numbered) - len(matches)
+            lines.append(f"   🔍 Edições ✓ {len(matches)} encontrada(s)" +
+                         (f", ⚠️  {missing} não encontrada(s) no volume" if missing else ""))
+        
+        return 'identified', lines, statements
+        
+    except Exception as e:
+        lines.append(f"   ❌ Erro: {e}")
+        return 'error', lines, _fail_group(retries, comic_ids, fingerprint, 'error', str(e))
+
+def process_comics(db_path, limit=None, resume=True, use_cache=True,
+                   use_catalog=True, match_threshold=MATCH_THRESHOLD, workers=DEFAULT_WORKERS,
+                   retry_failed=True):
     """
     Processa arquivos pendentes do banco de dados
+    
+    Os arquivos são agrupados por série (título + ano): cada grupo faz uma
+    única busca de volume e uma única listagem de edições, e o resultado é
+    gravado em todos os arquivos do grupo de uma vez. O catálogo local de
+    volumes é consultado antes da busca na API.
+    
+    Pipeline: vários workers resolvem séries ao mesmo tempo (enquanto um
+    espera a vez no limitador, outro já processa a resposta anterior), a
+    thread principal só mostra o progresso e uma única thread escritora
+    grava no banco com commits a cada COMMIT_INTERVAL segundos.
+    
+    Com retry_failed, arquivos not_found/error voltam à fila quando o
+    título/ano mudou ou quando o backoff da última falha venceu
+    (comic_retry); os demais continuam esperando.
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
+    retries = RetrySchedule(conn)
     
     # Conta pendentes
     cursor.execute("SELECT COUNT(*) FROM comics WHERE status = 'pending'")
     total_pending = cursor.fetchone()[0]
     
-    if total_pending == 0:
+    # Falhas cuja busca mudou ou cujo backoff venceu
+    retry_ids = []
+    waiting = []
+    if retry_failed:
+        changed, due, waiting = classify_failed(conn)
+        retry_ids = changed + due
+    
+    if total_pending == 0 and not retry_ids:
         print("✅ Não há arquivos pendentes para processar!")
+        if waiting:
+            print(f"   ⏳ {len(waiting)} falhas aguardando backoff (veja comic_retry.py)")
         return
     
     print(f"\n📊 {total_pending} arquivos pendentes")
+    if retry_failed:
+        print(f"   🔁 {len(retry_ids)} falhas para nova tentativa, {len(waiting)} aguardando backoff")
     
     if limit:
         print(f"   Processando apenas {limit} arquivos (limite especificado)")
-        total_to_process = min(limit, total_pending)
-    else:
-        total_to_process = total_pending
-    
-    print(f"\n⏱️  Tempo estimado: {int(total_to_process * REQUEST_DELAY / 60)} minutos")
-    print("=" * 60)
     
     # Busca arquivos pendentes
     query = "SELECT id, file_name, clean_title, issue_number, year FROM comics WHERE status = 'pending'"
@@ -166,9 +679,39 @@ def process_comics(db_path, limit=None, resume=True):
         query += f" LIMIT {limit}"
     
     cursor.execute(query)
-    comics = cursor.fetchall()
+    rows = cursor.fetchall()
+    
+    # Completa com as falhas a tentar de novo
+    retry_ids = retry_ids[:max(0, limit - len(rows))] if limit else retry_ids
+    for chunk in _chunks(retry_ids):
+        cursor.execute(f'''
+            SELECT id, file_name, clean_title, issue_number, year FROM comics
+            WHERE id IN ({','.join('?' * len(chunk))})
+        ''', chunk)
+        rows.extend(cursor.fetchall())
+    
+    groups = group_by_series(rows)
+    total_groups = len(groups)
+    
+    # Até 2 requisições por série (busca + edições)
+    print(f"   {total_groups} séries distintas (título + ano)")
+    print(f"\n⏱️  Tempo estimado: {int(total_groups * 2 * REQUEST_DELAY / 60)} minutos")
+    print("=" * 60)
+    
+    cache = open_cache(db_path, enabled=use_cache)
+    limiter = open_limiter(db_path, min_interval=REQUEST_DELAY)
+    api = ComicVineAPI(API_KEY, cache=cache, limiter=limiter)
+    
+    writer = DatabaseWriter(db_path)
+    # Os workers leem pela mesma conexão: um lock só para todos os leitores
+    conn_lock = threading.Lock()
+    issue_index = IssueIndex(conn, api, writer=writer, conn_lock=conn_lock)
     
-    api = ComicVineAPI(API_KEY)
+    catalog = None
+    if use_catalog:
+        catalog = VolumeCatalog(conn, threshold=match_threshold, writer=writer, conn_lock=conn_lock)
+        catalog.import_identified()
+        writer.flush()
     
     processed = 0
     identified = 0
@@ -176,101 +719,78 @@ def process_comics(db_path, limit=None, resume=True):
     errors = 0
     
     start_time = time.time()
+    stop = threading.Event()
     
-    for comic_id, filename, title, issue_num, year in comics:
-        processed += 1
-        
-        # Mostra progresso
-        elapsed = time.time() - start_time
-        rate = processed / elapsed if elapsed > 0 else 0
-        eta_seconds = (total_to_process - processed) / rate if rate > 0 else 0
-        eta_minutes = int(eta_seconds / 60)
-        
-        print(f"\n[{processed}/{total_to_process}] {title}", end='')
-        if issue_num:
-            print(f" #{issue_num}", end='')
-        if year:
-            print(f" ({year})", end='')
-        print(f" | ETA: {eta_minutes}min")
+    def task(title, year, files):
+        if stop.is_set():
+            return None
+        status, lines, statements = resolve_group(api, catalog, issue_index, title, year, files, retries)
+        writer.submit(statements)
+        return status, lines
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='comic-identify')
+    try:
+        futures = {executor.submit(task, *group): group for group in groups}
         
-        try:
-            # Busca o volume
-            print(f"   🔍 Buscando volume...", end='')
-            volume = api.search_volume(title, year)
-            
-            if not volume:
-                print(" ❌ Não encontrado")
-                cursor.execute('''
-                    UPDATE comics 
-                    SET status = 'not_found', 
-                        error_message = 'Volume não encontrado',
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (comic_id,))
-                not_found += 1
+        for group_index, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if result is None:
                 continue
+            status, lines = result
+            title, year, files = futures[future]
+            processed += len(files)
+            if status == 'identified':
+                identified += len(files)
+            elif status == 'not_found':
+                not_found += len(files)
+            else:
+                errors += len(files)
             
-            volume_id = volume['id']
-            volume_name = volume['name']
-            volume_year = volume.get('start_year')
-            publisher = volume.get('publisher', {})
-            publisher_name = publisher.get('name') if publisher else None
-            
-            print(f" ✓ {volume_name} ({volume_year})")
-            
-            # Se temos número da edição, busca a edição específica
-            issue_id = None
-            if issue_num:
-                print(f"   🔍 Buscando edição #{issue_num}...", end='')
-                issue = api.find_issue(volume_id, issue_num)
-                if issue:
-                    issue_id = issue['id']
-                    print(f" ✓ Encontrada")
-                else:
-                    print(f" ⚠️  Edição não encontrada no volume")
-            
-            # Atualiza banco de dados
-            cursor.execute('''
-                UPDATE comics 
-                SET comicvine_volume_id = ?,
-                    comicvine_issue_id = ?,
-                    volume_name = ?,
-                    publisher = ?,
-                    status = 'identified',
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (volume_id, issue_id, volume_name, publisher_name, comic_id))
-            
-            identified += 1
-            
-            # Commit a cada 10 registros
-            if processed % 10 == 0:
-                conn.commit()
-                print(f"\n   💾 Progresso salvo ({identified} identificados, {not_found} não encontrados)")
+            # Mostra progresso
+            elapsed = time.time() - start_time
+            rate = group_index / elapsed if elapsed > 0 else 0
+            eta_seconds = (total_groups - group_index) / rate if rate > 0 else 0
+            eta_minutes = int(eta_seconds / 60)
             
-        except Exception as e:
-            print(f"   ❌ Erro: {e}")
-            cursor.execute('''
-                UPDATE comics 
-                SET status = 'error',
-                    error_message = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (str(e), comic_id))
-            errors += 1
-    
-    # Commit final
-    conn.commit()
+            print(f"\n[{group_index}/{total_groups}] {title}", end='')
+            if year:
+                print(f" ({year})", end='')
+            print(f" - {len(files)} arquivo(s) | ETA: {eta_minutes}min")
+            for line in lines:
+                print(line)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrompido: terminando as séries em andamento e gravando...")
+        stop.set()
+        raise
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+        # Tudo o que os workers entregaram é gravado antes de sair
+        writer.close()
+        if writer.error:
+            print(f"   ⚠️  Parte dos resultados não foi gravada: {writer.error}")
     
     # Estatísticas finais
     elapsed_time = time.time() - start_time
     print("\n" + "=" * 60)
     print("📊 RESULTADO FINAL:")
-    print(f"   • Processados: {processed}")
+    print(f"   • Processados: {processed} ({total_groups} séries)")
     print(f"   • Identificados: {identified} ({identified/processed*100:.1f}%)")
     print(f"   • Não encontrados: {not_found} ({not_found/processed*100:.1f}%)")
     print(f"   • Erros: {errors}")
+    if retries.skipped:
+        print(f"   • Buscas puladas (falha recente, em backoff): {retries.skipped}")
+    print(f"   • Páginas de edições baixadas: {issue_index.fetches} (demais vieram de cv_issues)")
+    print(f"   • Commits no banco: {writer.commits} (a cada {COMMIT_INTERVAL:g}s)")
     print(f"   • Tempo total: {int(elapsed_time/60)}min {int(elapsed_time%60)}s")
+    if cache:
+        print(f"   • Cache HTTP: {cache.summary()}")
+        cache.close()
+    if catalog:
+        print(f"   • Catálogo de volumes: {catalog.summary()}")
+    if limiter.throttled:
+        print(f"   • Espera por limite de requisições: {int(limiter.throttled)}s")
+    limiter.close()
     print("=" * 60)
     
     conn.close()
@@ -290,6 +810,11 @@ def show_status(db_path):
         percentage = (count / total * 100) if total > 0 else 0
         print(f"   • {status}: {count} ({percentage:.1f}%)")
     
+    changed, due, waiting = classify_failed(conn)
+    if changed or due or waiting:
+        print(f"   🔁 Falhas: {len(changed) + len(due)} prontas para nova tentativa, "
+              f"{len(waiting)} aguardando backoff")
+    
     print("=" * 60)
     
     conn.close()
@@ -345,6 +870,16 @@ def main():
     parser.add_argument('--limit', type=int, help='Limita número de arquivos a processar (para testes)')
     parser.add_argument('--status', action='store_true', help='Mostra apenas o status atual')
     parser.add_argument('--export', action='store_true', help='Exporta resultados para CSV')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignora o cache de respostas da API (comicvine_cache.db)')
+    parser.add_argument('--no-catalog', action='store_true',
+                       help='Não consulta o catálogo local de volumes antes da API')
+    parser.add_argument('--match-threshold', type=float, default=MATCH_THRESHOLD,
+                       help=f'Similaridade mínima para usar o catálogo local (padrão: {MATCH_THRESHOLD})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Séries resolvidas em paralelo (padrão: {DEFAULT_WORKERS})')
+    parser.add_argument('--no-retry', action='store_true',
+                       help='Processa só os pendentes (não tenta de novo falhas com backoff vencido)')
     
     args = parser.parse_args()
     
@@ -361,7 +896,13 @@ def main():
         return
     
     # Processa arquivos
-    process_comics(args.db, limit=args.limit)
+    try:
+        process_comics(args.db, limit=args.limit, use_cache=not args.no_cache,
+                       use_catalog=not args.no_catalog, match_threshold=args.match_threshold,
+                       workers=args.workers, retry_failed=not args.no_retry)
+    except KeyboardInterrupt:
+        print("💾 Resultados já resolvidos foram gravados; rode de novo para continuar")
+        sys.exit(130)
     
     # Oferece exportar
     response = input("\n📤 Deseja exportar os resultados para CSV? (s/n): ")
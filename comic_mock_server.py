@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Comic Mock Server - Servidor local que imita a API do Comic Vine
+Serve search, issues, volumes, issue/4000-* e as capas (/covers/) a partir de um catálogo
+sintético ou de respostas gravadas (comicvine_cache.db), para testes de carga sem gastar a API
+"""
+
+import json
+import os
+import random
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from comic_http_cache import cache_key, endpoint_family
+
+DEFAULT_PORT = 8420
+DEFAULT_VOLUMES = 5000
+DEFAULT_SEED = 42
+PAGE_LIMIT = 100  # Máximo que a API real devolve por requisição
+
+PUBLISHERS = ['Marvel', 'DC Comics', 'Image', 'Dark Horse Comics', 'IDW Publishing', 'Boom! Studios']
+WORDS = ['Amazing', 'Dark', 'Night', 'Legion', 'Iron', 'Shadow', 'Star', 'Hunter', 'Saga',
+         'Knight', 'Storm', 'Patrol', 'Cosmic', 'Wild', 'Secret', 'Doom', 'Spider', 'Titans']
+ROLES = ['writer', 'penciler', 'inker', 'colorist', 'letterer', 'editor', 'cover']
+COVER_SIZE = (66, 100)  # Capas sintéticas: PNG de uma cor por edição
+
+def png_image(width, height, rgb):
+    """PNG de uma cor só, sem depender do Pillow"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    row = b'\x00' + bytes(rgb) * width
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height, 9))
+            + chunk(b'IEND', b''))
+
+class SyntheticCatalog:
+    """
+    Catálogo determinístico de volumes e edições
+
+    Cada nome de série tem de 1 a 3 volumes (relançamentos em anos
+    diferentes), como no Comic Vine. A mesma semente gera sempre o mesmo
+    catálogo, então o comic_benchmark.py monta a biblioteca a partir dele.
+    """
+
+    def __init__(self, volumes=DEFAULT_VOLUMES, seed=DEFAULT_SEED):
+        rng = random.Random(seed)
+        self.volumes = {}   # volume_id -> dict
+        self.by_name = {}   # nome normalizado -> [volume_id]
+        self.updated = {}   # issue_id -> date_last_updated alterado (touch)
+        self.image_base = 'http://localhost'  # start_server troca pelo endereço real
+
+        volume_id = 1000
+        series = 0
+        while len(self.volumes) < volumes:
+            series += 1
+            name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {series}"
+            start_year = rng.randint(1960, 2020)
+            for _ in range(rng.choice([1, 1, 1, 2, 3])):
+                if len(self.volumes) >= volumes:
+                    break
+                volume = {
+                    'id': volume_id,
+                    'name': name,
+                    'start_year': str(start_year),
+                    'publisher': {'name': rng.choice(PUBLISHERS)},
+                    # Poucas séries longas, muitas curtas
+                    'count_of_issues': min(900, int(rng.paretovariate(1.2) * 6)),
+                }
+                self.volumes[volume_id] = volume
+                self.by_name.setdefault(self.normalize(name), []).append(volume_id)
+                volume_id += 1
+                start_year += rng.randint(3, 12)
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(str(text).lower().split())
+
+    @staticmethod
+    def issue_id(volume_id, number):
+        return volume_id * 10000 + number
+
+    def touch(self, issue_ids, date='2030-01-01 00:00:00'):
+        """Simula correções no Comic Vine: muda o date_last_updated das edições"""
+        for issue_id in issue_ids:
+            self.updated[issue_id] = date
+
+    def cover(self, name):
+        """Bytes da capa '<issue_id>.png' ou '<issue_id>-small.png' (None se não existe)"""
+        match = re.match(r'(\d+)(-small)?\.png$', name)
+        if not match or not self.issue_summary(int(match.group(1))):
+            return None
+        rng = random.Random(int(match.group(1)))
+        width, height = COVER_SIZE
+        if match.group(2):
+            width, height = width // 2, height // 2
+        return png_image(width, height, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+
+    def search(self, query):
+        return [self.volumes[v] for v in self.by_name.get(self.normalize(query), [])]
+
+    def volume_issues(self, volume_id):
+        volume = self.volumes.get(volume_id)
+        if not volume:
+            return []
+        return [self.issue_summary(self.issue_id(volume_id, n)) for n in range(1, volume['count_of_issues'] + 1)]
+
+    def volume_details(self, volume_id):
+        """Volume completo, como /volumes/ devolve (None se não existe)"""
+        volume = self.volumes.get(volume_id)
+        if not volume:
+            return None
+        first = self.issue_id(volume_id, 1)
+        last = self.issue_id(volume_id, volume['count_of_issues'])
+        return dict(volume,
+                    deck=f"{volume['name']} ({volume['start_year']})",
+                    description=f"<p>{volume['name']}, {volume['count_of_issues']} edições.</p>",
+                    image={'medium_url': f"{self.image_base}/covers/{first}.png",
+                           'small_url': f"{self.image_base}/covers/{first}-small.png"},
+                    first_issue={'id': first, 'issue_number': '1'},
+                    last_issue={'id': last, 'issue_number': str(volume['count_of_issues'])},
+                    site_detail_url=f"http://localhost/volume/4050-{volume_id}/",
+                    date_last_updated=f"{int(volume['start_year']) + 1}-01-01 00:00:00")
+
+    def issue_summary(self, issue_id):
+        volume_id, number = divmod(issue_id, 10000)
+        volume = self.volumes.get(volume_id)
+        if not volume or not 1 <= number <= volume['count_of_issues']:
+            return None
+        year = int(volume['start_year']) + (number - 1) // 12
+        month = (number - 1) % 12 + 1
+        return {
+            'id': issue_id,
+            'issue_number': str(number),
+            'name': f"Chapter {number}",
+            'volume': {'id': volume_id, 'name': volume['name']},
+            'cover_date': f"{year}-{month:02d}-01",
+            'store_date': f"{year}-{month:02d}-01",
+            'description': f"<p>{volume['name']} #{number}</p>",
+            'image': {'medium_url': f"{self.image_base}/covers/{issue_id}.png",
+                      'small_url': f"{self.image_base}/covers/{issue_id}-small.png"},
+            'site_detail_url': f"http://localhost/issue/4000-{issue_id}/",
+            'date_last_updated': self.updated.get(issue_id, f"{year + 1}-01-01 00:00:00"),
+        }
+
+    def issue_details(self, issue_id):
+        issue = self.issue_summary(issue_id)
+        if not issue:
+            return None
+        rng = random.Random(issue_id)
+        issue['person_credits'] = [
+            {'id': 5000 + person, 'name': f"Creator {person}", 'role': role}
+            for person, role in ((rng.randint(0, 800), role) for role in ROLES)
+        ]
+        issue['character_credits'] = [{'id': 20000 + c, 'name': f"Character {c}"}
+                                      for c in rng.sample(range(3000), rng.randint(2, 15))]
+        issue['team_credits'] = [{'id': 40000 + t, 'name': f"Team {t}"}
+                                 for t in rng.sample(range(300), rng.randint(0, 3))]
+        issue['location_credits'] = [{'id': 50000 + l, 'name': f"Location {l}"}
+                                     for l in rng.sample(range(500), rng.randint(0, 3))]
+        issue['story_arc_credits'] = [{'id': 60000 + a, 'name': f"Arc {a}"}
+                                      for a in rng.sample(range(400), rng.randint(0, 1))]
+        return issue
+
+class Fixtures:
+    """Respostas gravadas no cache HTTP (mesma chave que o comic_http_cache usa)"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, params):
+        key, _ = cache_key(endpoint, params)
+        with self._lock:
+            row = self.conn.execute('SELECT body FROM responses WHERE cache_key = ?', (key,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+class MockComicVine:
+    """Estado do servidor: catálogo, gravações, latência, falhas e contadores"""
+
+    def __init__(self, catalog=None, fixtures=None, latency=0.0, jitter=0.0, fail_rate=0.0, seed=DEFAULT_SEED):
+        self.catalog = catalog or SyntheticCatalog()
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.counts = {}
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def count(self, endpoint):
+        with self._lock:
+            family = endpoint_family(endpoint)
+            self.counts[family] = self.counts.get(family, 0) + 1
+
+    def total_requests(self):
+        with self._lock:
+            return sum(self.counts.values())
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {}
+            self.failures = 0
+
+    def should_fail(self):
+        with self._lock:
+            fail = self.fail_rate > 0 and self._rng.random() < self.fail_rate
+            if fail:
+                self.failures += 1
+            return fail
+
+    def respond(self, endpoint, params):
+        """Monta a resposta JSON (dict) para um endpoint"""
+        if self.fixtures:
+            recorded = self.fixtures.get(endpoint, params)
+            if recorded is not None:
+                return recorded
+
+        if endpoint == 'search':
+            results = self.catalog.search(params.get('query', ''))
+            limit = int(params.get('limit', 10))
+            return page(results[:limit], len(results), 0, limit)
+
+        if endpoint == 'issues':
+            return self.list_issues(params)
+
+        if endpoint == 'volumes':
+            return self.list_volumes(params)
+
+        match = re.match(r'issue/4000-(\d+)$', endpoint)
+        if match:
+            issue = self.catalog.issue_details(int(match.group(1)))
+            if not issue:
+                return {'status_code': 101, 'error': 'Object Not Found', 'results': []}
+            return {'status_code': 1, 'error': 'OK', 'results': issue}
+
+        return {'status_code': 102, 'error': 'Error in URL Format', 'results': []}
+
+    def list_issues(self, params):
+        """/issues/ com filter=volume:X ou filter=id:a|b|c, sort id e offset"""
+        filters = {}
+        for part in params.get('filter', '').split(','):
+            if ':' in part:
+                field, value = part.split(':', 1)
+                filters[field] = value
+
+        if 'volume' in filters:
+            issues = self.catalog.volume_issues(int(filters['volume']))
+        elif 'id' in filters:
+            ids = [int(i) for i in filters['id'].split('|') if i.isdigit()]
+            issues = [i for i in (self.catalog.issue_summary(i) for i in ids) if i]
+        else:
+            issues = []
+
+        if params.get('sort', '').startswith('id:'):
+            issues.sort(key=lambda i: i['id'], reverse=params['sort'].endswith(':desc'))
+
+        offset = int(params.get('offset', 0))
+        limit = min(int(params.get('limit', PAGE_LIMIT)), PAGE_LIMIT)
+        return page(issues[offset:offset + limit], len(issues), offset, limit)
+
+    def list_volumes(self, params):
+        """/volumes/ com filter=id:a|b|c"""
+        ids = []
+        for part in params.get('filter', '').split(','):
+            if part.startswith('id:'):
+                ids = [int(i) for i in part[3:].split('|') if i.isdigit()]
+        volumes = [v for v in (self.catalog.volume_details(i) for i in ids) if v]
+        offset = int(params.get('offset', 0))
+        limit = min(int(params.get('limit', PAGE_LIMIT)), PAGE_LIMIT)
+        return page(volumes[offset:offset + limit], len(volumes), offset, limit)
+
+def page(results, total, offset, limit):
+    return {
+        'status_code': 1,
+        'error': 'OK',
+        'limit': limit,
+        'offset': offset,
+        'number_of_page_results': len(results),
+        'number_of_total_results': total,
+        'results': results,
+    }
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # Sem log por requisição (atrapalha o benchmark)
+
+        def send_json(self, status, data):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            endpoint = url.path.strip('/')
+            if endpoint.startswith('api/'):
+                endpoint = endpoint[4:]
+
+            if endpoint == '_stats':
+                self.send_json(200, {'counts': mock.counts, 'failures': mock.failures})
+                return
+
+            if mock.latency or mock.jitter:
+                time.sleep(mock.latency + random.uniform(0, mock.jitter))
+
+            mock.count(endpoint)
+            if mock.should_fail():
+                self.send_json(420, {'status_code': 107, 'error': 'Rate limit exceeded', 'results': []})
+                return
+
+            if endpoint.startswith('covers/'):
+                image = mock.catalog.cover(endpoint[len('covers/'):])
+                if image is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(image)))
+                self.end_headers()
+                self.wfile.write(image)
+                return
+
+            self.send_json(200, mock.respond(endpoint, params))
+
+    return Handler
+
+def start_server(mock, host='127.0.0.1', port=0):
+    """Sobe o servidor numa thread; retorna (servidor, BASE_URL)"""
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name='comic-mock-server').start()
+    mock.catalog.image_base = f"http://{host}:{server.server_address[1]}"
+    return server, f"http://{host}:{server.server_address[1]}/api"
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local que imita a API do Comic Vine')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço (padrão: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Porta (padrão: {DEFAULT_PORT})')
+    parser.add_argument('--volumes', type=int, default=DEFAULT_VOLUMES,
+                       help=f'Volumes no catálogo sintético (padrão: {DEFAULT_VOLUMES})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Semente do catálogo sintético')
+    parser.add_argument('--fixtures', metavar='CACHE_DB',
+                       help='Serve respostas gravadas de um comicvine_cache.db antes do catálogo')
+    parser.add_argument('--latency', type=float, default=0.0, help='Atraso por requisição em segundos')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Atraso extra aleatório (0 a N segundos)')
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                       help='Fração de requisições respondidas com 420 (ex.: 0.02)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  🧪 COMIC MOCK SERVER")
+    print("=" * 60)
+
+    fixtures = None
+    if args.fixtures:
+        if not os.path.exists(args.fixtures):
+            print(f"\n❌ Arquivo de respostas não encontrado: {args.fixtures}")
+            sys.exit(1)
+        fixtures = Fixtures(args.fixtures)
+
+    catalog = SyntheticCatalog(volumes=args.volumes, seed=args.seed)
+    mock = MockComicVine(catalog, fixtures=fixtures, latency=args.latency,
+                         jitter=args.jitter, fail_rate=args.fail_rate, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mock))
+    server.daemon_threads = True
+    catalog.image_base = f"http://{args.host}:{args.port}"
+
+    base_url = f"http://{args.host}:{args.port}/api"
+    print(f"\n📚 Catálogo: {len(catalog.volumes)} volumes, {len(catalog.by_name)} séries")
+    if fixtures:
+        print(f"💾 Respostas gravadas: {args.fixtures}")
+    print(f"⏱️  Latência: {args.latency}s (+ até {args.jitter}s) | 420: {args.fail_rate * 100:g}%")
+    print(f"\n🌐 Servindo em {base_url}")
+    print(f"   COMICVINE_BASE_URL={base_url} python3 comic_identifier.py --db ...")
+    print("\nCtrl+C para parar")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n\n📊 Requisições: {mock.counts} | 420 injetados: {mock.failures}")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Comic Parser - Extração de título, edição e ano a partir do nome do arquivo
+Compartilhado por comic_scanner.py e comic_recleaner.py
+"""
+
+import os
+import re
+from functools import lru_cache
+
+# Tags comuns de scan groups e qualidade
+SCAN_TAGS = [
+    'Digital', 'Mephisto', 'Empire', 'DCP', 'EvilTrash', 'GreenGiant',
+    'Zone', 'bittertek', 'eclipse', 'c2c', 'Scan', 'HD', 'HQ',
+    'Minutemen', 'Glorith', 'AnHeroGold', 'ScannerDarkly', 'Nemesis43',
+    'CaptainMalcom', 'Archangel', 'BlackManta', 'Shadowcat', 'Oroboros',
+    'Son of Ultron', 'digital', 'scans', 'retail', 'web', 'cbr', 'cbz',
+    'complete', 'ongoing', 'fixed', 'proper', 'repost'
+]
+
+# Palavras comuns que não são título (removidas apenas no final)
+NOISE_WORDS = ['to', 'the', 'last', 'man', 'first', 'issue', 'part', 'chapter']
+
+PARSE_CACHE_SIZE = 131072
+
+# Padrões pré-compilados
+_BRACKETS_RE = re.compile(r'\(.*?\)|\[.*?\]')
+# Números estranhos como 28 29 (provavelmente artefatos de codificação)
+_STRAY_NUMBERS_RE = re.compile(r'\b\d{2}\s+\d{2}')
+# Todas as tags em uma única alternância (uma passada só)
+_SCAN_TAGS_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(tag) for tag in SCAN_TAGS) + r')\b',
+    re.IGNORECASE
+)
+_YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+
+# Padrões de edição em ordem de prioridade: 001, #01, v1, vol 1, 1-of-3, etc
+_ISSUE_PATTERNS = [
+    re.compile(r'\b(\d{1,4})\s*(?:of|de)\s*\d{1,4}\b', re.IGNORECASE),  # 1-of-3, 1 of 3
+    re.compile(r'#\s*(\d{1,4})', re.IGNORECASE),  # #1, #001
+    re.compile(r'\bv(?:ol)?\.?\s*(\d{1,4})\b', re.IGNORECASE),  # vol 1, v1
+    re.compile(r'\b(\d{3,4})\b', re.IGNORECASE),  # 001, 0001
+    re.compile(r'\b(\d{1,2})\b', re.IGNORECASE),  # 1, 01 (última tentativa)
+]
+
+# Aplicados em sequência (cada palavra pode remover um sufixo novo)
+_NOISE_PATTERNS = [
+    re.compile(rf'\s+{word}\s+\d+\s*$', re.IGNORECASE) for word in NOISE_WORDS
+]
+
+_SPACES_RE = re.compile(r'\s+')
+_TRAILING_DASH_RE = re.compile(r'\s*-\s*$')
+_LEADING_DASH_RE = re.compile(r'^\s*-\s*')
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def clean_filename(filename):
+    """
+    Limpa o nome do arquivo para extrair título, edição e ano
+
+    Retorna (título, edição, ano). O resultado é memorizado por nome de
+    arquivo, então nomes repetidos não são processados de novo.
+    """
+    # Remove extensão
+    name = os.path.splitext(filename)[0]
+
+    # Substitui pontos e underscores por espaços
+    name = name.replace(".", " ").replace("_", " ")
+
+    # Remove tags entre parênteses e colchetes
+    name = _BRACKETS_RE.sub('', name)
+
+    # Remove números estranhos como 28 29
+    name = _STRAY_NUMBERS_RE.sub('', name)
+
+    # Remove tags de scan groups e qualidade
+    name = _SCAN_TAGS_RE.sub('', name)
+
+    # Extrai o ano (formato 19xx ou 20xx)
+    year_match = _YEAR_RE.search(name)
+    year = year_match.group(0) if year_match else None
+    if year:
+        name = name.replace(year, "")
+
+    # Extrai número da edição ANTES de limpar mais
+    issue_num = ""
+    for pattern in _ISSUE_PATTERNS:
+        issue_match = pattern.search(name)
+        if issue_match:
+            issue_num = issue_match.group(1).lstrip('0') or '0'
+            name = name[:issue_match.start()] + name[issue_match.end():]
+            break
+
+    # Remove palavras comuns que não são título (APENAS no final)
+    for pattern in _NOISE_PATTERNS:
+        name = pattern.sub('', name)
+
+    # Limpa espaços extras e hífens soltos
+    title = _SPACES_RE.sub(' ', name).strip()
+    title = _TRAILING_DASH_RE.sub('', title).strip()
+    title = _LEADING_DASH_RE.sub('', title).strip()
+
+    # Se o título ficou muito longo (>50 chars), provavelmente tem lixo
+    # Tenta pegar só as primeiras palavras
+    if len(title) > 50:
+        words = title.split()
+        # Pega as primeiras 2-4 palavras capitalizadas
+        clean_words = []
+        for word in words[:6]:
+            if word and (word[0].isupper() or word.lower() in ['the', 'a', 'an', 'of']):
+                clean_words.append(word)
+            else:
+                break
+        if clean_words:
+            title = ' '.join(clean_words)
+
+    return title, issue_num, year
+
+def parse_many(filenames):
+    """Processa vários nomes de arquivo; retorna lista de (título, edição, ano)"""
+    return [clean_filename(filename) for filename in filenames]
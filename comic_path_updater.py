@@ -8,6 +8,8 @@ import os
 import sys
 from pathlib import Path
 
+from comic_fingerprint import compute_fingerprint
+
 COMIC_EXTENSIONS = {'.cbr', '.cbz', '.pdf', '.cbt', '.cb7'}
 
 def find_orphaned_records(db_path):
@@ -52,10 +54,70 @@ def find_files_by_size(root_dir, target_size, extension):
     
     return matches
 
+def has_fingerprints(cursor):
+    """Verifica se o banco já tem a coluna de impressão digital (scanner novo)"""
+    cursor.execute("PRAGMA table_info(comics)")
+    return 'fingerprint' in [row[1] for row in cursor.fetchall()]
+
+def index_files_by_size(root_dir):
+    """Percorre a pasta UMA vez e agrupa os comics por (extensão, tamanho)"""
+    
+    by_size = {}
+    
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        
+        for filename in files:
+            ext = os.path.splitext(filename)[1].lower()
+            
+            if ext in COMIC_EXTENSIONS:
+                filepath = os.path.join(root, filename)
+                try:
+                    size = os.path.getsize(filepath)
+                except OSError:
+                    continue
+                by_size.setdefault((ext, size), []).append(filepath)
+    
+    return by_size
+
+def move_record(cursor, record_id, new_path, scanner_columns=True):
+    """
+    Aponta o registro para o novo caminho (mantém os metadados)
+    
+    Tamanho e data passam a ser os do arquivo novo; em bancos do scanner novo
+    (scanner_columns) o registro também deixa de constar como ausente.
+    """
+    st = os.stat(new_path)
+    if scanner_columns:
+        cursor.execute('''
+            UPDATE comics 
+            SET file_path = ?,
+                file_name = ?,
+                file_size = ?,
+                file_mtime = ?,
+                missing_since = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (new_path, os.path.basename(new_path), st.st_size, st.st_mtime, record_id))
+    else:
+        cursor.execute('''
+            UPDATE comics 
+            SET file_path = ?,
+                file_name = ?,
+                file_size = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (new_path, os.path.basename(new_path), st.st_size, record_id))
+
 def auto_fix_paths(db_path, scan_dir):
     """
     Tenta corrigir automaticamente paths quebrados
-    Usa tamanho do arquivo como identificador único
+    
+    1. Impressão digital (índice): se o scanner já cadastrou o arquivo no
+       novo lugar como 'pending', o registro antigo herda o caminho e o
+       novo é descartado
+    2. Impressão digital dos arquivos em disco com o mesmo tamanho exato
+    3. Registros antigos sem impressão digital: tamanho (tolerância 1KB)
     """
     
     conn = sqlite3.connect(db_path)
@@ -72,44 +134,90 @@ def auto_fix_paths(db_path, scan_dir):
     
     print(f"\n⚠️  {len(orphaned)} registros órfãos encontrados\n")
     
+    use_fingerprints = has_fingerprints(cursor)
+    
     fixed = 0
     not_found = 0
+    remaining = []
     
     print("🔧 Tentando corrigir automaticamente...\n")
     
+    # Passo 1: movimentos já vistos pelo scanner (consulta pelo índice)
     for record_id, old_path, old_name in orphaned:
-        
-        # Busca tamanho antigo
-        cursor.execute('SELECT file_size, file_ext FROM comics WHERE id = ?', (record_id,))
+        fingerprint = None
+        if use_fingerprints:
+            cursor.execute('SELECT file_size, file_ext, fingerprint FROM comics WHERE id = ?', (record_id,))
+        else:
+            cursor.execute('SELECT file_size, file_ext, NULL FROM comics WHERE id = ?', (record_id,))
         result = cursor.fetchone()
         
         if not result:
             continue
         
-        old_size, old_ext = result
+        old_size, old_ext, fingerprint = result
+        
+        if fingerprint:
+            cursor.execute('''
+                SELECT id, file_path FROM comics 
+                WHERE fingerprint = ? AND id != ? AND status = 'pending'
+            ''', (fingerprint, record_id))
+            twins = [(twin_id, path) for twin_id, path in cursor.fetchall() if os.path.exists(path)]
+            
+            if len(twins) == 1:
+                twin_id, new_path = twins[0]
+                print(f"[{record_id}] {old_name}")
+                print(f"   ✓ Movido para: {new_path} (impressão digital)")
+                print()
+                cursor.execute('DELETE FROM comics WHERE id = ?', (twin_id,))
+                move_record(cursor, record_id, new_path, use_fingerprints)
+                fixed += 1
+                continue
+        
+        remaining.append((record_id, old_name, old_size, old_ext, fingerprint))
+    
+    if remaining:
+        print(f"🔍 Indexando arquivos em {scan_dir}...\n")
+        by_size = index_files_by_size(scan_dir)
+        
+        cursor.execute('SELECT file_path FROM comics')
+        known_paths = {row[0] for row in cursor.fetchall()}
+        fingerprint_cache = {}
+    
+    for record_id, old_name, old_size, old_ext, fingerprint in remaining:
         
         print(f"[{record_id}] {old_name}")
-        print(f"   Procurando arquivo com ~{old_size/(1024*1024):.1f}MB e extensão {old_ext}...")
         
-        # Busca arquivos com mesmo tamanho e extensão
-        candidates = find_files_by_size(scan_dir, old_size, old_ext)
+        if fingerprint:
+            # Passo 2: mesmo tamanho exato + mesma impressão digital
+            print(f"   Procurando impressão digital ({old_size/(1024*1024):.1f}MB, {old_ext})...")
+            candidates = []
+            for path in by_size.get((old_ext, old_size), []):
+                if path in known_paths:
+                    continue
+                if path not in fingerprint_cache:
+                    try:
+                        fingerprint_cache[path] = compute_fingerprint(path, old_size)
+                    except OSError:
+                        fingerprint_cache[path] = None
+                if fingerprint_cache[path] == fingerprint:
+                    candidates.append(path)
+        else:
+            # Passo 3: registros antigos - tamanho aproximado
+            print(f"   Procurando arquivo com ~{old_size/(1024*1024):.1f}MB e extensão {old_ext}...")
+            candidates = [
+                path
+                for (ext, size), paths in by_size.items()
+                if ext == old_ext and abs(size - old_size) < 1024  # Tolerância de 1KB
+                for path in paths
+                if path not in known_paths
+            ]
         
         if len(candidates) == 1:
             # Match único - muito provável que seja o mesmo arquivo!
             new_path = candidates[0]
-            new_name = os.path.basename(new_path)
-            
-            print(f"   ✓ Encontrado: {new_name}")
-            
-            # Atualiza banco
-            cursor.execute('''
-                UPDATE comics 
-                SET file_path = ?,
-                    file_name = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (new_path, new_name, record_id))
-            
+            print(f"   ✓ Encontrado: {os.path.basename(new_path)}")
+            move_record(cursor, record_id, new_path, use_fingerprints)
+            known_paths.add(new_path)
             fixed += 1
             
         elif len(candidates) > 1:
@@ -228,7 +336,7 @@ Exemplos de uso:
   # Listar arquivos órfãos
   %(prog)s --db comics.db --list
 
-  # Corrigir automaticamente (por tamanho de arquivo)
+  # Corrigir automaticamente (por impressão digital / tamanho de arquivo)
   %(prog)s --db comics.db --auto-fix /caminho/dos/comics
 
   # Remover órfãos do banco
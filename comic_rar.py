@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Comic RAR - Leitor de cabeçalhos RAR4/RAR5 em Python puro
+Lista as entradas de um .cbr pulando os dados (sem unrar, sem descompressão)
+"""
+
+import struct
+import zlib
+from collections import namedtuple
+
+RAR4_SIGNATURE = b'Rar!\x1a\x07\x00'
+RAR5_SIGNATURE = b'Rar!\x1a\x07\x01\x00'
+
+# RAR4: tipos de bloco e flags
+RAR4_MARK_HEAD = 0x72
+RAR4_MAIN_HEAD = 0x73
+RAR4_FILE_HEAD = 0x74
+RAR4_ENDARC_HEAD = 0x7B
+RAR4_LONG_BLOCK = 0x8000
+RAR4_MHD_SOLID = 0x0008
+RAR4_MHD_PASSWORD = 0x0080
+RAR4_LHD_SPLIT_BEFORE = 0x0001
+RAR4_LHD_SPLIT_AFTER = 0x0002
+RAR4_LHD_PASSWORD = 0x0004
+RAR4_LHD_SOLID = 0x0010
+RAR4_LHD_WINDOWMASK = 0x00E0
+RAR4_LHD_DIRECTORY = 0x00E0
+RAR4_LHD_LARGE = 0x0100
+RAR4_LHD_UNICODE = 0x0200
+RAR4_METHOD_STORE = 0x30
+
+# RAR5: tipos de cabeçalho e flags
+RAR5_MAIN_HEADER = 1
+RAR5_FILE_HEADER = 2
+RAR5_ENCRYPTION_HEADER = 4
+RAR5_END_HEADER = 5
+RAR5_HFL_EXTRA = 0x0001
+RAR5_HFL_DATA = 0x0002
+RAR5_HFL_SPLIT_BEFORE = 0x0008
+RAR5_HFL_SPLIT_AFTER = 0x0010
+RAR5_MHFL_SOLID = 0x0004
+RAR5_FHFL_DIRECTORY = 0x0001
+RAR5_FHFL_UTIME = 0x0002
+RAR5_FHFL_CRC32 = 0x0004
+RAR5_FHFL_UNPUNKNOWN = 0x0008
+RAR5_COMP_SOLID = 0x0040
+RAR5_COMP_METHOD_SHIFT = 7
+RAR5_COMP_METHOD_MASK = 0x7
+RAR5_EXTRA_CRYPT = 0x01
+
+# data_offset/is_stored permitem ler entradas sem compressão direto do disco
+RarEntry = namedtuple('RarEntry', 'name packed_size unpacked_size is_dir is_solid '
+                                  'is_encrypted is_split is_stored data_offset')
+RarListing = namedtuple('RarListing', 'version is_solid entries')
+
+class RarError(Exception):
+    """Arquivo RAR inválido, corrompido ou com cabeçalhos criptografados"""
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise RarError('Cabeçalho truncado')
+    return data
+
+def _decode_rar4_unicode(std_name, encoded):
+    """Decodifica o nome Unicode compactado do RAR 3.x (LHD_UNICODE)"""
+    out = []
+    pos = 0
+    high = encoded[pos]
+    pos += 1
+    flags = 0
+    flag_bits = 0
+
+    while pos < len(encoded):
+        if flag_bits == 0:
+            flags = encoded[pos]
+            pos += 1
+            flag_bits = 8
+        flag_bits -= 2
+        mode = (flags >> flag_bits) & 3
+
+        if mode == 0:
+            out.append(encoded[pos])
+            pos += 1
+        elif mode == 1:
+            out.append(encoded[pos] + (high << 8))
+            pos += 1
+        elif mode == 2:
+            out.append(encoded[pos] | (encoded[pos + 1] << 8))
+            pos += 2
+        else:
+            length = encoded[pos]
+            pos += 1
+            if length & 0x80:
+                correction = encoded[pos]
+                pos += 1
+                for _ in range((length & 0x7F) + 2):
+                    out.append(((std_name[len(out)] + correction) & 0xFF) + (high << 8))
+            else:
+                for _ in range(length + 2):
+                    out.append(std_name[len(out)])
+
+    # Os códigos são UTF-16: junta pares substitutos (ex.: 𝐀)
+    return ''.join(map(chr, out)).encode('utf-16-le', 'surrogatepass').decode('utf-16-le', 'replace')
+
+def _decode_rar4_name(raw, unicode_flag):
+    if unicode_flag and b'\x00' in raw:
+        std_name, encoded = raw.split(b'\x00', 1)
+        if encoded:
+            try:
+                return _decode_rar4_unicode(std_name, encoded)
+            except (IndexError, ValueError, UnicodeError):
+                pass
+        raw = std_name
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp437')
+
+def _list_rar4(f):
+    """Percorre os blocos RAR 1.5-4.x pulando os dados compactados"""
+    entries = []
+    archive_solid = False
+    offset = len(RAR4_SIGNATURE)
+
+    while True:
+        f.seek(offset)
+        base = f.read(7)
+        if len(base) < 7:
+            break  # Fim do arquivo sem ENDARC (permitido)
+
+        # O CRC não é conferido: nas versões 1.5/2.x ele cobre só parte
+        # do cabeçalho (comentários e campos estendidos ficam de fora)
+        _head_crc, head_type, head_flags, head_size = struct.unpack('<HBHH', base)
+        if head_size < 7:
+            raise RarError('Tamanho de bloco inválido')
+        header = base + _read_exact(f, head_size - 7)
+
+        add_size = 0
+        if head_flags & RAR4_LONG_BLOCK and head_size >= 11:
+            add_size = struct.unpack_from('<I', header, 7)[0]
+
+        if head_type == RAR4_MAIN_HEAD:
+            archive_solid = bool(head_flags & RAR4_MHD_SOLID)
+            if head_flags & RAR4_MHD_PASSWORD:
+                raise RarError('Cabeçalhos criptografados')
+
+        elif head_type == RAR4_FILE_HEAD:
+            (pack_size, unp_size, _host_os, _file_crc, _ftime, _unp_ver,
+             method, name_size, _attr) = struct.unpack_from('<IIBIIBBHI', header, 7)
+            pos = 32
+            if head_flags & RAR4_LHD_LARGE:
+                high_pack, high_unp = struct.unpack_from('<II', header, pos)
+                pack_size |= high_pack << 32
+                unp_size |= high_unp << 32
+                pos += 8
+            raw_name = header[pos:pos + name_size]
+            name = _decode_rar4_name(raw_name, head_flags & RAR4_LHD_UNICODE)
+
+            entries.append(RarEntry(
+                name=name.replace('\\', '/'),
+                packed_size=pack_size,
+                unpacked_size=unp_size,
+                is_dir=(head_flags & RAR4_LHD_WINDOWMASK) == RAR4_LHD_DIRECTORY,
+                is_solid=bool(head_flags & RAR4_LHD_SOLID),
+                is_encrypted=bool(head_flags & RAR4_LHD_PASSWORD),
+                is_split=bool(head_flags & (RAR4_LHD_SPLIT_BEFORE | RAR4_LHD_SPLIT_AFTER)),
+                is_stored=method == RAR4_METHOD_STORE,
+                data_offset=offset + head_size,
+            ))
+            add_size = pack_size
+
+        elif head_type == RAR4_ENDARC_HEAD:
+            break
+
+        offset += head_size + add_size
+
+    return RarListing(4, archive_solid, entries)
+
+def _read_vint(data, pos):
+    """Lê um inteiro de tamanho variável (7 bits por byte) do RAR5"""
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise RarError('vint truncado')
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise RarError('vint inválido')
+
+def _extra_is_encrypted(extra):
+    """Procura o registro de criptografia na área extra do arquivo"""
+    pos = 0
+    while pos < len(extra):
+        size, pos = _read_vint(extra, pos)
+        record_end = pos + size
+        record_type, _ = _read_vint(extra, pos)
+        if record_type == RAR5_EXTRA_CRYPT:
+            return True
+        pos = record_end
+    return False
+
+def _list_rar5(f):
+    """Percorre os cabeçalhos RAR5 pulando a área de dados de cada um"""
+    entries = []
+    archive_solid = False
+    offset = len(RAR5_SIGNATURE)
+
+    while True:
+        f.seek(offset)
+        prefix = f.read(7)  # CRC32 (4) + até 3 bytes do tamanho (vint)
+        if len(prefix) < 5:
+            break
+
+        head_crc = struct.unpack_from('<I', prefix)[0]
+        head_size, size_end = _read_vint(prefix, 4)
+        f.seek(offset + size_end)
+        header = _read_exact(f, head_size)
+
+        if zlib.crc32(prefix[4:size_end] + header) != head_crc:
+            raise RarError('CRC do cabeçalho não confere')
+
+        head_type, pos = _read_vint(header, 0)
+        head_flags, pos = _read_vint(header, pos)
+        extra_size = data_size = 0
+        if head_flags & RAR5_HFL_EXTRA:
+            extra_size, pos = _read_vint(header, pos)
+        if head_flags & RAR5_HFL_DATA:
+            data_size, pos = _read_vint(header, pos)
+
+        if head_type == RAR5_MAIN_HEADER:
+            archive_flags, pos = _read_vint(header, pos)
+            archive_solid = bool(archive_flags & RAR5_MHFL_SOLID)
+
+        elif head_type == RAR5_ENCRYPTION_HEADER:
+            raise RarError('Cabeçalhos criptografados')
+
+        elif head_type == RAR5_FILE_HEADER:
+            file_flags, pos = _read_vint(header, pos)
+            unpacked_size, pos = _read_vint(header, pos)
+            _attributes, pos = _read_vint(header, pos)
+            if file_flags & RAR5_FHFL_UTIME:
+                pos += 4
+            if file_flags & RAR5_FHFL_CRC32:
+                pos += 4
+            compression, pos = _read_vint(header, pos)
+            _host_os, pos = _read_vint(header, pos)
+            name_size, pos = _read_vint(header, pos)
+            name = header[pos:pos + name_size].decode('utf-8', errors='replace')
+
+            extra = header[len(header) - extra_size:] if extra_size else b''
+            entries.append(RarEntry(
+                name=name,
+                packed_size=data_size,
+                unpacked_size=None if file_flags & RAR5_FHFL_UNPUNKNOWN else unpacked_size,
+                is_dir=bool(file_flags & RAR5_FHFL_DIRECTORY),
+                is_solid=bool(compression & RAR5_COMP_SOLID),
+                is_encrypted=_extra_is_encrypted(extra) if extra else False,
+                is_split=bool(head_flags & (RAR5_HFL_SPLIT_BEFORE | RAR5_HFL_SPLIT_AFTER)),
+                is_stored=(compression >> RAR5_COMP_METHOD_SHIFT) & RAR5_COMP_METHOD_MASK == 0,
+                data_offset=offset + size_end + head_size,
+            ))
+
+        elif head_type == RAR5_END_HEADER:
+            break
+
+        offset += size_end + head_size + data_size
+
+    return RarListing(5, archive_solid, entries)
+
+def is_rar(header_bytes):
+    """Verifica a assinatura RAR (4 ou 5) no início do arquivo"""
+    return header_bytes.startswith(RAR4_SIGNATURE) or header_bytes.startswith(RAR5_SIGNATURE)
+
+def list_rar(file_path):
+    """
+    Lista as entradas de um arquivo RAR4/RAR5 lendo apenas os cabeçalhos
+
+    Retorna RarListing(version, is_solid, entries). Nada é descompactado:
+    entre um cabeçalho e outro o leitor apenas faz seek sobre os dados.
+    """
+    with open(file_path, 'rb') as f:
+        signature = f.read(len(RAR5_SIGNATURE))
+        if signature.startswith(RAR5_SIGNATURE):
+            return _list_rar5(f)
+        if signature.startswith(RAR4_SIGNATURE):
+            return _list_rar4(f)
+    raise RarError('Assinatura RAR não encontrada')
+
+def read_stored_entry(file_path, entry):
+    """
+    Lê uma entrada gravada sem compressão (método "store") direto do disco
+
+    Entradas comprimidas, criptografadas ou divididas em volumes não podem
+    ser lidas assim - levantam RarError.
+    """
+    if not entry.is_stored or entry.is_encrypted or entry.is_split:
+        raise RarError('Entrada comprimida/criptografada: requer descompressão')
+
+    with open(file_path, 'rb') as f:
+        f.seek(entry.data_offset)
+        data = f.read(entry.packed_size)
+    if len(data) != entry.packed_size:
+        raise RarError('Dados truncados')
+    return data
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Comic Rate Limit - Limite de requisições do Comic Vine compartilhado entre processos
+Identifier e enricher tiram fichas do mesmo arquivo SQLite, então podem rodar juntos
+"""
+
+import sqlite3
+import os
+import sys
+import threading
+import time
+
+from comic_http_cache import endpoint_family
+
+LIMITER_FILENAME = 'comicvine_ratelimit.db'
+
+# O Comic Vine permite 200 requisições por recurso por hora
+HOURLY_LIMIT = 200
+DEFAULT_MIN_INTERVAL = 2.0  # Espaço mínimo entre requisições de todos os processos
+PENALTY_SECONDS = 60.0      # Pausa do recurso após um 420, se o chamador não disser outra
+MAX_SLEEP = 5.0             # Dorme no máximo isso antes de olhar o balde de novo
+LONG_WAIT_NOTICE = 30.0     # Esperas maiores que isso são avisadas no console
+
+def default_limiter_path(db_path):
+    """Arquivo do limitador ao lado do banco de inventário"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), LIMITER_FILENAME)
+
+class RateLimiter:
+    """
+    Baldes de fichas por recurso em SQLite
+
+    Cada recurso (search, issues, issue, volume...) tem um balde com
+    HOURLY_LIMIT fichas que se repõe continuamente em uma hora. Além do
+    balde, todas as requisições respeitam min_interval entre si, seja de
+    qual processo for. A leitura e o consumo da ficha acontecem dentro de
+    BEGIN IMMEDIATE, então dois processos nunca gastam a mesma ficha.
+    Threads do mesmo processo podem dividir a instância.
+    """
+
+    def __init__(self, path, hourly_limit=None, min_interval=DEFAULT_MIN_INTERVAL):
+        if hourly_limit is None:
+            hourly_limit = HOURLY_LIMIT
+        self.path = path
+        self.capacity = float(hourly_limit)
+        self.refill_rate = hourly_limit / 3600.0  # Fichas por segundo
+        self.min_interval = min_interval
+        self.throttled = 0.0  # Segundos esperando balde vazio ou 420 (além do espaçamento normal)
+
+        # isolation_level=None: as transações são controladas manualmente
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS buckets (
+                resource TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL DEFAULT 0,
+                requests INTEGER DEFAULT 0
+            )
+        ''')
+        # Uma única linha com o horário da última requisição de qualquer recurso
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pacing (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_request REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('INSERT OR IGNORE INTO pacing (id, last_request) VALUES (1, 0)')
+
+    def _bucket(self, resource, now):
+        """Fichas atuais do recurso (já com a reposição desde a última leitura)"""
+        row = self.conn.execute('SELECT tokens, updated_at, blocked_until FROM buckets WHERE resource = ?',
+                                (resource,)).fetchone()
+        if row is None:
+            self.conn.execute('INSERT INTO buckets (resource, tokens, updated_at) VALUES (?, ?, ?)',
+                              (resource, self.capacity, now))
+            return self.capacity, 0.0
+        tokens, updated_at, blocked_until = row
+        tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.refill_rate)
+        return tokens, blocked_until or 0.0
+
+    def _try_acquire(self, resource):
+        """Consome uma ficha; retorna 0 se conseguiu ou os segundos até poder tentar"""
+        with self._lock:
+            return self._try_acquire_locked(resource)
+
+    def _try_acquire_locked(self, resource):
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            tokens, blocked_until = self._bucket(resource, now)
+            last_request = self.conn.execute('SELECT last_request FROM pacing WHERE id = 1').fetchone()[0]
+
+            wait = max(blocked_until - now,
+                       last_request + self.min_interval - now,
+                       (1.0 - tokens) / self.refill_rate)
+            if wait > 0:
+                self.conn.execute('ROLLBACK')
+                return wait
+
+            self.conn.execute('''
+                UPDATE buckets SET tokens = ?, updated_at = ?, requests = requests + 1
+                WHERE resource = ?
+            ''', (tokens - 1.0, now, resource))
+            self.conn.execute('UPDATE pacing SET last_request = ? WHERE id = 1', (now,))
+            self.conn.execute('COMMIT')
+            return 0
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def acquire(self, endpoint):
+        """Bloqueia até poder fazer uma requisição ao endpoint"""
+        resource = endpoint_family(endpoint)
+        noticed = False
+        while True:
+            wait = self._try_acquire(resource)
+            if wait <= 0:
+                return
+            if wait > LONG_WAIT_NOTICE and not noticed:
+                print(f"    ⏳ Limite de '{resource}' atingido. Aguardando ~{int(wait)}s...")
+                noticed = True
+            sleep_time = min(wait, MAX_SLEEP)
+            time.sleep(sleep_time)
+            if wait > self.min_interval:
+                self.throttled += sleep_time
+
+    def penalize(self, endpoint, seconds=PENALTY_SECONDS):
+        """Após um 420, pausa o recurso para todos os processos e zera o balde"""
+        resource = endpoint_family(endpoint)
+        with self._lock:
+            now = time.time()
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._bucket(resource, now)
+                self.conn.execute('''
+                    UPDATE buckets SET tokens = 0, updated_at = ?, blocked_until = MAX(blocked_until, ?)
+                    WHERE resource = ?
+                ''', (now, now + seconds, resource))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def status(self):
+        """Lista (recurso, fichas disponíveis, segundos bloqueado, requisições)"""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT resource, tokens, updated_at, blocked_until, requests FROM buckets ORDER BY resource
+            ''').fetchall()
+        result = []
+        for resource, tokens, updated_at, blocked_until, requests in rows:
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.refill_rate)
+            result.append((resource, tokens, max(0.0, (blocked_until or 0) - now), requests))
+        return result
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+def open_limiter(db_path, min_interval=DEFAULT_MIN_INTERVAL):
+    """Abre o limitador compartilhado do banco"""
+    return RateLimiter(default_limiter_path(db_path), min_interval=min_interval)
+
+def show_status(limiter):
+    """Mostra as fichas de cada recurso"""
+    print("\n📊 LIMITE DE REQUISIÇÕES DO COMIC VINE")
+    print("=" * 60)
+    print(f"   Arquivo: {limiter.path}")
+    print(f"   Limite: {int(limiter.capacity)} por recurso por hora, "
+          f"{limiter.min_interval:g}s entre requisições")
+
+    rows = limiter.status()
+    if not rows:
+        print("\n   Nenhuma requisição registrada ainda")
+    else:
+        print("\n   Por recurso:")
+    for resource, tokens, blocked, requests in rows:
+        line = f"      • {resource}: {int(tokens)}/{int(limiter.capacity)} disponíveis | {requests} requisições"
+        if blocked > 0:
+            line += f" | ⚠️  bloqueado por {int(blocked)}s (420)"
+        print(line)
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mostra o limite de requisições compartilhado do Comic Vine')
+    parser.add_argument('--db', default='comics_inventory.db',
+                       help='Banco de inventário (o limitador fica na mesma pasta)')
+    parser.add_argument('--reset', action='store_true', help='Enche todos os baldes de novo')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  ⏳ COMIC RATE LIMIT")
+    print("=" * 60)
+
+    path = default_limiter_path(args.db)
+    if not os.path.exists(path):
+        print(f"\n❌ Limitador não encontrado: {path}")
+        sys.exit(1)
+
+    limiter = RateLimiter(path)
+
+    if args.reset:
+        limiter.conn.execute('DELETE FROM buckets')
+        print("\n✅ Baldes reiniciados")
+    else:
+        show_status(limiter)
+
+    limiter.close()
+
+if __name__ == "__main__":
+    main()
@@ -5,91 +5,30 @@ Comic Re-cleaner - Re-processa nomes de arquivos no banco de dados
 """
 
 import sqlite3
-import re
 import os
 import sys
 
-def clean_filename(filename):
-    """
-    Limpa o nome do arquivo para extrair título, edição e ano
-    (Versão melhorada)
-    """
-    # Remove extensão
-    name = os.path.splitext(filename)[0]
-    
-    # Substitui pontos e underscores por espaços
-    name = name.replace(".", " ").replace("_", " ")
-    
-    # Remove tags entre parênteses e colchetes
-    name = re.sub(r'\(.*?\)|\[.*?\]', '', name)
-    
-    # Remove números estranhos como 28 29 que aparecem no exemplo
-    # (provavelmente artefatos de codificação)
-    name = re.sub(r'\b\d{2}\s+\d{2}', '', name)
-    
-    # Remove tags comuns de scan groups e qualidade
-    scan_tags = [
-        'Digital', 'Mephisto', 'Empire', 'DCP', 'EvilTrash', 'GreenGiant',
-        'Zone', 'bittertek', 'eclipse', 'c2c', 'Scan', 'HD', 'HQ',
-        'Minutemen', 'Glorith', 'AnHeroGold', 'ScannerDarkly', 'Nemesis43',
-        'CaptainMalcom', 'Archangel', 'BlackManta', 'Shadowcat', 'Oroboros',
-        'Son of Ultron', 'digital', 'scans', 'retail', 'web', 'cbr', 'cbz',
-        'complete', 'ongoing', 'fixed', 'proper', 'repost'
-    ]
-    
-    for tag in scan_tags:
-        name = re.sub(rf'\b{tag}\b', '', name, flags=re.IGNORECASE)
-    
-    # Extrai o ano (formato 19xx ou 20xx)
-    year_match = re.search(r'\b(19\d{2}|20\d{2})\b', name)
-    year = year_match.group(0) if year_match else None
-    if year:
-        name = name.replace(year, "")
-    
-    # Extrai número da edição ANTES de limpar mais
-    # Padrões: 001, #01, v1, vol 1, 1-of-3, etc
-    issue_patterns = [
-        r'\b(\d{1,4})\s*(?:of|de)\s*\d{1,4}\b',  # 1-of-3, 1 of 3
-        r'#\s*(\d{1,4})',  # #1, #001
-        r'\bv(?:ol)?\.?\s*(\d{1,4})\b',  # vol 1, v1
-        r'\b(\d{3,4})\b',  # 001, 0001
-        r'\b(\d{1,2})\b'   # 1, 01 (última tentativa)
-    ]
-    
-    issue_num = ""
-    for pattern in issue_patterns:
-        issue_match = re.search(pattern, name, re.IGNORECASE)
-        if issue_match:
-            issue_num = issue_match.group(1).lstrip('0') or '0'
-            name = re.sub(pattern, '', name, count=1, flags=re.IGNORECASE)
-            break
-    
-    # Remove palavras comuns que não são título
-    noise_words = ['to', 'the', 'last', 'man', 'first', 'issue', 'part', 'chapter']
-    # Mas APENAS se aparecerem no final ou sozinhas
-    for word in noise_words:
-        name = re.sub(rf'\s+{word}\s+\d+\s*$', '', name, flags=re.IGNORECASE)
-    
-    # Limpa espaços extras e hífens soltos
-    title = re.sub(r'\s+', ' ', name).strip()
-    title = re.sub(r'\s*-\s*$', '', title).strip()
-    title = re.sub(r'^\s*-\s*', '', title).strip()
-    
-    # Se o título ficou muito longo (>50 chars), provavelmente tem lixo
-    # Tenta pegar só as primeiras palavras
-    if len(title) > 50:
-        words = title.split()
-        # Pega as primeiras 2-4 palavras capitalizadas
-        clean_words = []
-        for word in words[:6]:
-            if word and (word[0].isupper() or word.lower() in ['the', 'a', 'an', 'of']):
-                clean_words.append(word)
-            else:
-                break
-        if clean_words:
-            title = ' '.join(clean_words)
-    
-    return title, issue_num, year
+from comic_parser import clean_filename, parse_many
+from comic_retry import classify_failed
+
+UPDATE_BATCH_SIZE = 5000
+
+def _apply_updates(cursor, updates):
+    """Grava um lote de (título, edição, ano, id) com executemany"""
+    if not updates:
+        return
+    cursor.executemany('''
+        UPDATE comics 
+        SET clean_title = ?,
+            issue_number = ?,
+            year = ?,
+            status = CASE 
+                WHEN status = 'identified' THEN 'identified'
+                ELSE 'pending' 
+            END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', updates)
 
 def reclean_database(db_path, status_filter=None, show_changes=False):
     """
@@ -111,10 +50,12 @@ def reclean_database(db_path, status_filter=None, show_changes=False):
     
     changed = 0
     unchanged = 0
+    updates = []
     
-    for record_id, filename, old_clean in records:
-        new_title, new_issue, new_year = clean_filename(filename)
-        
+    # Processa todos os nomes de uma vez (padrões pré-compilados + cache)
+    parsed = parse_many(filename for _, filename, _ in records)
+    
+    for (record_id, filename, old_clean), (new_title, new_issue, new_year) in zip(records, parsed):
         if new_title != old_clean:
             changed += 1
             
@@ -124,26 +65,18 @@ def reclean_database(db_path, status_filter=None, show_changes=False):
                 print(f"   Antes:   {old_clean}")
                 print(f"   Depois:  {new_title}")
             
-            # Atualiza banco
-            cursor.execute('''
-                UPDATE comics 
-                SET clean_title = ?,
-                    issue_number = ?,
-                    year = ?,
-                    status = CASE 
-                        WHEN status = 'identified' THEN 'identified'
-                        ELSE 'pending' 
-                    END,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (new_title, new_issue, new_year, record_id))
+            updates.append((new_title, new_issue, new_year, record_id))
         else:
             unchanged += 1
         
-        if (changed + unchanged) % 1000 == 0:
-            print(f"   Processados: {changed + unchanged}/{len(records)}", end='\r')
+        # Atualiza banco em lotes
+        if len(updates) >= UPDATE_BATCH_SIZE:
+            _apply_updates(cursor, updates)
             conn.commit()
+            updates = []
+            print(f"   Processados: {changed + unchanged}/{len(records)}", end='\r')
     
+    _apply_updates(cursor, updates)
     conn.commit()
     
     print("\n" + "=" * 70)
@@ -186,15 +119,19 @@ def show_problem_names(db_path, min_length=40):
     print("=" * 70)
     conn.close()
 
-def reset_failed_to_pending(db_path):
+def reset_failed_to_pending(db_path, force=False):
     """
     Reseta registros 'not_found' e 'error' para 'pending' para nova tentativa
+    
+    Só volta para a fila quem teve o título/ano alterado ou cujo backoff
+    já venceu (comic_retry); os demais repetiriam uma busca que acabou de
+    falhar. Com force, reseta todos e limpa a agenda de tentativas.
     """
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    cursor.execute("SELECT COUNT(*) FROM comics WHERE status IN ('not_found', 'error')")
-    count = cursor.fetchone()[0]
+    changed, due, waiting = classify_failed(conn)
+    count = len(changed) + len(due) + len(waiting)
     
     if count == 0:
         print("\n✅ Não há registros com erro para resetar!")
@@ -202,18 +139,38 @@ def reset_failed_to_pending(db_path):
         return
     
     print(f"\n⚠️  {count} registros com status 'not_found' ou 'error'")
-    response = input("Deseja resetá-los para 'pending' e tentar novamente? (s/n): ").strip().lower()
+    print(f"   • Título/ano mudou: {len(changed)}")
+    print(f"   • Backoff vencido: {len(due)}")
+    print(f"   • Aguardando backoff: {len(waiting)}")
+    
+    ids = changed + due + (waiting if force else [])
+    if not ids:
+        print("\n⏳ Nenhum registro pronto para nova tentativa (use --force para resetar mesmo assim)")
+        conn.close()
+        return
+    
+    response = input(f"Deseja resetar {len(ids)} registros para 'pending' e tentar novamente? (s/n): ").strip().lower()
     
     if response in ['s', 'sim', 'y', 'yes']:
-        cursor.execute('''
-            UPDATE comics 
-            SET status = 'pending',
-                error_message = NULL,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE status IN ('not_found', 'error')
-        ''')
+        for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+            chunk = ids[start:start + UPDATE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            if force:
+                # Esquece as falhas para o identifier não pular essas buscas
+                cursor.execute(f'''
+                    DELETE FROM identify_retries WHERE fingerprint IN (
+                        SELECT query_fingerprint FROM comics WHERE id IN ({placeholders})
+                    )
+                ''', chunk)
+            cursor.execute(f'''
+                UPDATE comics 
+                SET status = 'pending',
+                    error_message = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id IN ({placeholders})
+            ''', chunk)
         conn.commit()
-        print(f"✅ {count} registros resetados para 'pending'")
+        print(f"✅ {len(ids)} registros resetados para 'pending'")
     else:
         print("❌ Operação cancelada")
     
@@ -234,7 +191,10 @@ def main():
     parser.add_argument('--status', choices=['pending', 'not_found', 'error', 'identified'], 
                        help='Re-processa apenas registros com este status')
     parser.add_argument('--show-problems', action='store_true', help='Mostra títulos problemáticos')
-    parser.add_argument('--reset-failed', action='store_true', help='Reseta registros com erro para pending')
+    parser.add_argument('--reset-failed', action='store_true',
+                       help='Reseta para pending os erros com título alterado ou backoff vencido')
+    parser.add_argument('--force', action='store_true',
+                       help='Com --reset-failed, reseta todos os erros e limpa a agenda de tentativas')
     
     args = parser.parse_args()
     
@@ -250,7 +210,7 @@ def main():
         show_problem_names(args.db)
     
     elif args.reset_failed:
-        reset_failed_to_pending(args.db)
+        reset_failed_to_pending(args.db, force=args.force)
     
     elif args.reclean:
         reclean_database(args.db, status_filter=args.status, show_changes=args.show_changes)
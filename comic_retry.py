@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Comic Retry - Agenda de novas tentativas da identificação
+Guarda cada busca que falhou (título + ano) com backoff exponencial, para não
+gastar requisições repetindo buscas que já sabemos que não dão resultado
+"""
+
+import sqlite3
+import os
+import sys
+import threading
+import time
+
+# Espera antes da próxima tentativa: base * 2^(tentativas - 1), até RETRY_MAX_DELAY
+RETRY_BASE_DELAY = {
+    'not_found': 24 * 3600,  # Não encontrado: o Comic Vine raramente muda de um dia para o outro
+    'error': 15 * 60,        # Erro de rede/API: costuma ser passageiro
+}
+RETRY_MAX_DELAY = 30 * 24 * 3600
+FAILED_STATUSES = ('not_found', 'error')
+
+def query_fingerprint(title, year):
+    """Chave da busca feita para um arquivo: título normalizado + ano"""
+    return f"{' '.join((title or '').lower().split())}|{year or ''}"
+
+def backoff_delay(status, attempts):
+    """Segundos até a próxima tentativa depois de `attempts` falhas seguidas"""
+    base = RETRY_BASE_DELAY.get(status, RETRY_BASE_DELAY['error'])
+    return min(RETRY_MAX_DELAY, base * 2 ** min(max(attempts - 1, 0), 20))
+
+def create_retry_tables(conn):
+    """Cria a agenda de tentativas e a coluna que liga cada comic à sua busca"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS identify_retries (
+            fingerprint TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            updated_at REAL
+        )
+    ''')
+
+    # Busca que deixou o comic em not_found/error (NULL quando identificado)
+    cursor.execute("PRAGMA table_info(comics)")
+    if 'query_fingerprint' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE comics ADD COLUMN query_fingerprint TEXT')
+    conn.commit()
+
+def format_delay(seconds):
+    """3700 -> '1h', 90000 -> '1d'"""
+    seconds = max(0, int(seconds))
+    if seconds >= 86400:
+        return f"{seconds // 86400}d"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h"
+    return f"{max(1, seconds // 60)}min"
+
+class RetrySchedule:
+    """
+    Cache negativo das buscas da identificação
+
+    Cada busca que falhou fica em identify_retries com o número de
+    tentativas e o horário da próxima. Enquanto esse horário não chega,
+    blocked() devolve a falha e o identifier marca o grupo sem chamar a
+    API. Um título/ano diferente gera outra chave, então arquivos limpos
+    de novo (recleaner) são tentados na hora.
+
+    As gravações saem como comandos (sql, linhas) para o DatabaseWriter.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.skipped = 0
+        self._lock = threading.Lock()
+        create_retry_tables(conn)
+        self._entries = {
+            fingerprint: (status, attempts, next_attempt_at)
+            for fingerprint, status, attempts, next_attempt_at in conn.execute(
+                'SELECT fingerprint, status, attempts, next_attempt_at FROM identify_retries')
+        }
+
+    def blocked(self, fingerprint, now=None):
+        """(status, tentativas, próxima tentativa) se a busca ainda está em espera, senão None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry and entry[2] > now:
+                self.skipped += 1
+                return entry
+        return None
+
+    def record_failure(self, fingerprint, status, message):
+        """Conta mais uma falha da busca e agenda a próxima tentativa"""
+        now = time.time()
+        with self._lock:
+            attempts = self._entries.get(fingerprint, (None, 0, 0))[1] + 1
+            next_attempt_at = now + backoff_delay(status, attempts)
+            self._entries[fingerprint] = (status, attempts, next_attempt_at)
+        return [('''
+            INSERT INTO identify_retries (fingerprint, status, attempts, next_attempt_at, last_error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(fingerprint) DO UPDATE SET
+                status = excluded.status,
+                attempts = excluded.attempts,
+                next_attempt_at = excluded.next_attempt_at,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+        ''', [(fingerprint, status, attempts, next_attempt_at, message, now)])]
+
+    def record_success(self, fingerprint):
+        """A busca funcionou: sai da agenda"""
+        with self._lock:
+            if self._entries.pop(fingerprint, None) is None:
+                return []
+        return [('DELETE FROM identify_retries WHERE fingerprint = ?', [(fingerprint,)])]
+
+def classify_failed(conn, now=None):
+    """
+    Separa os comics not_found/error em três listas de ids:
+    (entrada mudou, espera vencida, ainda aguardando)
+
+    Falhas anteriores à agenda (sem query_fingerprint) contam como vencidas.
+    """
+    now = time.time() if now is None else now
+    create_retry_tables(conn)
+    cursor = conn.execute(f'''
+        SELECT c.id, c.clean_title, c.year, c.query_fingerprint, r.next_attempt_at
+        FROM comics c
+        LEFT JOIN identify_retries r ON r.fingerprint = c.query_fingerprint
+        WHERE c.status IN ({','.join('?' * len(FAILED_STATUSES))})
+    ''', FAILED_STATUSES)
+
+    changed, due, waiting = [], [], []
+    for comic_id, title, year, fingerprint, next_attempt_at in cursor:
+        if fingerprint is not None and fingerprint != query_fingerprint(title, year):
+            changed.append(comic_id)
+        elif next_attempt_at is None or next_attempt_at <= now:
+            due.append(comic_id)
+        else:
+            waiting.append(comic_id)
+    return changed, due, waiting
+
+def show_schedule(conn, limit=20):
+    """Mostra as buscas em espera e quando voltam a ser tentadas"""
+    create_retry_tables(conn)
+    changed, due, waiting = classify_failed(conn)
+    now = time.time()
+
+    print("\n📊 AGENDA DE NOVAS TENTATIVAS")
+    print("=" * 60)
+    print(f"   • Título/ano mudou (tentar de novo): {len(changed)}")
+    print(f"   • Espera vencida (tentar de novo): {len(due)}")
+    print(f"   • Aguardando backoff: {len(waiting)}")
+
+    cursor = conn.execute('''
+        SELECT r.fingerprint, r.status, r.attempts, r.next_attempt_at, COUNT(c.id)
+        FROM identify_retries r
+        JOIN comics c ON c.query_fingerprint = r.fingerprint AND c.status IN ('not_found', 'error')
+        WHERE r.next_attempt_at > ?
+        GROUP BY r.fingerprint
+        ORDER BY COUNT(c.id) DESC
+        LIMIT ?
+    ''', (now, limit))
+    rows = cursor.fetchall()
+    if rows:
+        print(f"\n   Buscas em espera (top {len(rows)} por arquivos):")
+    for fingerprint, status, attempts, next_attempt_at, files in rows:
+        title, _, year = fingerprint.rpartition('|')
+        label = f"{title} ({year})" if year else title
+        print(f"      • {label} - {status}, {attempts} tentativa(s), {files} arquivo(s), "
+              f"próxima em {format_delay(next_attempt_at - now)}")
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mostra a agenda de novas tentativas da identificação')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+    parser.add_argument('--limit', type=int, default=20, help='Buscas listadas (padrão: 20)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  🔁 COMIC RETRY")
+    print("=" * 60)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    show_schedule(conn, limit=args.limit)
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,24 @@ Escaneia todos os arquivos de comics e armazena em banco SQLite
 
 import sqlite3
 import os
-import re
+import time
 from pathlib import Path
 import sys
 
-# Extensões de arquivos de comics suportadas
-COMIC_EXTENSIONS = {'.cbr', '.cbz', '.pdf', '.cbt', '.cb7'}
+from comic_parser import clean_filename
+from comic_walker import walk_parallel, DEFAULT_WORKERS, COMIC_EXTENSIONS
+from comic_fingerprint import fingerprint_many
+from comic_archive import inspect_many, ARCHIVE_EXTENSIONS
+from comic_covers import extract_covers, default_cache_dir
+
+# Status do checkpoint que o --resume aceita continuar: 'running' sobra de
+# um processo morto sem aviso (kill -9, queda de energia)
+RESUMABLE_STATUSES = ('running', 'interrupted', 'incomplete')
+
+# Ingestão em lote
+INSERT_BATCH_SIZE = 5000   # Linhas por executemany/transação
+SCAN_CACHE_SIZE_KB = 65536  # cache_size do SQLite durante o scan (64 MB)
+CHECKPOINT_INTERVAL = 30    # Segundos máximos entre commits (scan completo)
 
 def create_database(db_path='comics_inventory.db'):
     """Cria o banco de dados SQLite com a estrutura necessária"""
@@ -43,149 +55,670 @@ def create_database(db_path='comics_inventory.db'):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON comics(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_clean_title ON comics(clean_title)')
     
+    # Colunas adicionadas depois da versão inicial (bancos antigos)
+    cursor.execute("PRAGMA table_info(comics)")
+    existing_columns = [row[1] for row in cursor.fetchall()]
+    for col_name, col_type in [('file_mtime', 'REAL'), ('fingerprint', 'TEXT'),
+                               ('missing_since', 'TIMESTAMP')]:
+        if col_name not in existing_columns:
+            cursor.execute(f'ALTER TABLE comics ADD COLUMN {col_name} {col_type}')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_fingerprint ON comics(fingerprint)')
+    
+    # Snapshot por diretório (usado pelo modo incremental)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dir_snapshots (
+            dir_path TEXT PRIMARY KEY,
+            parent_path TEXT,
+            mtime_ns INTEGER,
+            entry_count INTEGER,
+            scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dir_parent ON dir_snapshots(parent_path)')
+    
+    # Checkpoint do scan completo: fronteira (pastas descobertas e ainda não
+    # gravadas) + progresso, atualizados na mesma transação dos arquivos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_checkpoints (
+            root_path TEXT PRIMARY KEY,
+            status TEXT,
+            dirs_done INTEGER DEFAULT 0,
+            files_found INTEGER DEFAULT 0,
+            last_dir TEXT,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_frontier (
+            root_path TEXT NOT NULL,
+            dir_path TEXT NOT NULL,
+            PRIMARY KEY (root_path, dir_path)
+        )
+    ''')
+    
+    # Conteúdo dos arquivos (cache por caminho + tamanho + mtime)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_info (
+            file_path TEXT PRIMARY KEY,
+            file_size INTEGER,
+            file_mtime REAL,
+            archive_format TEXT,
+            entry_count INTEGER,
+            page_count INTEGER,
+            uncompressed_size INTEGER,
+            first_image TEXT,
+            has_comicinfo INTEGER,
+            is_solid INTEGER,
+            error_message TEXT,
+            inspected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("PRAGMA table_info(archive_info)")
+    if 'is_solid' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE archive_info ADD COLUMN is_solid INTEGER')
+    
     conn.commit()
     return conn
 
-def clean_filename(filename):
+class BulkInserter:
+    """
+    Acumula linhas de arquivos e grava com executemany, uma transação por lote
+    
+    Arquivo novo vira registro pendente. Arquivo já conhecido só é tocado se
+    tamanho ou mtime mudaram (reescrito no lugar): os valores são atualizados
+    e o fingerprint é apagado para ser recalculado. Registros antigos sem
+    mtime só ganham o mtime, como no scan incremental.
+    """
+    
+    INSERT_SQL = '''
+        INSERT INTO comics 
+        (file_path, file_name, file_size, file_mtime, file_ext, 
+         clean_title, issue_number, year, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+        ON CONFLICT(file_path) DO UPDATE SET
+            file_size = excluded.file_size,
+            file_mtime = excluded.file_mtime,
+            fingerprint = CASE
+                WHEN comics.file_size IS NOT excluded.file_size OR comics.file_mtime IS NOT NULL
+                THEN NULL ELSE comics.fingerprint END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE comics.file_size IS NOT excluded.file_size
+           OR comics.file_mtime IS NOT excluded.file_mtime
+    '''
+    
+    def __init__(self, conn, batch_size=INSERT_BATCH_SIZE):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.rows = []
+        self.total_added = 0
+        self.total_skipped = 0
+        self.total_updated = 0
+        self.total_errors = 0
+    
+    def add(self, file_path, filename, file_size, file_mtime):
+        """Processa o nome e enfileira a linha; grava quando o lote enche"""
+        ext = os.path.splitext(filename)[1].lower()
+        try:
+            clean_title, issue_num, year = clean_filename(filename)
+        except Exception as e:
+            self.total_errors += 1
+            print(f"\n  ⚠️  Erro ao processar {filename}: {e}")
+            return
+        self.rows.append((file_path, filename, file_size, file_mtime, ext,
+                          clean_title, issue_num, year))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """
+        Grava o lote pendente em uma única transação
+        
+        Se uma linha não puder ser gravada (ex.: nome que não é UTF-8 válido),
+        o lote é refeito linha a linha e só as linhas ruins ficam de fora,
+        contadas em total_errors. Qualquer outro erro do SQLite desfaz o lote,
+        que continua pendente, e é repassado a quem chamou.
+        """
+        rows = self.rows
+        if not rows:
+            self.conn.commit()
+            return
+        try:
+            # total_changes soma inseridas e atualizadas; as novas têm id acima do maior atual
+            last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM comics').fetchone()[0]
+            before = self.conn.total_changes
+            failed = 0
+            try:
+                self.conn.executemany(self.INSERT_SQL, rows)
+            except (ValueError, sqlite3.InterfaceError, sqlite3.ProgrammingError):
+                # As linhas anteriores à ruim já entraram; refeitas, não mudam nada
+                failed = self._insert_one_by_one(rows)
+            changed = self.conn.total_changes - before
+            added = self.conn.execute('SELECT COUNT(*) FROM comics WHERE id > ?',
+                                      (last_id,)).fetchone()[0]
+            self.conn.commit()
+        except sqlite3.Error:
+            # Banco travado, disco cheio...: o lote continua em self.rows e o erro sobe
+            self.conn.rollback()
+            raise
+        self.rows = []
+        self.total_added += added
+        self.total_updated += changed - added
+        self.total_skipped += len(rows) - changed - failed
+        self.total_errors += failed
+    
+    def _insert_one_by_one(self, rows):
+        """Grava as linhas uma a uma; retorna quantas falharam"""
+        failed = 0
+        for row in rows:
+            try:
+                self.conn.execute(self.INSERT_SQL, row)
+            except (ValueError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as e:
+                failed += 1
+                print(f"\n  ⚠️  Erro ao gravar {row[0]!r}: {e}")
+        return failed
+
+def begin_bulk_ingest(conn):
+    """
+    Ajusta o SQLite para escrita em massa (WAL, synchronous=NORMAL, cache maior)
+    
+    Retorna o journal_mode anterior para end_bulk_ingest().
+    """
+    previous_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA cache_size=-{SCAN_CACHE_SIZE_KB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return previous_mode
+
+def end_bulk_ingest(conn, previous_mode):
+    """Restaura o journal_mode original (faz checkpoint do WAL)"""
+    conn.commit()
+    conn.execute('PRAGMA synchronous=FULL')
+    if previous_mode and previous_mode.lower() != 'wal':
+        conn.execute(f'PRAGMA journal_mode={previous_mode}')
+
+def start_checkpoint(conn, root_path, resume=False):
+    """
+    Prepara o checkpoint de um scan completo
+    
+    Com resume=True e um scan interrompido para a mesma raiz, retorna as
+    pastas da fronteira salva (por onde continuar). Caso contrário zera o
+    checkpoint e retorna None (começa pela raiz).
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT status, dirs_done, files_found, last_dir, started_at
+        FROM scan_checkpoints WHERE root_path = ?
+    ''', (root_path,))
+    checkpoint = cursor.fetchone()
+    interrupted = checkpoint is not None and checkpoint[0] in RESUMABLE_STATUSES
+    
+    if resume and interrupted:
+        cursor.execute('SELECT dir_path FROM scan_frontier WHERE root_path = ?', (root_path,))
+        frontier = [row[0] for row in cursor.fetchall()]
+        _, dirs_done, files_found, last_dir, started_at = checkpoint
+        print(f"   ↪️  Retomando scan iniciado em {started_at}")
+        print(f"      • Já gravado: {dirs_done} pastas, {files_found} arquivos")
+        print(f"      • Última pasta gravada: {last_dir}")
+        print(f"      • Pastas pendentes na fronteira: {len(frontier)}")
+        return frontier
+    
+    if resume and checkpoint is not None and checkpoint[0] == 'failed':
+        print("   ℹ️  O último scan desta pasta falhou - começando do início")
+    elif resume:
+        print("   ℹ️  Nenhum scan interrompido para esta pasta - começando do início")
+    elif interrupted:
+        print("   ℹ️  Havia um scan interrompido - use --resume para continuar de onde parou")
+    
+    cursor.execute('DELETE FROM scan_frontier WHERE root_path = ?', (root_path,))
+    cursor.execute('INSERT INTO scan_frontier (root_path, dir_path) VALUES (?, ?)',
+                   (root_path, root_path))
+    cursor.execute('''
+        INSERT OR REPLACE INTO scan_checkpoints 
+        (root_path, status, dirs_done, files_found, last_dir, started_at, updated_at)
+        VALUES (?, 'running', 0, 0, NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    ''', (root_path,))
+    conn.commit()
+    return None
+
+def advance_checkpoint(cursor, root_path, listing):
     """
-    Limpa o nome do arquivo para extrair título, edição e ano
+    Tira a pasta da fronteira e coloca as subpastas
+    
+    Chamado depois que os arquivos da pasta entraram no BulkInserter: como
+    o lote só é confirmado no flush, pasta e arquivos são gravados juntos.
     """
-    # Remove extensão
-    name = os.path.splitext(filename)[0]
-    
-    # Substitui pontos e underscores por espaços
-    name = name.replace(".", " ").replace("_", " ")
-    
-    # Remove tags entre parênteses e colchetes
-    name = re.sub(r'\(.*?\)|\[.*?\]', '', name)
-    
-    # Remove números estranhos como 28 29 que aparecem no exemplo
-    # (provavelmente artefatos de codificação)
-    name = re.sub(r'\b\d{2}\s+\d{2}', '', name)
-    
-    # Remove tags comuns de scan groups e qualidade
-    scan_tags = [
-        'Digital', 'Mephisto', 'Empire', 'DCP', 'EvilTrash', 'GreenGiant',
-        'Zone', 'bittertek', 'eclipse', 'c2c', 'Scan', 'HD', 'HQ',
-        'Minutemen', 'Glorith', 'AnHeroGold', 'ScannerDarkly', 'Nemesis43',
-        'CaptainMalcom', 'Archangel', 'BlackManta', 'Shadowcat', 'Oroboros',
-        'Son of Ultron', 'digital', 'scans', 'retail', 'web', 'cbr', 'cbz',
-        'complete', 'ongoing', 'fixed', 'proper', 'repost'
-    ]
-    
-    for tag in scan_tags:
-        name = re.sub(rf'\b{tag}\b', '', name, flags=re.IGNORECASE)
-    
-    # Extrai o ano (formato 19xx ou 20xx)
-    year_match = re.search(r'\b(19\d{2}|20\d{2})\b', name)
-    year = year_match.group(0) if year_match else None
-    if year:
-        name = name.replace(year, "")
-    
-    # Extrai número da edição ANTES de limpar mais
-    # Padrões: 001, #01, v1, vol 1, 1-of-3, etc
-    issue_patterns = [
-        r'\b(\d{1,4})\s*(?:of|de)\s*\d{1,4}\b',  # 1-of-3, 1 of 3
-        r'#\s*(\d{1,4})',  # #1, #001
-        r'\bv(?:ol)?\.?\s*(\d{1,4})\b',  # vol 1, v1
-        r'\b(\d{3,4})\b',  # 001, 0001
-        r'\b(\d{1,2})\b'   # 1, 01 (última tentativa)
-    ]
-    
-    issue_num = ""
-    for pattern in issue_patterns:
-        issue_match = re.search(pattern, name, re.IGNORECASE)
-        if issue_match:
-            issue_num = issue_match.group(1).lstrip('0') or '0'
-            name = re.sub(pattern, '', name, count=1, flags=re.IGNORECASE)
-            break
-    
-    # Remove palavras comuns que não são título
-    noise_words = ['to', 'the', 'last', 'man', 'first', 'issue', 'part', 'chapter']
-    # Mas APENAS se aparecerem no final ou sozinhas
-    for word in noise_words:
-        name = re.sub(rf'\s+{word}\s+\d+\s*$', '', name, flags=re.IGNORECASE)
-    
-    # Limpa espaços extras e hífens soltos
-    title = re.sub(r'\s+', ' ', name).strip()
-    title = re.sub(r'\s*-\s*$', '', title).strip()
-    title = re.sub(r'^\s*-\s*', '', title).strip()
-    
-    # Se o título ficou muito longo (>50 chars), provavelmente tem lixo
-    # Tenta pegar só as primeiras palavras
-    if len(title) > 50:
-        words = title.split()
-        # Pega as primeiras 2-4 palavras capitalizadas
-        clean_words = []
-        for word in words[:6]:
-            if word and (word[0].isupper() or word.lower() in ['the', 'a', 'an', 'of']):
-                clean_words.append(word)
-            else:
-                break
-        if clean_words:
-            title = ' '.join(clean_words)
-    
-    return title, issue_num, year
+    cursor.execute('DELETE FROM scan_frontier WHERE root_path = ? AND dir_path = ?',
+                   (root_path, listing.dir_path))
+    cursor.executemany('INSERT OR IGNORE INTO scan_frontier (root_path, dir_path) VALUES (?, ?)',
+                       [(root_path, subdir) for subdir in listing.subdirs])
+    cursor.execute('''
+        UPDATE scan_checkpoints 
+        SET dirs_done = dirs_done + 1,
+            files_found = files_found + ?,
+            last_dir = ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE root_path = ?
+    ''', (len(listing.files), listing.dir_path, root_path))
 
-def scan_directory(root_path, conn, progress_callback=None):
+def finish_checkpoint(conn, root_path, status=None):
+    """
+    Encerra o checkpoint; nunca deixa 'running' para trás
+    
+    Sem status (scan chegou ao fim): 'done' com a fronteira vazia,
+    'incomplete' se sobraram pastas com erro (--resume tenta de novo) e
+    'failed' se nem a raiz pôde ser listada. Retorna (pastas que sobraram, status).
+    """
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM scan_frontier WHERE root_path = ?', (root_path,))
+    remaining = cursor.fetchone()[0]
+    if status is None:
+        cursor.execute('SELECT 1 FROM scan_frontier WHERE root_path = ? AND dir_path = ?',
+                       (root_path, root_path))
+        if not remaining:
+            status = 'done'
+        elif cursor.fetchone():
+            status = 'failed'
+        else:
+            status = 'incomplete'
+    cursor.execute('UPDATE scan_checkpoints SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE root_path = ?',
+                   (status, root_path))
+    conn.commit()
+    return remaining, status
+
+def scan_directory(root_path, conn, progress_callback=None, workers=DEFAULT_WORKERS, resume=False):
     """
     Escaneia recursivamente o diretório e adiciona arquivos ao banco
+    
+    A listagem roda em paralelo (comic_walker); esta função é o único
+    escritor do banco e grava os arquivos em lotes (BulkInserter).
+    
+    O progresso fica salvo em scan_checkpoints/scan_frontier: com
+    resume=True um scan interrompido continua pelas pastas pendentes,
+    sem listar de novo as subárvores já gravadas.
     """
     cursor = conn.cursor()
+    inserter = BulkInserter(conn)
     
     total_found = 0
-    total_added = 0
-    total_skipped = 0
     
-    print(f"\n🔍 Escaneando diretório: {root_path}")
+    print(f"\n🔍 Escaneando diretório: {root_path} ({workers} threads)")
     print("=" * 60)
     
-    for root, dirs, files in os.walk(root_path):
-        # Ignora diretórios ocultos
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        
-        for filename in files:
-            ext = os.path.splitext(filename)[1].lower()
+    start_dirs = start_checkpoint(conn, root_path, resume)
+    start_time = time.time()
+    last_commit = start_time
+    previous_mode = begin_bulk_ingest(conn)
+    final_status = None
+    
+    try:
+        for listing in walk_parallel(root_path, workers=workers, extensions=COMIC_EXTENSIONS,
+                                     start_dirs=start_dirs):
+            if listing.error:
+                # Listagem incompleta: sem snapshot, a pasta continua na fronteira
+                # e --resume (ou o próximo scan) a lista de novo por inteiro
+                print(f"\n  ⚠️  Erro ao listar {listing.dir_path}: {listing.error}")
+                continue
+            
+            # Registra o snapshot do diretório para futuros scans incrementais
+            save_dir_snapshot(cursor, listing.dir_path, root_path, listing.mtime_ns,
+                              listing.entry_count)
             
-            if ext in COMIC_EXTENSIONS:
+            for filename, file_path, file_size, file_mtime in listing.files:
                 total_found += 1
-                file_path = os.path.join(root, filename)
+                inserter.add(file_path, filename, file_size, file_mtime)
                 
-                try:
-                    file_size = os.path.getsize(file_path)
-                    clean_title, issue_num, year = clean_filename(filename)
-                    
-                    # Tenta inserir no banco
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO comics 
-                        (file_path, file_name, file_size, file_ext, 
-                         clean_title, issue_number, year, status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
-                    ''', (file_path, filename, file_size, ext, 
-                          clean_title, issue_num, year))
-                    
-                    if cursor.rowcount > 0:
-                        total_added += 1
-                        if total_added % 100 == 0:
-                            print(f"  ✓ {total_added} arquivos adicionados...", end='\r')
-                            conn.commit()
-                    else:
-                        total_skipped += 1
-                        
-                except Exception as e:
-                    print(f"\n  ⚠️  Erro ao processar {filename}: {e}")
+                if total_found % 1000 == 0:
+                    elapsed = time.time() - start_time
+                    print(f"  ✓ {total_found} arquivos lidos ({total_found / elapsed:.0f}/s)...", end='\r')
+            
+            advance_checkpoint(cursor, root_path, listing)
+            
+            # Em shares lentos um lote pode demorar: confirma pelo menos a cada 30s
+            if time.time() - last_commit >= CHECKPOINT_INTERVAL:
+                inserter.flush()
+                last_commit = time.time()
+            
+            if progress_callback:
+                progress_callback(total_found, inserter.total_added, inserter.total_skipped)
+        
+        inserter.flush()
+    except BaseException as error:
+        # Interrompido (Ctrl+C, erro): grava o lote pendente antes de sair
+        final_status = 'interrupted'
+        try:
+            inserter.flush()
+        except Exception as flush_error:
+            # Pastas e arquivos do lote saem juntos: a fronteira volta ao último commit
+            conn.rollback()
+            print(f"\n  ⚠️  Lote pendente não gravado: {flush_error}")
+        if isinstance(error, KeyboardInterrupt):
+            print("\n\n⚠️  Scan interrompido - use --resume para continuar de onde parou")
+        else:
+            final_status = 'failed'
+            print(f"\n\n❌ Scan falhou: {error}")
+        raise
+    finally:
+        try:
+            end_bulk_ingest(conn, previous_mode)
+            if final_status:
+                finish_checkpoint(conn, root_path, final_status)
+        except Exception as e:
+            if final_status is None:
+                raise
+            print(f"  ⚠️  Checkpoint não atualizado: {e}")
     
-    conn.commit()
+    remaining, status = finish_checkpoint(conn, root_path)
+    
+    elapsed = time.time() - start_time
+    total_added = inserter.total_added
+    total_skipped = inserter.total_skipped
+    rate = total_found / elapsed if elapsed > 0 else 0
     
     print("\n" + "=" * 60)
     print(f"📊 Resultado do escaneamento:")
     print(f"   • Arquivos encontrados: {total_found}")
     print(f"   • Novos registros: {total_added}")
     print(f"   • Já existentes: {total_skipped}")
+    if inserter.total_updated:
+        print(f"   • Alterados (tamanho/data): {inserter.total_updated}")
+    if inserter.total_errors:
+        print(f"   • Não gravados (erro): {inserter.total_errors}")
+    print(f"   • Tempo: {elapsed:.1f}s ({rate:.0f} linhas/s)")
+    if status == 'failed':
+        print("   • Pasta raiz ilegível: nada foi escaneado")
+    elif remaining:
+        print(f"   • Pastas com erro (pendentes para --resume): {remaining}")
     print("=" * 60)
     
     return total_found, total_added, total_skipped
 
+def save_dir_snapshot(cursor, dir_path, root_path, mtime_ns, entry_count):
+    """Grava (ou atualiza) o snapshot de um diretório"""
+    parent_path = os.path.dirname(dir_path) if dir_path != root_path else None
+    cursor.execute('''
+        INSERT OR REPLACE INTO dir_snapshots 
+        (dir_path, parent_path, mtime_ns, entry_count, scanned_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (dir_path, parent_path, mtime_ns, entry_count))
+
+def scan_incremental(root_path, conn, show_details=20, workers=DEFAULT_WORKERS):
+    """
+    Re-escaneia apenas os diretórios cujo mtime mudou desde o último scan
+    
+    Diretórios inalterados não são listados: seus subdiretórios vêm do
+    snapshot e apenas recebem um stat. Arquivos reescritos no lugar (sem
+    criar/remover entradas) não alteram o mtime da pasta - para esses
+    casos rode o scan completo.
+    
+    Retorna (novos, alterados, removidos) como listas de caminhos.
+    """
+    cursor = conn.cursor()
+    
+    print(f"\n⚡ Escaneamento incremental: {root_path} ({workers} threads)")
+    print("=" * 60)
+    
+    # Carrega snapshots e filhos conhecidos
+    cursor.execute('SELECT dir_path, parent_path, mtime_ns FROM dir_snapshots')
+    snapshots = {}
+    children = {}
+    for dir_path, parent_path, mtime_ns in cursor.fetchall():
+        snapshots[dir_path] = mtime_ns
+        children.setdefault(parent_path, []).append(dir_path)
+    
+    if root_path not in snapshots:
+        print("   ℹ️  Nenhum snapshot encontrado - todas as pastas serão listadas")
+    
+    def known_children(dir_path, mtime_ns):
+        # Chamado pelas threads do walker: só leitura dos dicionários
+        if snapshots.get(dir_path) == mtime_ns:
+            return children.get(dir_path, [])
+        return None
+    
+    # Arquivos conhecidos agrupados por diretório
+    cursor.execute('SELECT file_path, file_size, file_mtime, missing_since FROM comics')
+    known_files = {}
+    missing = set()
+    for file_path, file_size, file_mtime, missing_since in cursor.fetchall():
+        known_files.setdefault(os.path.dirname(file_path), {})[file_path] = (file_size, file_mtime)
+        if missing_since:
+            missing.add(file_path)
+    
+    new_files = []
+    changed_files = []
+    gone_files = []
+    visited = set()
+    dirs_listed = 0
+    dirs_skipped = 0
+    
+    inserter = BulkInserter(conn)
+    start_time = time.time()
+    previous_mode = begin_bulk_ingest(conn)
+    
+    try:
+        for listing in walk_parallel(root_path, workers=workers, extensions=COMIC_EXTENSIONS,
+                                     known_children=known_children):
+            dir_path = listing.dir_path
+            visited.add(dir_path)
+            
+            if listing.files is None:
+                dirs_skipped += 1
+                continue
+            
+            if listing.error:
+                print(f"\n  ⚠️  Erro ao listar {dir_path}: {listing.error}")
+                continue
+            
+            dirs_listed += 1
+            previous = known_files.get(dir_path, {})
+            
+            for name, file_path, file_size, file_mtime in listing.files:
+                known = previous.pop(file_path, None)
+                
+                # Arquivo marcado como ausente que voltou ao mesmo caminho
+                if file_path in missing:
+                    cursor.execute('UPDATE comics SET missing_since = NULL WHERE file_path = ?',
+                                   (file_path,))
+                
+                if known is None:
+                    inserter.add(file_path, name, file_size, file_mtime)
+                    new_files.append(file_path)
+                elif known != (file_size, file_mtime):
+                    cursor.execute('''
+                        UPDATE comics 
+                        SET file_size = ?,
+                            file_mtime = ?,
+                            fingerprint = NULL,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE file_path = ?
+                    ''', (file_size, file_mtime, file_path))
+                    # Registros antigos (sem mtime) só são atualizados em silêncio
+                    if known[1] is not None:
+                        changed_files.append(file_path)
+            
+            # O que sobrou no diretório não existe mais
+            gone_files.extend(previous)
+            previous.clear()
+            
+            save_dir_snapshot(cursor, dir_path, root_path, listing.mtime_ns, listing.entry_count)
+            
+            if dirs_listed % 100 == 0:
+                print(f"  ✓ {dirs_listed} pastas alteradas listadas...", end='\r')
+                inserter.flush()
+        
+        # Pastas do snapshot que não foram alcançadas (removidas) dentro da raiz
+        # - inclui subpastas apagadas de diretórios que foram listados
+        prefix = os.path.join(root_path, '')
+        for dir_path in snapshots:
+            if dir_path not in visited and dir_path.startswith(prefix):
+                gone_files.extend(known_files.get(dir_path, {}))
+                cursor.execute('DELETE FROM dir_snapshots WHERE dir_path = ?', (dir_path,))
+        
+        mark_missing(cursor, gone_files)
+        inserter.flush()
+    finally:
+        end_bulk_ingest(conn, previous_mode)
+    
+    elapsed = time.time() - start_time
+    
+    print("\n" + "=" * 60)
+    print(f"📊 Resultado do escaneamento incremental:")
+    print(f"   • Pastas listadas (alteradas): {dirs_listed}")
+    print(f"   • Pastas puladas (inalteradas): {dirs_skipped}")
+    print(f"   • Arquivos novos: {len(new_files)}")
+    print(f"   • Arquivos alterados: {len(changed_files)}")
+    print(f"   • Arquivos removidos: {len(gone_files)}")
+    print(f"   • Tempo: {elapsed:.1f}s")
+    
+    for label, paths in [('➕ Novos', new_files), ('✏️  Alterados', changed_files),
+                         ('➖ Removidos', gone_files)]:
+        if paths and show_details:
+            print(f"\n   {label}:")
+            for path in paths[:show_details]:
+                print(f"      • {path}")
+            if len(paths) > show_details:
+                print(f"      ... e mais {len(paths) - show_details}")
+    
+    if gone_files:
+        print("\n   💡 Use 'comic_path_updater.py --list' para tratar os removidos")
+    print("=" * 60)
+    
+    return new_files, changed_files, gone_files
+
+def mark_missing(cursor, file_paths):
+    """Marca registros cujo arquivo sumiu (mantém a data da primeira ausência)"""
+    cursor.executemany('''
+        UPDATE comics
+        SET missing_since = COALESCE(missing_since, CURRENT_TIMESTAMP)
+        WHERE file_path = ?
+    ''', [(path,) for path in file_paths])
+
+def update_fingerprints(root_path, conn, workers=DEFAULT_WORKERS):
+    """
+    Calcula a impressão digital dos arquivos que ainda não têm uma
+    
+    Arquivos novos entram sem fingerprint e o scan incremental a apaga
+    quando tamanho ou mtime mudam - os demais não são relidos. Arquivos
+    marcados como ausentes ficam de fora: não há o que ler.
+    """
+    cursor = conn.cursor()
+    
+    prefix = os.path.join(root_path, '')
+    cursor.execute('''
+        SELECT id, file_path, file_size FROM comics
+        WHERE fingerprint IS NULL AND missing_since IS NULL
+    ''')
+    pending = [row for row in cursor.fetchall() if row[1].startswith(prefix)]
+    
+    if not pending:
+        return 0, 0
+    
+    print(f"\n🔑 Calculando impressões digitais: {len(pending)} arquivos ({workers} threads)")
+    
+    start_time = time.time()
+    done = 0
+    errors = 0
+    updates = []
+    
+    for comic_id, fingerprint, error in fingerprint_many(pending, workers=workers):
+        if error:
+            errors += 1
+            continue
+        
+        updates.append((fingerprint, comic_id))
+        done += 1
+        
+        if len(updates) >= INSERT_BATCH_SIZE:
+            cursor.executemany('UPDATE comics SET fingerprint = ? WHERE id = ?', updates)
+            conn.commit()
+            updates = []
+            elapsed = time.time() - start_time
+            print(f"  ✓ {done} calculadas ({done / elapsed:.0f}/s)...", end='\r')
+    
+    cursor.executemany('UPDATE comics SET fingerprint = ? WHERE id = ?', updates)
+    conn.commit()
+    
+    elapsed = time.time() - start_time
+    print(f"\n   • Calculadas: {done} em {elapsed:.1f}s")
+    if errors:
+        print(f"   • Erros de leitura: {errors}")
+    
+    return done, errors
+
+def inspect_archives(root_path, conn, workers=None):
+    """
+    Lê o índice interno dos arquivos (páginas, capa, ComicInfo.xml)
+    
+    Roda em um pool de processos e só inspeciona arquivos cujo
+    (caminho, tamanho, mtime) ainda não está em archive_info.
+    """
+    cursor = conn.cursor()
+    
+    extensions = sorted(ARCHIVE_EXTENSIONS)
+    placeholders = ','.join('?' * len(extensions))
+    cursor.execute(f'''
+        SELECT c.file_path, c.file_size, c.file_mtime
+        FROM comics c
+        LEFT JOIN archive_info a ON a.file_path = c.file_path
+        WHERE c.file_ext IN ({placeholders})
+          AND (a.file_path IS NULL 
+               OR a.file_size IS NOT c.file_size 
+               OR a.file_mtime IS NOT c.file_mtime)
+    ''', extensions)
+    prefix = os.path.join(root_path, '')
+    pending = [row for row in cursor.fetchall() if row[0].startswith(prefix)]
+    
+    if not pending:
+        return 0, 0
+    
+    print(f"\n📦 Inspecionando conteúdo: {len(pending)} arquivos ({', '.join(extensions)})")
+    
+    start_time = time.time()
+    done = 0
+    errors = 0
+    rows = []
+    
+    for file_path, file_size, file_mtime, info, error in inspect_many(pending, workers=workers):
+        if error:
+            errors += 1
+        rows.append(archive_info_row(file_path, file_size, file_mtime, info, error))
+        done += 1
+        
+        if len(rows) >= INSERT_BATCH_SIZE:
+            save_archive_info(conn, rows)
+            rows = []
+            elapsed = time.time() - start_time
+            print(f"  ✓ {done} inspecionados ({done / elapsed:.0f}/s)...", end='\r')
+    
+    save_archive_info(conn, rows)
+    
+    elapsed = time.time() - start_time
+    print(f"\n   • Inspecionados: {done} em {elapsed:.1f}s")
+    if errors:
+        print(f"   • Arquivos ilegíveis/corrompidos: {errors}")
+    
+    return done, errors
+
+def archive_info_row(file_path, file_size, file_mtime, info, error):
+    """Monta a linha de archive_info a partir do resultado de inspect_archive"""
+    info = info or {}
+    return (file_path, file_size, file_mtime, info.get('archive_format'),
+            info.get('entry_count'), info.get('page_count'),
+            info.get('uncompressed_size'), info.get('first_image'),
+            int(info['has_comicinfo']) if 'has_comicinfo' in info else None,
+            int(info['is_solid']) if 'is_solid' in info else None, error)
+
+def save_archive_info(conn, rows):
+    """Grava um lote em archive_info"""
+    conn.executemany('''
+        INSERT OR REPLACE INTO archive_info 
+        (file_path, file_size, file_mtime, archive_format, entry_count, page_count,
+         uncompressed_size, first_image, has_comicinfo, is_solid, error_message, inspected_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', rows)
+    conn.commit()
+
 def show_statistics(conn):
     """Mostra estatísticas do banco de dados"""
     cursor = conn.cursor()
@@ -205,6 +738,12 @@ def show_statistics(conn):
         percentage = (count / total * 100) if total > 0 else 0
         print(f"      • {status}: {count} ({percentage:.1f}%)")
     
+    # Arquivos que sumiram do disco (modo incremental / --watch)
+    cursor.execute('SELECT COUNT(*) FROM comics WHERE missing_since IS NOT NULL')
+    missing = cursor.fetchone()[0]
+    if missing:
+        print(f"\n   Ausentes no disco: {missing}")
+
     # Por extensão
     cursor.execute('SELECT file_ext, COUNT(*) FROM comics GROUP BY file_ext ORDER BY COUNT(*) DESC')
     print("\n   Por formato:")
@@ -270,6 +809,10 @@ Exemplos de uso:
   %(prog)s /path/comics                       # Varre /path/comics, saída em ~/Downloads
   %(prog)s /path/comics /path/output          # Especifica ambos os caminhos
   %(prog)s . ~/Documentos/Comics              # Varre pasta atual, saída customizada
+  %(prog)s /path/comics /path/output --incremental  # Só pastas alteradas
+  %(prog)s /path/comics /path/output --resume       # Continua scan interrompido
+  %(prog)s /path/comics /path/output --extract-covers  # Também extrai as capas
+  %(prog)s /path/comics /path/output --incremental --watch  # Mantém o banco atualizado
         """
     )
     
@@ -287,8 +830,65 @@ Exemplos de uso:
         help='Diretório de saída para o banco de dados (padrão: ~/Downloads)'
     )
     
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Re-escaneia apenas pastas alteradas desde o último scan'
+    )
+    
+    parser.add_argument(
+        '--no-fingerprint',
+        action='store_true',
+        help='Não calcula a impressão digital (tamanho + 64 KB iniciais/finais)'
+    )
+    
+    parser.add_argument(
+        '--no-inspect',
+        action='store_true',
+        help='Não lê o índice interno dos arquivos (páginas, capa, ComicInfo.xml)'
+    )
+    
+    parser.add_argument(
+        '--extract-covers',
+        action='store_true',
+        help='Extrai a capa de cada arquivo para o cache local (covers/archive)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continua um scan completo interrompido a partir do último checkpoint'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Depois do scan, fica monitorando a pasta (inotify, Linux) e atualiza o banco'
+    )
+
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=2.0,
+        metavar='SEG',
+        help='Segundos sem eventos antes de processar um arquivo no --watch (padrão: 2)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        metavar='N',
+        help=f'Threads para listar diretórios em paralelo (padrão: {DEFAULT_WORKERS})'
+    )
+    
     args = parser.parse_args()
     
+    if args.workers < 1:
+        parser.error('--workers deve ser >= 1')
+    if args.resume and args.incremental:
+        parser.error('--resume vale apenas para o scan completo')
+    
     print("=" * 60)
     print("  🎨 COMIC SCANNER - Fase 1: Inventário")
     print("=" * 60)
@@ -334,7 +934,23 @@ Exemplos de uso:
     print(f"   ✓ Banco de dados: {db_path}")
     
     # Escaneia diretório
-    scan_directory(scan_path, conn)
+    if args.incremental:
+        scan_incremental(scan_path, conn, workers=args.workers)
+    else:
+        try:
+            scan_directory(scan_path, conn, workers=args.workers, resume=args.resume)
+        except KeyboardInterrupt:
+            conn.close()
+            sys.exit(130)
+    
+    if not args.no_fingerprint:
+        update_fingerprints(scan_path, conn, workers=args.workers)
+    
+    if not args.no_inspect:
+        inspect_archives(scan_path, conn)
+    
+    if args.extract_covers:
+        extract_covers(conn, default_cache_dir(db_path))
     
     # Mostra estatísticas
     show_statistics(conn)
@@ -344,7 +960,15 @@ Exemplos de uso:
     
     print("\n✅ Inventário completo!")
     print(f"   📁 Banco de dados salvo em: {db_path}")
-    print(f"\n   Próximo passo: executar 'comic_identifier.py --db {db_path}' para identificar via Comic Vine API")
+    
+    if args.watch:
+        # Import local: comic_watcher reaproveita as funções deste módulo
+        from comic_watcher import watch_library
+        watch_library(scan_path, conn, debounce=args.debounce,
+                      on_overflow=lambda: scan_incremental(scan_path, conn, show_details=0,
+                                                           workers=args.workers))
+    else:
+        print(f"\n   Próximo passo: executar 'comic_identifier.py --db {db_path}' para identificar via Comic Vine API")
     
     conn.close()
 
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Comic Volume Catalog - Catálogo local de volumes do Comic Vine
+Guarda todo volume já visto em buscas e resolve títulos novos sem chamar a API
+"""
+
+import sqlite3
+import os
+import re
+import sys
+import threading
+import time
+
+MATCH_THRESHOLD = 0.85   # Similaridade mínima (0 a 1) para aceitar um volume local
+AMBIGUITY_MARGIN = 0.05  # O melhor candidato precisa vencer o segundo por essa margem
+ARTICLES = {'the', 'a', 'an'}
+
+_NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+
+def normalize_name(name):
+    """'The Amazing Spider-Man' -> 'amazing spider man'"""
+    text = _NON_ALNUM_RE.sub(' ', str(name or '').lower().replace('&', ' and '))
+    words = text.split()
+    if len(words) > 1 and words[0] in ARTICLES:
+        words = words[1:]
+    return ' '.join(words)
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def similarity(a, b):
+    """Coeficiente de Dice entre os trigramas de dois nomes normalizados"""
+    if a == b:
+        return 1.0
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return 2.0 * len(ta & tb) / (len(ta) + len(tb))
+
+def number_tokens(normalized):
+    """Números do nome ('batman 66' -> {'66'}): precisam bater exatamente"""
+    return {word for word in normalized.split() if word.isdigit()}
+
+def create_catalog_tables(conn):
+    """Cria o catálogo de volumes e o índice de palavras"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS volume_catalog (
+            volume_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_norm TEXT NOT NULL,
+            start_year TEXT,
+            publisher TEXT,
+            issue_count INTEGER,
+            updated_at REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_volume_catalog_name ON volume_catalog(name_norm)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS volume_catalog_tokens (
+            token TEXT NOT NULL,
+            volume_id INTEGER NOT NULL,
+            PRIMARY KEY (token, volume_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.commit()
+
+class VolumeCatalog:
+    """
+    Catálogo local de volumes com índice de palavras
+
+    Cada volume fica com o nome normalizado e uma linha por palavra em
+    volume_catalog_tokens. Uma consulta pega os volumes que compartilham
+    palavras com o título, pontua por similaridade de trigramas e só
+    aceita o melhor se passar do limite e não empatar com outro volume.
+
+    Com writer (DatabaseWriter do identifier), as gravações vão para a
+    thread escritora; as leituras em conn podem vir de várias threads.
+    conn_lock protege conn e o estado em memória; quem compartilha a
+    conexão (IssueIndex) deve receber o mesmo lock. Volumes adicionados
+    nesta execução ficam também num índice em memória, visíveis antes
+    mesmo do commit.
+    """
+
+    def __init__(self, conn, threshold=MATCH_THRESHOLD, writer=None, conn_lock=None):
+        self.conn = conn
+        self.threshold = threshold
+        self.writer = writer
+        self.hits = 0
+        self.misses = 0
+        self._lock = conn_lock or threading.Lock()
+        self._recent = {}         # volume_id -> linha, volumes adicionados nesta execução
+        self._recent_tokens = {}  # palavra -> {volume_id}
+        create_catalog_tables(conn)
+
+    def _write(self, statements):
+        if self.writer:
+            self.writer.submit(statements)
+        else:
+            with self._lock:
+                for sql, rows in statements:
+                    self.conn.executemany(sql, rows)
+
+    def add_many(self, volumes):
+        """Guarda volumes vindos da API (resultados de busca)"""
+        now = time.time()
+        rows = []
+        tokens = []
+        for volume in volumes:
+            if not volume.get('id') or not volume.get('name'):
+                continue
+            normalized = normalize_name(volume['name'])
+            publisher = volume.get('publisher') or {}
+            rows.append((volume['id'], volume['name'], normalized,
+                         str(volume['start_year']) if volume.get('start_year') else None,
+                         publisher.get('name'), volume.get('count_of_issues'), now))
+            tokens.extend((token, volume['id']) for token in set(normalized.split()))
+
+        with self._lock:
+            for row in rows:
+                self._recent[row[0]] = row[:6]
+                for word in set(row[2].split()):
+                    self._recent_tokens.setdefault(word, set()).add(row[0])
+
+        self._write([('''
+            INSERT INTO volume_catalog
+            (volume_id, name, name_norm, start_year, publisher, issue_count, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(volume_id) DO UPDATE SET
+                name = excluded.name,
+                name_norm = excluded.name_norm,
+                start_year = COALESCE(excluded.start_year, start_year),
+                publisher = COALESCE(excluded.publisher, publisher),
+                issue_count = COALESCE(excluded.issue_count, issue_count),
+                updated_at = excluded.updated_at
+        ''', rows), ('INSERT OR IGNORE INTO volume_catalog_tokens (token, volume_id) VALUES (?, ?)', tokens)])
+        return len(rows)
+
+    def import_identified(self):
+        """
+        Alimenta o catálogo com os volumes dos comics já identificados
+
+        O ano de início vem da tabela volumes (comic_enricher.py --volumes);
+        comics só guardam o ano do arquivo. Volumes sem ano ficam de fora:
+        nunca bateriam com títulos que têm ano e, sem ano, passariam na
+        frente de outros volumes de mesmo nome.
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='volumes'")
+            if cursor.fetchone() is None:
+                return 0
+            cursor.execute('''
+                SELECT v.volume_id, v.name, v.publisher, v.start_year, v.count_of_issues
+                FROM volumes v
+                WHERE v.start_year IS NOT NULL
+                  AND v.volume_id IN (SELECT comicvine_volume_id FROM comics WHERE status = 'identified')
+                  AND v.volume_id NOT IN (SELECT volume_id FROM volume_catalog WHERE start_year IS NOT NULL)
+            ''')
+            volumes = [{'id': volume_id, 'name': name, 'publisher': {'name': publisher},
+                        'start_year': start_year, 'count_of_issues': issue_count}
+                       for volume_id, name, publisher, start_year, issue_count in cursor.fetchall()]
+        added = self.add_many(volumes)
+        if not self.writer:
+            self.conn.commit()
+        return added
+
+    def candidates(self, normalized):
+        """Volumes que têm ao menos metade das palavras do título"""
+        words = sorted(set(normalized.split()))
+        if not words:
+            return []
+        placeholders = ','.join('?' * len(words))
+        with self._lock:
+            rows = self.conn.execute(f'''
+                SELECT c.volume_id, c.name, c.name_norm, c.start_year, c.publisher, c.issue_count
+                FROM volume_catalog c
+                JOIN (
+                    SELECT volume_id FROM volume_catalog_tokens
+                    WHERE token IN ({placeholders})
+                    GROUP BY volume_id
+                    HAVING COUNT(*) * 2 >= ?
+                ) t ON t.volume_id = c.volume_id
+            ''', [*words, len(words)]).fetchall()
+
+            # Volumes desta execução que talvez ainda não estejam no banco
+            found = {row[0] for row in rows}
+            counts = {}
+            for word in words:
+                for volume_id in self._recent_tokens.get(word, ()):
+                    counts[volume_id] = counts.get(volume_id, 0) + 1
+            for volume_id, count in counts.items():
+                if count * 2 >= len(words) and volume_id not in found:
+                    rows.append(self._recent[volume_id])
+        return rows
+
+    def match(self, title, year=None):
+        """
+        Procura o volume de um título no catálogo
+
+        Retorna (volume, pontuação) no formato da API, ou (None, melhor
+        pontuação) quando não há candidato confiável.
+        """
+        normalized = normalize_name(title)
+        numbers = number_tokens(normalized)
+        scored = []
+        for volume_id, name, name_norm, start_year, publisher, issue_count in self.candidates(normalized):
+            # Sem ano de início (importações antigas) não dá para separar relançamentos
+            if not start_year:
+                continue
+            # Com ano no nome do arquivo, só vale volume daquele ano
+            if year and start_year != str(year):
+                continue
+            # 'Batman 66' e 'Batman 89' são séries diferentes
+            if number_tokens(name_norm) != numbers:
+                continue
+            score = similarity(normalized, name_norm)
+            scored.append((score, {
+                'id': volume_id,
+                'name': name,
+                'start_year': start_year,
+                'publisher': {'name': publisher} if publisher else None,
+                'count_of_issues': issue_count,
+            }))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        best = scored[0][0] if scored else 0.0
+        confident = best >= self.threshold and (len(scored) == 1 or best - scored[1][0] >= AMBIGUITY_MARGIN)
+        with self._lock:
+            if not confident:
+                self.misses += 1
+                return None, best
+            self.hits += 1
+        return scored[0][1], best
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"{self.hits} séries resolvidas localmente, {self.misses} buscas na API ({rate:.0f}% sem API)"
+
+def show_stats(conn):
+    """Mostra o tamanho do catálogo"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*), COUNT(start_year), COUNT(DISTINCT publisher) FROM volume_catalog')
+    volumes, with_year, publishers = cursor.fetchone()
+    cursor.execute('SELECT COUNT(DISTINCT token) FROM volume_catalog_tokens')
+    tokens = cursor.fetchone()[0]
+
+    print("\n📊 CATÁLOGO LOCAL DE VOLUMES")
+    print("=" * 60)
+    print(f"   Volumes: {volumes} ({with_year} com ano de início)")
+    print(f"   Editoras: {publishers}")
+    print(f"   Palavras indexadas: {tokens}")
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Catálogo local de volumes do Comic Vine')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+    parser.add_argument('--import-identified', action='store_true',
+                       help='Adiciona ao catálogo os volumes dos comics já identificados '
+                            '(precisa de comic_enricher.py --volumes para o ano de início)')
+    parser.add_argument('--search', metavar='TITULO', help='Testa um título contra o catálogo')
+    parser.add_argument('--year', help='Ano para --search')
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD,
+                       help=f'Similaridade mínima (padrão: {MATCH_THRESHOLD})')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  📇 COMIC VOLUME CATALOG")
+    print("=" * 60)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    catalog = VolumeCatalog(conn, threshold=args.threshold)
+
+    if args.import_identified:
+        added = catalog.import_identified()
+        print(f"\n✅ {added} volumes adicionados a partir dos comics identificados")
+
+    if args.search:
+        volume, score = catalog.match(args.search, args.year)
+        if volume:
+            print(f"\n✓ {volume['name']} ({volume['start_year'] or '?'}) "
+                  f"[id {volume['id']}] - similaridade {score:.2f}")
+        else:
+            print(f"\n❌ Nenhum volume confiável (melhor similaridade {score:.2f})")
+            for volume_id, name, name_norm, start_year, _, _ in catalog.candidates(normalize_name(args.search))[:10]:
+                print(f"   • {name} ({start_year or '?'}) [id {volume_id}] - "
+                      f"{similarity(normalize_name(args.search), name_norm):.2f}")
+    else:
+        show_stats(conn)
+
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Comic Volumes - Dados de cada volume (série) do Comic Vine numa tabela própria
+Uma linha por comicvine_volume_id com ano de início, total de edições, sinopse e
+capa; os comics apontam para ela pelo id, então a página de uma série é uma
+consulta indexada em vez de uma chamada à API
+"""
+
+import sqlite3
+import os
+import re
+import sys
+import time
+
+# Campos pedidos em /volumes/ (até 100 volumes por requisição com filter=id:a|b|c)
+VOLUME_FIELDS = ('id,name,start_year,count_of_issues,publisher,deck,description,'
+                 'image,first_issue,last_issue,site_detail_url,date_last_updated')
+
+# Colunas de volumes, na ordem de volume_row()
+VOLUME_COLUMNS = [
+    'volume_id', 'name', 'publisher', 'start_year', 'count_of_issues', 'deck',
+    'description', 'image_url', 'first_issue_number', 'last_issue_number',
+    'site_detail_url', 'date_last_updated', 'fetched_at',
+]
+
+def create_volume_tables(conn):
+    """Cria a tabela de volumes e o índice que liga os comics a ela"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS volumes (
+            volume_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            publisher TEXT,
+            start_year TEXT,
+            count_of_issues INTEGER,
+            deck TEXT,
+            description TEXT,
+            image_url TEXT,
+            first_issue_number TEXT,
+            last_issue_number TEXT,
+            site_detail_url TEXT,
+            date_last_updated TEXT,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_volumes_name ON volumes(name COLLATE NOCASE)')
+
+    # Ligação com os arquivos: comics.comicvine_volume_id
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_comicvine_volume ON comics(comicvine_volume_id)')
+    conn.commit()
+
+def volume_row(volume, now=None):
+    """Linha de volumes (ordem de VOLUME_COLUMNS) a partir de uma resposta da API"""
+    image = volume.get('image') or {}
+    publisher = volume.get('publisher') or {}
+    first_issue = volume.get('first_issue') or {}
+    last_issue = volume.get('last_issue') or {}
+    return (
+        volume['id'],
+        volume.get('name') or '',
+        publisher.get('name'),
+        str(volume['start_year']) if volume.get('start_year') else None,
+        volume.get('count_of_issues'),
+        volume.get('deck'),
+        volume.get('description'),
+        image.get('medium_url') or image.get('small_url'),
+        first_issue.get('issue_number'),
+        last_issue.get('issue_number'),
+        volume.get('site_detail_url'),
+        volume.get('date_last_updated'),
+        time.time() if now is None else now,
+    )
+
+def save_volumes(cursor, volumes):
+    """
+    Grava volumes da API e repassa nome e editora aos comics do volume (sem commit)
+
+    Retorna quantos comics foram atualizados.
+    """
+    rows = [volume_row(volume) for volume in volumes if volume.get('id')]
+    if not rows:
+        return 0
+    cursor.executemany(f'''
+        INSERT OR REPLACE INTO volumes ({', '.join(VOLUME_COLUMNS)})
+        VALUES ({', '.join('?' * len(VOLUME_COLUMNS))})
+    ''', rows)
+
+    # Nome e editora vêm de uma fonte só: a linha do volume
+    cursor.executemany('''
+        UPDATE comics
+        SET volume_name = ?,
+            publisher = COALESCE(?, publisher),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE comicvine_volume_id = ?
+          AND (volume_name IS NOT ? OR publisher IS NOT COALESCE(?, publisher))
+    ''', [(name, publisher, volume_id, name, publisher)
+          for volume_id, name, publisher, *_ in rows if name])
+    return cursor.rowcount if cursor.rowcount > 0 else 0
+
+def get_volume(conn, volume_id):
+    """Linha de volumes como dict (None se o volume ainda não foi buscado)"""
+    cursor = conn.execute(f'SELECT {", ".join(VOLUME_COLUMNS)} FROM volumes WHERE volume_id = ?',
+                          (volume_id,))
+    row = cursor.fetchone()
+    return dict(zip(VOLUME_COLUMNS, row)) if row else None
+
+def find_volumes(conn, name, limit=20):
+    """Volumes buscados com o nome (exato primeiro, depois parcial): [(id, nome, ano, editora)]"""
+    exact = conn.execute('''
+        SELECT volume_id, name, start_year, publisher FROM volumes
+        WHERE name = ? COLLATE NOCASE ORDER BY start_year
+    ''', (name,)).fetchall()
+    if exact:
+        return exact
+    return conn.execute('''
+        SELECT volume_id, name, start_year, publisher FROM volumes
+        WHERE name LIKE ? ORDER BY name, start_year LIMIT ?
+    ''', (f'%{name}%', limit)).fetchall()
+
+def comics_in_volume(conn, volume_id):
+    """Comics (arquivos) de um volume, pelo índice idx_comicvine_volume"""
+    return conn.execute('''
+        SELECT id, issue_number, cover_date, file_name
+        FROM comics
+        WHERE comicvine_volume_id = ?
+        ORDER BY CAST(issue_number AS REAL), issue_number
+    ''', (volume_id,)).fetchall()
+
+def pending_volume_ids(conn, force=False):
+    """Volumes dos comics identificados que ainda não estão em volumes"""
+    query = '''
+        SELECT DISTINCT comicvine_volume_id FROM comics
+        WHERE status = 'identified' AND comicvine_volume_id IS NOT NULL
+    '''
+    if not force:
+        query += ' AND comicvine_volume_id NOT IN (SELECT volume_id FROM volumes)'
+    return [row[0] for row in conn.execute(query + ' ORDER BY comicvine_volume_id')]
+
+def strip_html(text):
+    """Sinopse do Comic Vine vem em HTML"""
+    return ' '.join(re.sub(r'<[^>]+>', ' ', text or '').split())
+
+def show_stats(conn):
+    """Mostra quantos volumes já foram buscados"""
+    volumes, with_description = conn.execute(
+        "SELECT COUNT(*), COUNT(NULLIF(description, '')) FROM volumes").fetchone()
+    referenced = conn.execute('''
+        SELECT COUNT(DISTINCT comicvine_volume_id) FROM comics WHERE comicvine_volume_id IS NOT NULL
+    ''').fetchone()[0]
+
+    print("\n📊 VOLUMES")
+    print("=" * 60)
+    print(f"   Volumes buscados: {volumes} ({with_description} com sinopse)")
+    print(f"   Volumes citados pelos comics: {referenced}")
+    print(f"   Faltam: {len(pending_volume_ids(conn))} (python3 comic_enricher.py --volumes)")
+    print("=" * 60)
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tabela de volumes do Comic Vine')
+    parser.add_argument('--db', default='comics_inventory.db', help='Caminho do banco de dados')
+    parser.add_argument('--search', metavar='NOME', help='Procura volumes já buscados pelo nome')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  📚 COMIC VOLUMES")
+    print("=" * 60)
+
+    if not os.path.exists(args.db):
+        print(f"\n❌ Banco de dados não encontrado: {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    create_volume_tables(conn)
+
+    if args.search:
+        results = find_volumes(conn, args.search)
+        if not results:
+            print("\n❌ Nenhum volume encontrado.")
+        for volume_id, name, start_year, publisher in results:
+            print(f"   • {name} ({start_year or '?'}) - {publisher or '?'} [id {volume_id}]")
+    else:
+        show_stats(conn)
+
+    conn.close()
+
+if __name__ == "__main__":
+    main()
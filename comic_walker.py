@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Comic Walker - Varredura paralela de diretórios com os.scandir
+Usado pelo comic_scanner.py para listar a biblioteca em várias threads
+"""
+
+import os
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Extensões de arquivos de comics suportadas (lista única: scanner e watcher importam daqui)
+COMIC_EXTENSIONS = {'.cbr', '.cbz', '.pdf', '.cbt', '.cb7'}
+
+DEFAULT_WORKERS = 8
+QUEUE_SIZE = 256  # Máximo de pastas listadas aguardando o escritor do banco
+
+# Resultado da listagem de um diretório:
+#   files    -> lista de (nome, caminho, tamanho, mtime) ou None se a pasta foi pulada
+#   subdirs  -> subpastas visitadas (não ocultas)
+#   error    -> mensagem de erro ou None
+DirListing = namedtuple('DirListing', 'dir_path mtime_ns entry_count subdirs files error pending')
+
+def _list_directory(dir_path, extensions, known_children):
+    """Lista um diretório reaproveitando o stat do DirEntry"""
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError as e:
+        return DirListing(dir_path, None, 0, [], [], str(e), 0)
+
+    # Pasta inalterada: usa os filhos já conhecidos sem listar
+    if known_children is not None:
+        children = known_children(dir_path, mtime_ns)
+        if children is not None:
+            return DirListing(dir_path, mtime_ns, None, list(children), None, None, 0)
+
+    subdirs = []
+    files = []
+    entry_count = 0
+
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                entry_count += 1
+                name = entry.name
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Ignora diretórios ocultos
+                        if not name.startswith('.'):
+                            subdirs.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+
+                ext = os.path.splitext(name)[1].lower()
+                if ext not in extensions:
+                    continue
+
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append((name, entry.path, st.st_size, st.st_mtime))
+    except OSError as e:
+        return DirListing(dir_path, mtime_ns, entry_count, subdirs, files, str(e), 0)
+
+    return DirListing(dir_path, mtime_ns, entry_count, subdirs, files, None, 0)
+
+def walk_parallel(root_path, workers=DEFAULT_WORKERS, extensions=COMIC_EXTENSIONS,
+                  known_children=None, queue_size=QUEUE_SIZE, start_dirs=None):
+    """
+    Percorre a árvore em paralelo e gera um DirListing por diretório
+
+    Cada pasta é listada por uma thread do pool, que já agenda as subpastas.
+    Os resultados passam por uma fila limitada, então quem consome o gerador
+    (o único escritor do banco) controla o ritmo dos workers.
+
+    known_children(dir_path, mtime_ns) pode devolver a lista de subpastas de
+    um diretório inalterado; nesse caso ele não é listado (files=None).
+
+    start_dirs permite começar por várias pastas em vez da raiz (retomada
+    de um scan interrompido a partir da fronteira salva).
+    """
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def task(dir_path):
+        if stop.is_set():
+            return
+        try:
+            listing = _list_directory(dir_path, extensions, known_children)
+        except Exception as e:
+            listing = DirListing(dir_path, None, 0, [], [], str(e), 0)
+
+        # Entrega o resultado antes de agendar as subpastas: assim o
+        # consumidor sempre contabiliza o pai antes de qualquer filho
+        put(listing._replace(pending=len(listing.subdirs)))
+        for subdir in listing.subdirs:
+            if stop.is_set():
+                break
+            try:
+                executor.submit(task, subdir)
+            except RuntimeError:
+                break
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers),
+                                  thread_name_prefix='comic-walker')
+    try:
+        start_dirs = [root_path] if start_dirs is None else list(start_dirs)
+        for dir_path in start_dirs:
+            executor.submit(task, dir_path)
+        pending = len(start_dirs)
+        while pending:
+            listing = results.get()
+            pending += listing.pending - 1
+            yield listing
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
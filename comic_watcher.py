@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Comic Watcher - Mantém o comics_inventory.db atualizado em tempo real (Linux)
+Usa inotify direto da libc (ctypes): só os arquivos que mudaram são lidos
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sqlite3
+import struct
+import time
+
+from comic_parser import clean_filename
+from comic_walker import walk_parallel, COMIC_EXTENSIONS
+from comic_fingerprint import compute_fingerprint
+from comic_archive import inspect_archive, ARCHIVE_EXTENSIONS
+from comic_scanner import BulkInserter, mark_missing, archive_info_row, save_archive_info
+
+# Eventos do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+READ_BUFFER_SIZE = 64 * 1024
+WATCH_BATCH_SIZE = 500  # Caminhos por transação
+
+class Inotify:
+    """Interface mínima para inotify_init1/add_watch/rm_watch via ctypes"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify não disponível (apenas Linux)')
+        self._libc = libc
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """Espera até timeout segundos; retorna lista de (wd, mask, cookie, nome)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self.fd, READ_BUFFER_SIZE)
+        events = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+def _under(prefix_dir):
+    """Parâmetros SQL para 'caminho está dentro de prefix_dir'"""
+    prefix = os.path.join(prefix_dir, '')
+    return prefix, len(prefix)
+
+class LibraryWatcher:
+    """
+    Aplica no banco os eventos de uma árvore monitorada
+
+    Eventos são agrupados por caminho e só processados depois de
+    `debounce` segundos de silêncio (cópias grandes geram rajadas).
+    Cada rodada vira transações pequenas de até WATCH_BATCH_SIZE caminhos.
+    """
+
+    def __init__(self, root_path, conn, debounce=2.0, on_overflow=None):
+        self.root_path = root_path
+        self.conn = conn
+        self.debounce = debounce
+        self.on_overflow = on_overflow
+        self.inotify = Inotify()
+
+        self.wd_paths = {}    # wd -> pasta
+        self.path_wds = {}    # pasta -> wd
+        self.dirty = {}       # arquivo -> hora do último evento
+        self.new_dirs = {}    # pasta criada/trazida de fora -> hora
+        self.gone_dirs = {}   # pasta apagada/levada para fora -> hora
+        self.moves = {}       # cookie -> (caminho, é_pasta, hora) de IN_MOVED_FROM
+        self.overflowed = False
+
+    # ---- Registro das pastas ----
+
+    def watch_dir(self, dir_path):
+        try:
+            wd = self.inotify.add_watch(dir_path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise OSError(e.errno, 'Limite de watches do inotify atingido - aumente '
+                                       'fs.inotify.max_user_watches (sysctl)') from e
+            return None  # Pasta sumiu antes do registro
+        self.wd_paths[wd] = dir_path
+        self.path_wds[dir_path] = wd
+        return wd
+
+    def unwatch_tree(self, dir_path):
+        prefix = os.path.join(dir_path, '')
+        for path in [p for p in self.path_wds if p == dir_path or p.startswith(prefix)]:
+            wd = self.path_wds.pop(path)
+            self.wd_paths.pop(wd, None)
+            self.inotify.rm_watch(wd)
+
+    def register_watches(self):
+        """
+        Registra um watch por pasta usando os snapshots do último scan
+
+        Não percorre a árvore: a lista de pastas vem de dir_snapshots.
+        """
+        cursor = self.conn.cursor()
+        prefix, length = _under(self.root_path)
+        cursor.execute('''
+            SELECT dir_path FROM dir_snapshots
+            WHERE dir_path = ? OR substr(dir_path, 1, ?) = ?
+        ''', (self.root_path, length, prefix))
+        dirs = [row[0] for row in cursor.fetchall()] or [self.root_path]
+
+        for dir_path in dirs:
+            if dir_path not in self.path_wds:
+                self.watch_dir(dir_path)
+        return len(self.path_wds)
+
+    # ---- Eventos ----
+
+    def handle_event(self, wd, mask, cookie, name):
+        now = time.monotonic()
+
+        if mask & IN_Q_OVERFLOW:
+            self.overflowed = True
+            return
+        if mask & IN_IGNORED:
+            path = self.wd_paths.pop(wd, None)
+            if path is not None and self.path_wds.get(path) == wd:
+                del self.path_wds[path]
+            return
+
+        dir_path = self.wd_paths.get(wd)
+        if dir_path is None or not name:
+            return  # DELETE_SELF/MOVE_SELF: tratados pelo evento na pasta-mãe
+
+        path = os.path.join(dir_path, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if is_dir and name.startswith('.'):
+            return  # Pastas ocultas são ignoradas, como no scan
+
+        if mask & IN_MOVED_FROM:
+            self.moves[cookie] = (path, is_dir, now)
+        elif mask & IN_MOVED_TO:
+            source = self.moves.pop(cookie, None)
+            if source is not None:
+                self.apply_rename(source[0], path, is_dir)
+            elif is_dir:
+                self.watch_dir(path)
+                self.new_dirs[path] = now
+            else:
+                self.dirty[path] = now
+        elif is_dir:
+            if mask & IN_CREATE:
+                # Registra já: arquivos copiados para dentro geram eventos próprios
+                self.watch_dir(path)
+                self.new_dirs[path] = now
+            elif mask & IN_DELETE:
+                self.gone_dirs[path] = now
+        elif os.path.splitext(name)[1].lower() in COMIC_EXTENSIONS:
+            self.dirty[path] = now
+
+    # ---- Aplicação no banco ----
+
+    def apply_rename(self, old_path, new_path, is_dir):
+        """Renomeação dentro da biblioteca: atualiza file_path no lugar"""
+        cursor = self.conn.cursor()
+
+        if is_dir:
+            old_prefix, old_length = _under(old_path)
+            new_prefix = os.path.join(new_path, '')
+            try:
+                for table, column in [('comics', 'file_path'), ('archive_info', 'file_path'),
+                                      ('dir_snapshots', 'dir_path'), ('dir_snapshots', 'parent_path')]:
+                    cursor.execute(f'''
+                        UPDATE {table} SET {column} = ? || substr({column}, ?)
+                        WHERE substr({column}, 1, ?) = ?
+                    ''', (new_prefix, old_length + 1, old_length, old_prefix))
+                cursor.execute('''
+                    UPDATE dir_snapshots SET dir_path = ?, parent_path = ? WHERE dir_path = ?
+                ''', (new_path, os.path.dirname(new_path), old_path))
+                # Filhos diretos: parent_path é a própria pasta, sem a barra do prefixo
+                cursor.execute('''
+                    UPDATE dir_snapshots SET parent_path = ? WHERE parent_path = ?
+                ''', (new_path, old_path))
+                self.conn.commit()
+            except sqlite3.IntegrityError:
+                # Destino já tinha registros: trata como saída + entrada
+                self.conn.rollback()
+                self.gone_dirs[old_path] = time.monotonic()
+                self.new_dirs[new_path] = time.monotonic()
+                return
+
+            # Os watches continuam válidos, só o caminho mudou
+            for path in [p for p in self.path_wds if p == old_path or p.startswith(old_prefix)]:
+                wd = self.path_wds.pop(path)
+                moved = new_path + path[len(old_path):]
+                self.path_wds[moved] = wd
+                self.wd_paths[wd] = moved
+            for pending in (self.dirty, self.new_dirs):
+                for path in [p for p in pending if p.startswith(old_prefix)]:
+                    pending[new_path + path[len(old_path):]] = pending.pop(path)
+            print(f"  🔀 Pasta movida: {old_path} → {new_path}")
+            return
+
+        new_name = os.path.basename(new_path)
+        new_ext = os.path.splitext(new_name)[1].lower()
+        cursor.execute('SELECT id FROM comics WHERE file_path = ?', (old_path,))
+        row = cursor.fetchone()
+
+        if row is None or new_ext not in COMIC_EXTENSIONS:
+            # Origem desconhecida (ex.: .part → .cbz) ou virou outro tipo
+            self.dirty[old_path] = time.monotonic()
+            if new_ext in COMIC_EXTENSIONS:
+                self.dirty[new_path] = time.monotonic()
+            return
+
+        clean_title, issue_num, year = clean_filename(new_name)
+        # Um arquivo sobrescrito pelo rename deixa de existir
+        cursor.execute('DELETE FROM comics WHERE file_path = ?', (new_path,))
+        cursor.execute('DELETE FROM archive_info WHERE file_path = ?', (new_path,))
+        cursor.execute('''
+            UPDATE comics
+            SET file_path = ?,
+                file_name = ?,
+                file_ext = ?,
+                clean_title = CASE WHEN status = 'pending' THEN ? ELSE clean_title END,
+                issue_number = CASE WHEN status = 'pending' THEN ? ELSE issue_number END,
+                year = CASE WHEN status = 'pending' THEN ? ELSE year END,
+                missing_since = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (new_path, new_name, new_ext, clean_title, issue_num, year, row[0]))
+        cursor.execute('UPDATE archive_info SET file_path = ? WHERE file_path = ?', (new_path, old_path))
+        self.conn.commit()
+        print(f"  🔀 Movido: {old_path} → {new_path}")
+
+    def sync_files(self, paths):
+        """Insere, atualiza ou marca como ausente cada caminho (uma transação)"""
+        cursor = self.conn.cursor()
+        inserter = BulkInserter(self.conn)
+        touched = []
+        gone = []
+
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+
+            cursor.execute('SELECT file_size, file_mtime, missing_since FROM comics WHERE file_path = ?',
+                           (path,))
+            row = cursor.fetchone()
+
+            if st is None or not os.path.isfile(path):
+                if row is not None and row[2] is None:
+                    gone.append(path)
+                    print(f"  ➖ Ausente: {path}")
+                continue
+
+            if row is None:
+                if self.reclaim_missing(cursor, path, st):
+                    continue
+                inserter.add(path, os.path.basename(path), st.st_size, st.st_mtime)
+                touched.append((path, st.st_size, st.st_mtime))
+                print(f"  ➕ Novo: {path}")
+            elif (row[0], row[1]) != (st.st_size, st.st_mtime) or row[2] is not None:
+                cursor.execute('''
+                    UPDATE comics
+                    SET file_size = ?,
+                        file_mtime = ?,
+                        fingerprint = NULL,
+                        missing_since = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE file_path = ?
+                ''', (st.st_size, st.st_mtime, path))
+                touched.append((path, st.st_size, st.st_mtime))
+                print(f"  ✏️  Alterado: {path}")
+
+        mark_missing(cursor, gone)
+        inserter.flush()
+        self.describe_files(touched)
+
+    def reclaim_missing(self, cursor, path, st):
+        """
+        Arquivo "novo" que é um ausente que voltou (ex.: pasta levada para
+        fora e trazida de volta): move o registro antigo em vez de inserir
+        """
+        try:
+            fingerprint = compute_fingerprint(path, st.st_size)
+        except OSError:
+            return False
+
+        cursor.execute('''
+            SELECT id, file_path FROM comics
+            WHERE fingerprint = ? AND missing_since IS NOT NULL
+            LIMIT 1
+        ''', (fingerprint,))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+
+        comic_id, old_path = row
+        name = os.path.basename(path)
+        cursor.execute('''
+            UPDATE comics
+            SET file_path = ?,
+                file_name = ?,
+                file_ext = ?,
+                file_size = ?,
+                file_mtime = ?,
+                missing_since = NULL,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (path, name, os.path.splitext(name)[1].lower(), st.st_size, st.st_mtime, comic_id))
+        cursor.execute('DELETE FROM archive_info WHERE file_path = ?', (path,))
+        cursor.execute('UPDATE archive_info SET file_path = ? WHERE file_path = ?', (path, old_path))
+        print(f"  🔀 Reencontrado: {old_path} → {path}")
+        return True
+
+    def describe_files(self, files):
+        """Fingerprint e archive_info dos arquivos novos/alterados (poucos por rodada)"""
+        fingerprints = []
+        archive_rows = []
+        for path, file_size, file_mtime in files:
+            try:
+                fingerprints.append((compute_fingerprint(path, file_size), path))
+            except OSError:
+                continue
+            if os.path.splitext(path)[1].lower() in ARCHIVE_EXTENSIONS:
+                try:
+                    info, error = inspect_archive(path), None
+                except Exception as e:
+                    info, error = None, f"{type(e).__name__}: {e}"
+                archive_rows.append(archive_info_row(path, file_size, file_mtime, info, error))
+
+        self.conn.executemany('UPDATE comics SET fingerprint = ? WHERE file_path = ?', fingerprints)
+        save_archive_info(self.conn, archive_rows)
+
+    def scan_new_dir(self, dir_path):
+        """Pasta nova: registra watches e sincroniza só essa subárvore"""
+        files = []
+        for listing in walk_parallel(dir_path, workers=2, extensions=COMIC_EXTENSIONS):
+            if listing.mtime_ns is None:
+                continue
+            if listing.dir_path not in self.path_wds:
+                self.watch_dir(listing.dir_path)
+            files.extend(file_path for _, file_path, _, _ in listing.files)
+        for i in range(0, len(files), WATCH_BATCH_SIZE):
+            self.sync_files(files[i:i + WATCH_BATCH_SIZE])
+
+    def drop_dir(self, dir_path):
+        """Pasta apagada ou levada para fora: marca tudo dentro como ausente"""
+        self.unwatch_tree(dir_path)
+        prefix, length = _under(dir_path)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE comics
+            SET missing_since = COALESCE(missing_since, CURRENT_TIMESTAMP)
+            WHERE substr(file_path, 1, ?) = ? AND missing_since IS NULL
+        ''', (length, prefix))
+        count = cursor.rowcount
+        cursor.execute('''
+            DELETE FROM dir_snapshots WHERE dir_path = ? OR substr(dir_path, 1, ?) = ?
+        ''', (dir_path, length, prefix))
+        self.conn.commit()
+        if count:
+            print(f"  ➖ Pasta removida: {dir_path} ({count} arquivos ausentes)")
+
+    def process_ready(self):
+        """Processa o que está quieto há pelo menos `debounce` segundos"""
+        now = time.monotonic()
+
+        def ready(pending):
+            paths = [path for path, stamp in pending.items() if now - stamp >= self.debounce]
+            for path in paths:
+                del pending[path]
+            return paths
+
+        # MOVED_FROM sem par: o item saiu da biblioteca
+        for cookie in [c for c, (_, _, stamp) in self.moves.items() if now - stamp >= self.debounce]:
+            path, is_dir, _ = self.moves.pop(cookie)
+            if is_dir:
+                self.gone_dirs[path] = now - self.debounce
+            else:
+                self.dirty[path] = now - self.debounce
+
+        for dir_path in ready(self.gone_dirs):
+            self.drop_dir(dir_path)
+        for dir_path in ready(self.new_dirs):
+            self.scan_new_dir(dir_path)
+
+        paths = ready(self.dirty)
+        for i in range(0, len(paths), WATCH_BATCH_SIZE):
+            self.sync_files(paths[i:i + WATCH_BATCH_SIZE])
+
+    def recover_overflow(self):
+        """Fila do kernel estourou: eventos foram perdidos"""
+        print("\n  ⚠️  Fila do inotify estourou - re-sincronizando pastas alteradas")
+        self.overflowed = False
+        self.dirty.clear()
+        self.new_dirs.clear()
+        self.gone_dirs.clear()
+        self.moves.clear()
+        if self.on_overflow:
+            self.on_overflow()
+        self.register_watches()
+
+    def run(self):
+        """Loop principal (Ctrl+C para sair)"""
+        while True:
+            waiting = self.dirty or self.new_dirs or self.gone_dirs or self.moves
+            timeout = self.debounce / 2 if waiting else None
+            for event in self.inotify.read_events(timeout):
+                self.handle_event(*event)
+            if self.overflowed:
+                self.recover_overflow()
+            self.process_ready()
+
+    def close(self):
+        self.inotify.close()
+
+def watch_library(root_path, conn, debounce=2.0, on_overflow=None):
+    """
+    Monitora a biblioteca e mantém o banco atualizado até Ctrl+C
+
+    Rode depois de um scan (completo ou --incremental): as pastas a
+    monitorar vêm de dir_snapshots, sem nova varredura da árvore.
+    """
+    print(f"\n👀 Monitorando: {root_path} (debounce: {debounce:.1f}s)")
+    print("=" * 60)
+
+    try:
+        watcher = LibraryWatcher(root_path, conn, debounce=debounce, on_overflow=on_overflow)
+    except OSError as e:
+        print(f"❌ Não foi possível iniciar o inotify: {e}")
+        return
+
+    try:
+        count = watcher.register_watches()
+        print(f"   ✓ {count} pastas monitoradas - Ctrl+C para sair\n")
+        watcher.run()
+    except KeyboardInterrupt:
+        # Aplica o que ainda estava aguardando o debounce
+        watcher.debounce = 0
+        watcher.process_ready()
+        print("\n\n⚠️  Monitoramento encerrado")
+    except OSError as e:
+        print(f"\n❌ {e}")
+    finally:
+        watcher.close()
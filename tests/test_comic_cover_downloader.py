@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('requests')
+
+from comic_cover_downloader import cover_path, default_download_dir, download_covers
+from comic_mock_server import MockComicVine, SyntheticCatalog, start_server
+
+
+@pytest.fixture
+def mock_server():
+    mock = MockComicVine(SyntheticCatalog(volumes=3))
+    server, _ = start_server(mock)
+    try:
+        yield mock
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_inventory(db_path, covers):
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE comics (
+            id INTEGER PRIMARY KEY,
+            status TEXT,
+            cover_url TEXT
+        )
+    ''')
+    conn.executemany("INSERT INTO comics (id, status, cover_url) VALUES (?, 'identified', ?)",
+                     covers)
+    conn.commit()
+    conn.close()
+
+
+def test_download_covers_against_mock_server(tmp_path, mock_server, capsys):
+    base = mock_server.catalog.image_base
+    db_path = str(tmp_path / 'comics.db')
+    shared = f"{base}/covers/10000001.png"
+    make_inventory(db_path, [
+        (1, shared),
+        (2, shared),                               # Mesma URL em dois arquivos
+        (3, f"{base}/covers/10000002.png"),
+        (4, f"{base}/covers/99990001.png"),        # Edição que não existe: 404
+    ])
+
+    done, errors = download_covers(db_path, workers=2, min_interval=0)
+    assert (done, errors) == (2, 0)
+    assert mock_server.counts == {'covers': 3}
+
+    conn = sqlite3.connect(db_path)
+    statuses = dict(conn.execute('SELECT url, status FROM cover_downloads'))
+    assert statuses == {
+        shared: 'done',
+        f"{base}/covers/10000002.png": 'done',
+        f"{base}/covers/99990001.png": 'missing',
+    }
+
+    assert conn.execute('SELECT COUNT(*) FROM cover_images').fetchone()[0] == 2
+
+    covers_dir = default_download_dir(db_path)
+    path, content_type = cover_path(conn, covers_dir, 3, 'original')
+    assert path.endswith('.png') and content_type == 'image/png'
+
+    # Sem Pillow o thumbnail cai na original: o content type acompanha o arquivo
+    path, content_type = cover_path(conn, covers_dir, 1, 'thumbnail')
+    assert content_type == ('image/jpeg' if path.endswith('.jpg') else 'image/png')
+    assert cover_path(conn, covers_dir, 4) is None
+    conn.close()
+
+    # Segunda execução: nada a baixar (404 não é tentado de novo)
+    mock_server.reset_counts()
+    assert download_covers(db_path, workers=2, min_interval=0) == (0, 0)
+    assert mock_server.total_requests() == 0
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+from comic_scanner import create_database, scan_directory, scan_incremental
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify só no Linux')
+
+
+def make_comic(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'PK\x05\x06' + b'\0' * 18)
+
+
+def test_directory_rename_keeps_subfolders_for_incremental_scan(tmp_path, capsys):
+    from comic_watcher import LibraryWatcher
+
+    root = str(tmp_path / 'library')
+    make_comic(os.path.join(root, 'Marvel', 'X-Men', 'X-Men 001.cbz'))
+    make_comic(os.path.join(root, 'Marvel', 'X-Men', 'Annuals', 'X-Men Annual 001.cbz'))
+    make_comic(os.path.join(root, 'Marvel', 'Thor 001.cbz'))
+
+    conn = create_database(str(tmp_path / 'comics.db'))
+    scan_directory(root, conn, workers=2)
+
+    old_path = os.path.join(root, 'Marvel')
+    new_path = os.path.join(root, 'Marvel Comics')
+    os.rename(old_path, new_path)
+
+    watcher = LibraryWatcher(root, conn)
+    try:
+        watcher.apply_rename(old_path, new_path, is_dir=True)
+    finally:
+        watcher.inotify.close()
+
+    parents = dict(conn.execute('SELECT dir_path, parent_path FROM dir_snapshots'))
+    assert parents[os.path.join(new_path, 'X-Men')] == new_path
+    assert parents[os.path.join(new_path, 'X-Men', 'Annuals')] == os.path.join(new_path, 'X-Men')
+
+    new_files, changed_files, gone_files = scan_incremental(root, conn, workers=2)
+    capsys.readouterr()
+
+    assert new_files == [] and changed_files == [] and gone_files == []
+    assert conn.execute('SELECT COUNT(*) FROM comics WHERE missing_since IS NOT NULL').fetchone()[0] == 0
+    assert sorted(path for path, in conn.execute('SELECT file_path FROM comics')) == sorted([
+        os.path.join(new_path, 'X-Men', 'X-Men 001.cbz'),
+        os.path.join(new_path, 'X-Men', 'Annuals', 'X-Men Annual 001.cbz'),
+        os.path.join(new_path, 'Thor 001.cbz'),
+    ])
+    conn.close()